@@ -0,0 +1 @@
+"""Performance benchmarks for the FVB engine (not collected by pytest)."""
@@ -0,0 +1,52 @@
+"""Full vs memoized code generation after a single prop edit.
+
+    python -m benchmarks.bench_codegen --size 10000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.synthetic import make_tree
+from src.engine.code_generator import CodeGenerator, generate_code
+from src.engine.tree_ops import set_prop
+from src.state.app_state import AppState
+from src.state.events import TREE_KINDS
+from src.state.project_state import ProjectState
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+
+    state = AppState(ProjectState(name="bench", tree=make_tree(args.size)))
+    dirty = state.dirty_set(TREE_KINDS)
+    cached, keyed = CodeGenerator(), CodeGenerator()
+    project = state.project
+
+    start = time.perf_counter()
+    cached.generate(project.tree, dirty.drain(), project.index)
+    keyed.generate(project.tree)
+    print(f"tree: {args.size} nodes, cold generate {(time.perf_counter() - start) / 2 * 1e3:.1f} ms")
+
+    timings = {"generate_code": 0.0, "memo (key check)": 0.0, "memo (dirty ids)": 0.0}
+    leaf = f"n{args.size - 1}"
+    for i in range(args.edits):
+        state.transact(lambda p: set_prop(p.tree, leaf, "value", f"edit {i}", tree_index=p.index))
+        for name, run in (
+            ("generate_code", lambda: generate_code(project.tree)),
+            ("memo (key check)", lambda: keyed.generate(project.tree)),
+            ("memo (dirty ids)", lambda: cached.generate(project.tree, dirty.drain(), project.index)),
+        ):
+            start = time.perf_counter()
+            run()
+            timings[name] += time.perf_counter() - start
+
+    for name, total in timings.items():
+        print(f"{name:<18}{total / args.edits * 1e3:>10.2f} ms per edit")
+
+
+if __name__ == "__main__":
+    main()
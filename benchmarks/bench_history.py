@@ -0,0 +1,94 @@
+"""Compare full-snapshot undo with patch-based History.
+
+    python -m benchmarks.bench_history --size 10000 --depth 50
+
+Transact timings include tracemalloc overhead for both engines.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_tree
+from src.engine.tree_ops import set_prop, walk
+from src.state.app_state import AppState
+from src.state.project_state import ProjectState
+from src.utils.serializer import project_from_dict, project_to_dict
+
+
+class SnapshotState:
+    """The previous AppState: project_to_dict before every edit."""
+
+    def __init__(self, project: ProjectState, limit: int = 50):
+        self.project = project
+        self.limit = limit
+        self._undo: list[dict] = []
+        self._redo: list[dict] = []
+
+    def transact(self, fn) -> None:
+        self._undo.append(project_to_dict(self.project))
+        if len(self._undo) > self.limit:
+            self._undo.pop(0)
+        fn(self.project)
+        self._redo.clear()
+
+    def undo(self) -> None:
+        self._redo.append(project_to_dict(self.project))
+        self.project = project_from_dict(self._undo.pop())
+
+    def redo(self) -> None:
+        self._undo.append(project_to_dict(self.project))
+        self.project = project_from_dict(self._redo.pop())
+
+
+def _run(state, ids: list[str], depth: int) -> dict[str, float]:
+    def edit(i: int):
+        nid = ids[i]
+        return lambda p: set_prop(p.tree, nid, "value", f"edit {i}", tree_index=p.index)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for i in range(depth):
+        state.transact(edit(i))
+    transact = (time.perf_counter() - start) / depth
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(depth):
+        state.undo()
+    undo = (time.perf_counter() - start) / depth
+    start = time.perf_counter()
+    for _ in range(depth):
+        state.redo()
+    redo = (time.perf_counter() - start) / depth
+    return {"transact": transact, "undo": undo, "redo": redo, "retained": retained}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--depth", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    results = {}
+    for name, factory in (("snapshot", SnapshotState), ("patch", AppState)):
+        project = ProjectState(name="bench", tree=make_tree(args.size))
+        leaves = [n.id for n in walk(project.tree) if n.type == "Text"]
+        ids = [rng.choice(leaves) for _ in range(args.depth)]
+        project.index  # build outside the timed region
+        results[name] = _run(factory(project, args.depth), ids, args.depth)
+
+    print(f"tree: {args.size} nodes, history depth {args.depth}")
+    print(f"{'engine':<10}{'transact':>12}{'undo':>12}{'redo':>12}{'retained':>14}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['transact'] * 1e3:>10.3f}ms{r['undo'] * 1e3:>10.3f}ms"
+              f"{r['redo'] * 1e3:>10.3f}ms{r['retained'] / 1024:>11.0f}KiB")
+
+
+if __name__ == "__main__":
+    main()
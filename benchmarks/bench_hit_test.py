@@ -0,0 +1,102 @@
+"""Hit throughput of the grid-indexed HitTestEngine vs a linear reversed scan.
+
+    python -m benchmarks.bench_hit_test --sizes 1000 10000 100000
+
+Boxes are laid out like canvas blocks: each node's box is indented by
+depth and tall enough to cover its subtree, registered parent first.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import make_tree
+from src.engine.hit_test import HitBox, HitTestEngine
+from src.models.widget_node import WidgetNode
+
+_ROW = 28.0
+_WIDTH = 1200.0
+_INDENT = 12.0
+
+
+class LinearHitTest:
+    """The pre-index engine: scan every box in reverse registration order."""
+
+    def __init__(self, boxes: list[HitBox]) -> None:
+        self._boxes = boxes
+
+    def hit(self, x: float, y: float) -> HitBox | None:
+        for box in reversed(self._boxes):
+            if box.x <= x <= box.x + box.w and box.y <= y <= box.y + box.h:
+                return box
+        return None
+
+
+def layout(root: WidgetNode) -> list[HitBox]:
+    """Canvas-like boxes for the tree under *root*, parent first."""
+    boxes: list[HitBox] = []
+    y = 0.0
+    stack = [(root, 0, False)]
+    open_boxes: dict[str, HitBox] = {}
+    while stack:
+        node, depth, done = stack.pop()
+        if done:
+            box = open_boxes.pop(node.id)
+            box.h = y - box.y
+            continue
+        box = HitBox(node.id, node.slot, depth * _INDENT, y, _WIDTH - depth * 2 * _INDENT,
+                     _ROW, accepts_children=bool(node.children))
+        boxes.append(box)
+        y += _ROW
+        if node.children:
+            open_boxes[node.id] = box
+            stack.append((node, depth, True))
+            stack.extend((c, depth + 1, False) for c in reversed(node.children))
+    return boxes
+
+
+def _throughput(hit, points) -> float:
+    start = time.perf_counter()
+    for x, y in points:
+        hit(x, y)
+    return len(points) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--points", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    print(f"{'boxes':>8}{'build ms':>10}{'linear hits/s':>16}{'grid hits/s':>14}{'update us':>11}")
+    for size in args.sizes:
+        boxes = layout(make_tree(size))
+        height = max(b.y + b.h for b in boxes)
+        points = [(rnd.uniform(0, _WIDTH), rnd.uniform(0, height)) for _ in range(args.points)]
+
+        engine = HitTestEngine()
+        start = time.perf_counter()
+        engine.build(boxes)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        linear = LinearHitTest(boxes)
+        for x, y in points[:100]:
+            found = engine.hit(x, y)
+            assert (found.box if found else None) is linear.hit(x, y)
+
+        linear_rate = _throughput(linear.hit, points[: max(50, args.points * 1000 // size)])
+        grid_rate = _throughput(engine.hit, points)
+
+        leaves = [b for b in boxes if not b.accepts_children][:1000]
+        start = time.perf_counter()
+        for box in leaves:
+            engine.update(HitBox(box.node_id, box.slot, box.x + 1, box.y, box.w, box.h))
+        update_us = (time.perf_counter() - start) / len(leaves) * 1e6
+
+        print(f"{size:>8}{build_ms:>10.1f}{linear_rate:>16,.0f}{grid_rate:>14,.0f}{update_us:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Memory per node of a loaded tree.
+
+    python -m benchmarks.bench_memory --size 100000
+
+Loads one registry-based tree through each loader and reports the bytes
+it retains per node (tracemalloc), plus the average ``sys.getsizeof`` of
+a node, its props dict and its children list.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import make_registry_tree
+from src.engine.tree_ops import walk
+from src.state.project_state import ProjectState
+from src.utils.serializer import load_project, node_from_dict, save_project
+
+
+def _retained(fn) -> tuple[object, int]:
+    """Run *fn*; return its result and the bytes still allocated afterwards."""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained
+
+
+def _load_tree(path: Path):
+    return load_project(path).tree
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    project = ProjectState(name="bench", tree=make_registry_tree(args.size))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.fvb.json"
+        binary = Path(tmp) / "bench.fvb"
+        save_project(project, path)
+        save_project(project, binary)
+        text = path.read_text(encoding="utf-8")
+        loaders = {
+            "json.loads + node_from_dict": lambda: node_from_dict(json.loads(text)["tree"]),
+            "load_project (streamed)": lambda: load_project(path).tree,
+            "load_project (binary)": lambda: _load_tree(binary),
+        }
+        rows = []
+        for name, fn in loaders.items():
+            tree, retained = _retained(fn)
+            rows.append((name, retained, tree))
+
+    nodes = list(walk(rows[0][2]))
+    n = len(nodes)
+    print(f"tree: {n} nodes")
+    for name, retained, _ in rows:
+        print(f"{name:<30}{retained / n:>8.0f} B/node{retained / 2**20:>8.1f} MB")
+    for name, part in (("node", lambda x: x), ("props", lambda x: x.props),
+                       ("children", lambda x: x.children)):
+        print(f"{'sizeof ' + name:<30}{sum(sys.getsizeof(part(x)) for x in nodes) / n:>8.0f} B")
+
+
+if __name__ == "__main__":
+    main()
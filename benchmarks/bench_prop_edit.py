@@ -0,0 +1,79 @@
+"""Keystroke-to-paint latency of typing into a property field.
+
+    python -m benchmarks.bench_prop_edit --size 20000 --chars 30
+
+"rebuild" is the old path: one undo step per keystroke and every Design tab
+panel rebuilt from scratch.  "coalesced" merges the keystrokes into one
+undo step and patches only the rows the dirty ids reach.  Panels run
+headless, so "paint" is the point where controls are ready to send.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from benchmarks.synthetic import make_tree
+from src.engine.tree_ops import set_prop
+from src.state.app_state import AppState
+from src.state.events import TREE_KINDS
+from src.state.project_state import ProjectState
+from src.ui.canvas import CanvasPanel
+from src.ui.properties import PropertiesPanel
+from src.ui.tree_view import TreeViewPanel
+
+
+def _run(size: int, chars: int, coalesce: bool) -> tuple[list[float], int]:
+    state = AppState(ProjectState(name="bench", tree=make_tree(size)), history_limit=1000)
+    project = state.project
+    node_id = "n1"
+    project.selected_node_id = node_id
+    dirty = state.dirty_set(TREE_KINDS)
+    noop = lambda *a: None  # noqa: E731
+    canvas = CanvasPanel(noop, noop, noop, noop, noop)
+    tree_view = TreeViewPanel(noop)
+    props = PropertiesPanel(noop)
+
+    def paint(ids: set[str] | None) -> None:
+        root, index = project.tree, project.index
+        canvas.sync(root, node_id, ids, index)
+        tree_view.sync(root, node_id, ids, index)
+        props.sync(index.get(node_id))
+
+    paint(dirty.drain())
+    latencies = []
+    for i in range(1, chars + 1):
+        text = "x" * i
+        start = time.perf_counter()
+        state.transact(
+            lambda p: set_prop(p.tree, node_id, "tooltip", text, tree_index=p.index),
+            coalesce_key=(node_id, "tooltip") if coalesce else None,
+        )
+        if coalesce:
+            paint(dirty.drain())
+        else:
+            dirty.drain()
+            for panel in (canvas, tree_view, props):
+                panel.reset()
+            paint(None)
+        latencies.append(time.perf_counter() - start)
+    return latencies, len(state.history._undo)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--chars", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"tree: {args.size} nodes, typing {args.chars} characters")
+    print(f"{'path':<12}{'mean':>12}{'p95':>12}{'undo steps':>12}")
+    for name, coalesce in (("rebuild", False), ("coalesced", True)):
+        latencies, steps = _run(args.size, args.chars, coalesce)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{name:<12}{statistics.mean(latencies) * 1e3:>10.2f}ms"
+              f"{p95 * 1e3:>10.2f}ms{steps:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Per-node cost of registry lookups: nested dicts vs compiled WidgetSpecs.
+
+    python -m benchmarks.bench_registry --size 10000
+
+The "registry" rows re-implement the old ``WIDGET_REGISTRY[...]["props"]``
+lookups inline so both paths are measured on the same tree.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.synthetic import make_tree
+from src.engine.code_generator import _props_to_code
+from src.engine.tree_ops import walk
+from src.engine.validator import validate_tree
+from src.models.enum_map import ENUM_MAP
+from src.models.widget_registry import WIDGET_REGISTRY, defaults_for, enum_key_for
+
+
+def _registry_props_to_code(node) -> list[str]:
+    spec = WIDGET_REGISTRY[node.type]
+    defaults = {k: v["default"] for k, v in spec["props"].items()}
+    pairs: list[str] = []
+    for key, value in node.props.items():
+        if key not in spec["props"] or (key in defaults and value == defaults[key]):
+            continue
+        pdef = spec["props"][key]
+        if pdef["type"] == "event":
+            if value:
+                pairs.append(f"{key}={value}")
+            continue
+        enum_key = enum_key_for(node.type, key) if pdef["type"] == "enum" else None
+        if isinstance(value, str) and enum_key in ENUM_MAP and value in ENUM_MAP[enum_key]:
+            pairs.append(f"{key}={ENUM_MAP[enum_key][value]}")
+        else:
+            pairs.append(f"{key}={value!r}")
+    return pairs
+
+
+def _registry_validate(node) -> None:
+    spec = WIDGET_REGISTRY[node.type]
+    for key, value in node.props.items():
+        pdef = spec["props"][key]
+        if pdef["type"] == "enum" and value is not None and value not in pdef["options"]:
+            raise ValueError(key)
+    slots = spec["children"]
+    names = {s["slot"] for s in slots}
+    for child in node.children:
+        if (child.slot or slots[0]["slot"]) not in names:
+            raise ValueError(child.id)
+    for child in node.children:
+        _registry_validate(child)
+
+
+def _per_node(fn, nodes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for node in nodes:
+            fn(node)
+    return (time.perf_counter() - start) / (repeat * len(nodes)) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    root = make_tree(args.size)
+    nodes = list(walk(root))
+    for node in nodes:
+        # Fill every prop so lookups are exercised, then tweak a few.
+        node.props = {**defaults_for(node.type), **node.props}
+        if node.type == "Column":
+            node.props["alignment"] = "center"
+        else:
+            node.props["weight"] = "bold"
+
+    rows = [
+        ("props_to_code (registry)", _per_node(_registry_props_to_code, nodes, args.repeat)),
+        ("props_to_code (spec)", _per_node(_props_to_code, nodes, args.repeat)),
+        ("validate (registry)", _per_node(_registry_validate, [root], args.repeat) / len(nodes)),
+        ("validate (spec)", _per_node(validate_tree, [root], args.repeat) / len(nodes)),
+    ]
+    print(f"tree: {args.size} nodes")
+    for name, ns in rows:
+        print(f"{name:<28}{ns:>10.0f} ns per node")
+
+
+if __name__ == "__main__":
+    main()
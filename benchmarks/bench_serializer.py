@@ -0,0 +1,71 @@
+"""Save/load time and peak memory: json.dumps/json.loads vs streaming vs binary.
+
+    python -m benchmarks.bench_serializer --size 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import make_tree
+from src.state.project_state import ProjectState
+from src.utils.serializer import load_project, project_from_dict, project_to_dict, save_project
+
+
+def _dump_save(project: ProjectState, path: Path) -> None:
+    path.write_text(json.dumps(project_to_dict(project), indent=2), encoding="utf-8")
+
+
+def _dump_load(path: Path) -> ProjectState:
+    return project_from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+def _measure(fn, *args) -> tuple[float, float]:
+    """Return (ms, peak MB allocated while running *fn*).
+
+    Timed and traced in separate runs; tracemalloc slows allocation down.
+    """
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1e3, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    project = ProjectState(name="bench", tree=make_tree(args.size))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.fvb.json"
+        rows = [
+            ("save json.dumps(indent=2)", _measure(_dump_save, project, path)),
+            ("save streamed (indent=2)", _measure(save_project, project, path)),
+            ("load json.loads", _measure(_dump_load, path)),
+            ("load streamed", _measure(load_project, path)),
+            ("save streamed (compact)", _measure(lambda: save_project(project, path, indent=None))),
+            ("load streamed (compact)", _measure(load_project, path)),
+        ]
+        compact_mb = path.stat().st_size / 2**20
+        binary = Path(tmp) / "bench.fvb"
+        rows += [
+            ("save binary", _measure(save_project, project, binary)),
+            ("load binary", _measure(load_project, binary)),
+        ]
+        print(f"tree: {args.size} nodes, compact JSON {compact_mb:.1f} MB, "
+              f"binary {binary.stat().st_size / 2**20:.1f} MB")
+    for name, (ms, peak) in rows:
+        print(f"{name:<28}{ms:>10.1f} ms{peak:>10.1f} MB peak")
+
+
+if __name__ == "__main__":
+    main()
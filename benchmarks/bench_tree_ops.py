@@ -0,0 +1,51 @@
+"""Compare walk-based and indexed tree_ops lookups.
+
+    python -m benchmarks.bench_tree_ops --size 10000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import make_tree
+from src.engine.tree_index import TreeIndex
+from src.engine.tree_ops import find_node, find_parent, is_ancestor, walk
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    root = make_tree(args.size)
+    ids = [n.id for n in walk(root)]
+    rng = random.Random(0)
+    sample = [rng.choice(ids) for _ in range(args.lookups)]
+
+    build = _time(lambda: TreeIndex(root), 3)
+    index = TreeIndex(root)
+    print(f"tree: {len(ids)} nodes, index build {build * 1e3:.2f} ms")
+
+    cases = {
+        "find_node": lambda ti: [find_node(root, i, tree_index=ti) for i in sample],
+        "find_parent": lambda ti: [find_parent(root, i, tree_index=ti) for i in sample],
+        "is_ancestor": lambda ti: [is_ancestor(root, "n1", i, tree_index=ti) for i in sample],
+    }
+    print(f"{'op':<14}{'walk (us)':>14}{'indexed (us)':>16}{'speedup':>10}")
+    for name, run in cases.items():
+        slow = _time(lambda: run(None), 1) / len(sample)
+        fast = _time(lambda: run(index), 20) / len(sample)
+        print(f"{name:<14}{slow * 1e6:>14.1f}{fast * 1e6:>16.2f}{slow / fast:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Full vs incremental validation after a single prop edit.
+
+    python -m benchmarks.bench_validator --size 100000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.synthetic import make_tree
+from src.engine.tree_ops import set_prop
+from src.engine.validator import Validator, validate_all
+from src.state.app_state import AppState
+from src.state.events import TREE_KINDS
+from src.state.project_state import ProjectState
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+
+    state = AppState(ProjectState(name="bench", tree=make_tree(args.size)))
+    dirty = state.dirty_set(TREE_KINDS)
+    validator = Validator()
+    project = state.project
+
+    start = time.perf_counter()
+    validator.validate(project.tree, dirty.drain(), project.index)
+    print(f"tree: {args.size} nodes, cold validate {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    timings = {"validate_all": 0.0, "Validator (dirty ids)": 0.0}
+    leaf = f"n{args.size - 1}"
+    for i in range(args.edits):
+        weight = "bold" if i % 2 else "heavy"  # alternate valid / invalid
+        state.transact(lambda p: set_prop(p.tree, leaf, "weight", weight, tree_index=p.index))
+        for name, run in (
+            ("validate_all", lambda: validate_all(project.tree)),
+            ("Validator (dirty ids)", lambda: validator.validate(
+                project.tree, dirty.drain(), project.index)),
+        ):
+            start = time.perf_counter()
+            run()
+            timings[name] += time.perf_counter() - start
+
+    for name, total in timings.items():
+        print(f"{name:<24}{total / args.edits * 1e3:>10.3f} ms per edit")
+
+
+if __name__ == "__main__":
+    main()
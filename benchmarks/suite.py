@@ -0,0 +1,292 @@
+"""Benchmark suite for the core engine, with baseline regression checks.
+
+    python -m benchmarks.suite --size 5000 --depth 8 --fanout 6
+    python -m benchmarks.suite --json results.json --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --update-baseline benchmarks/baseline.json
+
+Every case runs on a tree from :func:`make_registry_tree` and reports the
+median and best seconds per call over ``--repeat`` runs.  Results are
+printed as a table and optionally written as JSON.  With ``--baseline``, a
+case whose median is more than ``--tolerance`` slower than the stored
+median is a regression and the exit status is 1.  Baselines are only
+comparable on the same machine and with the same tree parameters.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks.bench_hit_test import layout
+from benchmarks.synthetic import make_registry_tree
+from src.engine.code_generator import generate_code
+from src.engine.hit_test import HitTestEngine
+from src.engine.tree_ops import (
+    delete_node, delete_nodes, duplicate_nodes, find_node, insert_child, insert_children,
+    move_node, set_prop, walk,
+)
+from src.engine.validator import validate_tree
+from src.models.widget_node import WidgetNode
+from src.state.app_state import AppState
+from src.state.project_state import ProjectState
+from src.utils.serializer import load_project, project_from_dict, project_to_dict, save_project
+
+SCHEMA = 1
+
+# A case gets (tree, rng, scratch dir), is set up once per run and returns
+# (timed callable, calls per invocation).
+Case = Callable[[WidgetNode, random.Random, Path], tuple[Callable[[], object], int]]
+
+
+def _project(root: WidgetNode) -> ProjectState:
+    return ProjectState(name="bench", tree=root)
+
+
+def _inner_and_leaves(root: WidgetNode) -> tuple[list[str], list[str]]:
+    nodes = list(walk(root))
+    inner = [n.id for n in nodes if n.type in ("Column", "Row", "ListView")]
+    leaves = [n.id for n in nodes if not n.children and n.id != root.id]
+    return inner, leaves
+
+
+def _tree_ops_find(root, rng, tmp):
+    project = _project(root)
+    ids = [n.id for n in walk(root)]
+    sample = [rng.choice(ids) for _ in range(1000)]
+    index = project.index
+    return lambda: [find_node(root, i, tree_index=index) for i in sample], len(sample)
+
+
+def _tree_ops_insert_delete(root, rng, tmp):
+    project = _project(root)
+    inner, _ = _inner_and_leaves(root)
+    parents = [project.index.get(rng.choice(inner)) for _ in range(200)]
+
+    def run():
+        for i, parent in enumerate(parents):
+            insert_child(parent, WidgetNode(id=f"bench-{i}", type="Text"), index=0,
+                         slot="controls", tree_index=project.index)
+        for i in range(len(parents)):
+            delete_node(root, f"bench-{i}", tree_index=project.index)
+    return run, 2 * len(parents)
+
+
+def _tree_ops_move(root, rng, tmp):
+    project = _project(root)
+    inner, leaves = _inner_and_leaves(root)
+    moves = [(rng.choice(leaves), rng.choice(inner)) for _ in range(200)]
+    return lambda: [move_node(root, leaf, target, index=0, slot="controls",
+                              tree_index=project.index) for leaf, target in moves], len(moves)
+
+
+def _validate_tree(root, rng, tmp):
+    return lambda: validate_tree(root), 1
+
+
+def _generate_code(root, rng, tmp):
+    return lambda: generate_code(root), 1
+
+
+def _project_to_dict(root, rng, tmp):
+    project = _project(root)
+    return lambda: project_to_dict(project), 1
+
+
+def _project_from_dict(root, rng, tmp):
+    data = project_to_dict(_project(root))
+    return lambda: project_from_dict(data), 1
+
+
+def _save_project(root, rng, tmp):
+    project = _project(root)
+    path = tmp / "bench.fvb.json"
+    return lambda: save_project(project, path), 1
+
+
+def _load_project(root, rng, tmp):
+    path = tmp / "bench.fvb.json"
+    save_project(_project(root), path)
+    return lambda: load_project(path), 1
+
+
+def _transact(root, rng, tmp):
+    state = AppState(_project(root), history_limit=1000)
+    _, leaves = _inner_and_leaves(root)
+    sample = [rng.choice(leaves) for _ in range(200)]
+
+    def run():
+        for i, node_id in enumerate(sample):
+            state.transact(lambda p: set_prop(p.tree, node_id, "tooltip", f"v{i}",
+                                              tree_index=p.index))
+    return run, len(sample)
+
+
+def _undo(root, rng, tmp):
+    state = AppState(_project(root), history_limit=1000)
+    _, leaves = _inner_and_leaves(root)
+    sample = [rng.choice(leaves) for _ in range(200)]
+
+    def run():
+        for i, node_id in enumerate(sample):
+            state.transact(lambda p: set_prop(p.tree, node_id, "tooltip", f"v{i}",
+                                              tree_index=p.index))
+        start = time.perf_counter()
+        while state.can_undo:
+            state.undo()
+        return time.perf_counter() - start  # only the undos are timed
+    return run, len(sample)
+
+
+def _batch(root, rng, tmp):
+    state = AppState(_project(root), history_limit=1000)
+    inner, _ = _inner_and_leaves(root)
+    parent = state.project.index.get(rng.choice(inner))
+    ids = [f"bench-{i}" for i in range(200)]
+
+    def run():
+        with state.batch() as p:
+            insert_children(parent, [WidgetNode(id=i, type="Text") for i in ids], index=0,
+                            slot="controls", tree_index=p.index)
+        with state.batch() as p:
+            delete_nodes(p.tree, ids, tree_index=p.index)
+    return run, 2 * len(ids)
+
+
+def _duplicate(root, rng, tmp):
+    project = _project(root)
+    inner, _ = _inner_and_leaves(root)
+    node_id = rng.choice([i for i in inner if i != root.id])
+    size = sum(1 for _ in walk(project.index.get(node_id)))
+
+    def run():
+        copies = duplicate_nodes(root, [node_id], tree_index=project.index)
+        delete_nodes(root, [c.id for c in copies], tree_index=project.index)
+    return run, size
+
+
+def _hit_test(root, rng, tmp):
+    boxes = layout(root)
+    engine = HitTestEngine()
+    engine.build(boxes)
+    height = max(b.y + b.h for b in boxes)
+    points = [(rng.uniform(0, 1200), rng.uniform(0, height)) for _ in range(5000)]
+    return lambda: [engine.hit(x, y) for x, y in points], len(points)
+
+
+CASES: dict[str, Case] = {
+    "tree_ops.find_node": _tree_ops_find,
+    "tree_ops.insert_delete": _tree_ops_insert_delete,
+    "tree_ops.move_node": _tree_ops_move,
+    "validate_tree": _validate_tree,
+    "generate_code": _generate_code,
+    "project_to_dict": _project_to_dict,
+    "project_from_dict": _project_from_dict,
+    "save_project": _save_project,
+    "load_project": _load_project,
+    "AppState.transact": _transact,
+    "AppState.undo": _undo,
+    "AppState.batch": _batch,
+    "tree_ops.duplicate": _duplicate,
+    "HitTestEngine.hit": _hit_test,
+}
+
+
+def run_suite(
+    size: int, depth: int, fanout: int, repeat: int = 5,
+    cases: list[str] | None = None,
+) -> dict:
+    """Time every case and return the results document."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in cases or CASES:
+            timings = []
+            for r in range(repeat):
+                # Fresh tree per run: several cases mutate it.
+                root = make_registry_tree(size, depth, fanout)
+                fn, calls = CASES[name](root, random.Random(r), Path(tmp))
+                start = time.perf_counter()
+                measured = fn()
+                elapsed = time.perf_counter() - start
+                if isinstance(measured, float):  # the case timed itself
+                    elapsed = measured
+                timings.append(elapsed / calls)
+            results[name] = {"median_s": statistics.median(timings), "min_s": min(timings)}
+    return {
+        "schema": SCHEMA,
+        "params": {"size": size, "depth": depth, "fanout": fanout, "repeat": repeat},
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[tuple[str, float, bool]]:
+    """Return ``(case, current / baseline median, regressed)`` for shared cases."""
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base["median_s"]:
+            continue
+        ratio = result["median_s"] / base["median_s"]
+        rows.append((name, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=5_000)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--case", action="append", choices=sorted(CASES),
+                        help="run only this case (repeatable)")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="allowed slowdown vs baseline (0.3 = 30%%)")
+    parser.add_argument("--update-baseline", type=Path, metavar="PATH",
+                        help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.size, args.depth, args.fanout, args.repeat, args.case)
+    text = json.dumps(current, indent=2)
+    for path in (args.json, args.update_baseline):
+        if path is not None:
+            path.write_text(text + "\n", encoding="utf-8")
+
+    ratios: dict[str, tuple[float, bool]] = {}
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("params", {}) | {"repeat": 0} != current["params"] | {"repeat": 0}:
+            print(f"warning: baseline params {baseline.get('params')} differ from "
+                  f"{current['params']}", file=sys.stderr)
+        ratios = {n: (r, bad) for n, r, bad in compare(current, baseline, args.tolerance)}
+
+    p = current["params"]
+    print(f"tree: {p['size']} nodes, depth {p['depth']}, fanout {p['fanout']}, "
+          f"{p['repeat']} runs")
+    print(f"{'case':<26}{'median':>12}{'best':>12}{'vs base':>10}")
+    for name, r in current["results"].items():
+        line = f"{name:<26}{r['median_s'] * 1e6:>10.1f}us{r['min_s'] * 1e6:>10.1f}us"
+        if name in ratios:
+            ratio, bad = ratios[name]
+            line += f"{ratio:>9.2f}x" + ("  REGRESSION" if bad else "")
+        print(line)
+    regressed = [n for n, (_, bad) in ratios.items() if bad]
+    if regressed:
+        print(f"{len(regressed)} regression(s) beyond {args.tolerance:.0%}: "
+              + ", ".join(regressed), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Synthetic widget trees for benchmarks."""
+from __future__ import annotations
+
+import random
+from collections import deque
+
+from src.models.widget_node import WidgetNode
+from src.models.widget_registry import WIDGET_REGISTRY, WIDGET_SPECS, defaults_for
+
+# Registry types that take any number of children vs. none at all.
+_LAYOUT_TYPES = sorted(t for t, s in WIDGET_SPECS.items()
+                       if s.default_slot and s.slot_max.get(s.default_slot) is None)
+_LEAF_TYPES = sorted(t for t in WIDGET_REGISTRY if not WIDGET_SPECS[t].slots)
+
+
+def make_tree(size: int, fanout: int = 8) -> WidgetNode:
+    """Build a breadth-first tree of *size* nodes.
+
+    Inner nodes are Columns holding up to *fanout* children; leaves are Text.
+    Ids are deterministic (``n0``, ``n1``, ...) so runs are comparable.
+    """
+    root = WidgetNode(id="n0", type="Column")
+    queue: deque[WidgetNode] = deque([root])
+    count = 1
+    while count < size:
+        parent = queue.popleft()
+        for _ in range(min(fanout, size - count)):
+            is_leaf = count * fanout >= size
+            child = WidgetNode(
+                id=f"n{count}",
+                type="Text" if is_leaf else "Column",
+                props={"value": f"Item {count}"} if is_leaf else {},
+                parent_id=parent.id,
+                order=len(parent.children),
+                slot="controls",
+            )
+            parent.children.append(child)
+            queue.append(child)
+            count += 1
+    return root
+
+
+def make_registry_tree(
+    size: int, depth: int = 8, fanout: int = 6, seed: int = 0,
+) -> WidgetNode:
+    """Build a valid tree of up to *size* nodes from registry widget types.
+
+    Breadth-first like :func:`make_tree`: inner nodes are random layout
+    types (Column, Row, ListView) with up to *fanout* children, leaves are
+    random childless widgets with their registry defaults, and no branch is
+    deeper than *depth* levels.  When *depth* and *fanout* cannot hold
+    *size* nodes the tree is as large as they allow.  The same arguments
+    always give the same tree.
+    """
+    rng = random.Random(seed)
+    root = WidgetNode(id="n0", type="Column")
+    queue: deque[tuple[WidgetNode, int]] = deque([(root, 1)])
+    count = 1
+    while count < size and queue:
+        parent, level = queue.popleft()
+        for _ in range(min(fanout, size - count)):
+            is_leaf = level + 1 >= depth or count * fanout >= size
+            node_type = rng.choice(_LEAF_TYPES if is_leaf else _LAYOUT_TYPES)
+            child = WidgetNode(
+                id=f"n{count}",
+                type=node_type,
+                props=dict(defaults_for(node_type)),
+                parent_id=parent.id,
+                order=len(parent.children),
+                slot=WIDGET_SPECS[parent.type].default_slot,
+            )
+            if node_type == "Text":
+                child.props["value"] = f"Item {count}"
+            parent.children.append(child)
+            if not is_leaf:
+                queue.append((child, level + 1))
+            count += 1
+    return root
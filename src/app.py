@@ -1,27 +1,42 @@
 """Flet Visual Builder — main application."""
 from __future__ import annotations
 
+import functools
+import os
+import threading
+from pathlib import Path
+
 import flet as ft
 
+from src.engine.background import BackgroundCompiler, CompileResult
+from src.engine.code_generator import write_code
+from src.engine.snapshot import Snapshotter
 from src.engine.tree_ops import (
-    delete_node, find_node, find_parent, insert_child,
-    reorder_sibling, wrap_node,
+    copy_nodes, delete_node, delete_nodes, duplicate_nodes, find_node, find_parent,
+    insert_child, insert_children, reorder_sibling, set_props, wrap_node,
 )
+from src.models.component import ComponentDef, is_instance, make_component, make_instance, resolve
 from src.models.widget_node import WidgetNode
 from src.models.widget_registry import (
-    WIDGET_REGISTRY, accepts_children, default_slot, defaults_for,
+    WIDGET_REGISTRY, accepts_children, default_slot, defaults_for, spec_for,
 )
 from src.state.app_state import AppState
+from src.state.events import TREE_KINDS, ChangeKind
 from src.state.project_state import ProjectState
-from src.ui.canvas import build_canvas
-from src.ui.code_preview import build_code_preview
-from src.ui.live_preview import build_live_preview
+from src.state.selection import adjacent_node
+from src.ui.canvas import CanvasPanel
+from src.ui.code_preview import CodePreviewPanel
+from src.ui.live_preview import LivePreviewPanel
 from src.ui.palette import build_palette
-from src.ui.properties import build_properties
+from src.ui.properties import PropertiesPanel
+from src.ui.reconciler import patch
 from src.ui.toolbar import build_toolbar
-from src.ui.tree_view import build_tree_view
-from src.utils.id_generator import new_id
-from src.utils.serializer import save_project, load_project
+from src.ui.tree_view import TreeViewPanel
+from src.utils.debounce import Debouncer
+from src.utils.id_generator import IdAllocator, new_id
+from src.utils.journal import Journal
+from src.utils.profiling import profiler
+from src.utils.serializer import BINARY_SUFFIX, load_project
 
 
 def _initial_project() -> ProjectState:
@@ -44,6 +59,18 @@ def _initial_project() -> ProjectState:
     return ProjectState(name="My App", tree=root)
 
 
+def _has_prop(
+    node: WidgetNode | None, prop_name: str, components: dict[str, ComponentDef],
+) -> bool:
+    if node is None:
+        return False
+    if is_instance(node):
+        definition = resolve(node, components)
+        return definition is not None and prop_name in definition.params
+    spec = spec_for(node.type)
+    return spec is not None and prop_name in spec.props
+
+
 def _show_snack(page: ft.Page, message: str, color: str = "#4caf50"):
     """Show a snackbar message."""
     sb = ft.SnackBar(content=ft.Text(message, color="white"), bgcolor=color)
@@ -60,122 +87,343 @@ def main(page: ft.Page) -> None:
 
     state = AppState(project=_initial_project())
     current_tab = [0]  # mutable container: 0=Design, 1=Preview, 2=Code
+    journal: list[Journal | None] = [None]  # autosave target once saved/loaded
+    clipboard: list[WidgetNode] = []  # detached copies from the last copy
 
     # ─── Helpers ───────────────────────────────────────────────
 
-    def get_selected() -> WidgetNode | None:
-        sid = state.project.selected_node_id
-        return find_node(state.project.tree, sid) if sid else None
-
-    # ─── Rebuild ───────────────────────────────────────────────
+    def save_to(path: str):
+        """Snapshot the project to *path* and journal every later edit there."""
+        if journal[0] is not None and journal[0].path.resolve() == Path(path).resolve():
+            journal[0].compact(state.project)
+            return
+        target = Journal(path)
+        target.compact(state.project)
+        journal_to(target)
+
+    def journal_to(target: Journal | None):
+        """Make *target* (already opened) the autosave journal."""
+        if journal[0] is not None:
+            journal[0].close()
+        journal[0] = target
+        if target is not None:
+            target.attach(state)
 
-    def rebuild():
+    def get_selected() -> WidgetNode | None:
+        proj = state.project
+        sid = proj.selected_node_id
+        return find_node(proj.tree, sid, tree_index=proj.index) if sid else None
+
+    def selected_component(node: WidgetNode | None) -> ComponentDef | None:
+        if node is None or not is_instance(node):
+            return None
+        return resolve(node, state.project.components)
+
+    # ─── Refresh ───────────────────────────────────────────────
+    # Panels keep their Flet controls between actions and patch only what
+    # changed; see src/ui/reconciler.py.
+
+    toolbar_key: list[tuple | None] = [None]
+    shown_tab: list[int | None] = [None]  # which tab tab_body was built for
+    design_dirty = state.dirty_set(TREE_KINDS)
+    tab_dirty = state.dirty_set(TREE_KINDS | {ChangeKind.PROJECT_CHANGED})
+    code_dirty = state.dirty_set(TREE_KINDS)  # feeds snapshots for the compiler
+    snapshotter = Snapshotter()
+
+    def on_compiled(result: CompileResult):
+        # Worker thread: paint only if the Code tab is up.
+        if current_tab[0] == 2:
+            code_panel.show(result)
+
+    def on_preview(generation: int, head: str):
+        if current_tab[0] == 2:
+            code_panel.show_preview(generation, head)
+
+    compiler = BackgroundCompiler(on_ready=on_compiled, on_preview=on_preview)
+
+    # Debounced refreshes run on a timer thread; this keeps them from
+    # overlapping a handler's edit or refresh.
+    refresh_lock = threading.RLock()
+
+    def locked(fn):
+        """Run handler *fn* under ``refresh_lock``."""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with refresh_lock:
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def refresh():
+        if state.batching:
+            return  # handlers inside a state.batch(); the batch's owner refreshes once
+        idle_refresh.cancel()  # this refresh covers whatever it was waiting for
+        with refresh_lock:
+            with profiler.span("refresh"):
+                _refresh()
+            flush_journal()
+
+    # Typing in a property field refreshes (canvas, compile, journal
+    # sync) once the keystrokes stop, not once per keystroke.
+    idle_refresh = Debouncer(refresh, delay=0.15)
+
+    def flush_journal():
+        """Sync the edits journaled since the last refresh, once."""
+        if journal[0] is None:
+            return
+        try:
+            with profiler.span("journal.flush"):
+                journal[0].flush()
+        except OSError as ex:
+            journal[0].close()
+            journal[0] = None
+            _show_snack(page, f"Autosave off: {ex}", "#d32f2f")
+
+    def _refresh():
         proj = state.project
         root = proj.tree
-        selected = get_selected()
-
-        toolbar = build_toolbar(
-            project_name=proj.name,
-            on_undo=do_undo, on_redo=do_redo,
-            on_save=do_save, on_load=do_load,
-            on_tab_change=do_tab_change,
-            current_tab=current_tab[0],
-            can_undo=bool(state._undo_stack),
-            can_redo=bool(state._redo_stack),
-        )
+
+        key = (proj.name, current_tab[0], state.can_undo, state.can_redo)
+        if key != toolbar_key[0]:
+            toolbar_key[0] = key
+            with profiler.span("build_toolbar"):
+                toolbar_holder.content = build_toolbar(
+                    project_name=proj.name,
+                    on_undo=do_undo, on_redo=do_redo,
+                    on_save=do_save, on_load=do_load,
+                    on_tab_change=do_tab_change,
+                    current_tab=current_tab[0],
+                    can_undo=state.can_undo,
+                    can_redo=state.can_redo,
+                )
+            patch(toolbar_holder)
 
         tab = current_tab[0]
         if tab == 0:
-            palette = build_palette(on_add_widget=do_add_widget)
-            canvas = build_canvas(
-                root=root, selected_id=proj.selected_node_id,
-                on_select=do_select, on_delete=do_delete,
-                on_move_up=do_move_up, on_move_down=do_move_down,
-                on_wrap=do_wrap,
-            )
-            tree_view = build_tree_view(
-                root=root, selected_id=proj.selected_node_id,
-                on_select=do_select,
-            )
-            props_panel = build_properties(node=selected, on_prop_change=do_prop_change)
-
-            left_col = ft.Column(controls=[
-                ft.Container(content=palette, expand=3),
-                ft.Container(content=tree_view, expand=2),
-            ], expand=True, spacing=0)
-
-            body = ft.Row(controls=[
-                ft.Container(content=left_col, width=200),
-                ft.Container(content=canvas, expand=True),
-                ft.Container(content=props_panel, width=260),
-            ], expand=True, spacing=0)
-
-        elif tab == 1:
-            body = build_live_preview(root=root, theme=proj.theme)
-        else:
-            body = build_code_preview(root=root, on_copy=do_copy_code, on_export=do_export_code)
-
-        page.controls.clear()
-        page.add(ft.Column(controls=[toolbar, body], expand=True, spacing=0))
-        page.update()
+            dirty = design_dirty.drain()
+            with profiler.span("canvas.sync"):
+                canvas.sync(root, proj.selected_node_id, dirty, proj.index,
+                            selected_ids=state.selection)
+            with profiler.span("tree_view.sync"):
+                tree_view.sync(root, proj.selected_node_id, dirty, proj.index,
+                               selected_ids=state.selection)
+            with profiler.span("properties.sync"):
+                node = get_selected()
+                props_panel.sync(node, len(state.selection), selected_component(node))
+        elif tab_dirty or shown_tab[0] != tab:
+            # Selection changes never reach tab_dirty, so they skip this.
+            tab_dirty.drain()
+            shown_tab[0] = tab
+            if tab == 1:
+                with profiler.span("live_preview.sync"):
+                    live_preview.sync(root, proj.theme, proj.components)
+                if tab_body.content is not live_preview.control:
+                    tab_body.content = live_preview.control
+                    patch(tab_body)
+            elif tab_body.content is not code_panel.control:
+                tab_body.content = code_panel.control
+                patch(tab_body)
+
+        if design_body.visible != (tab == 0):
+            design_body.visible = tab == 0
+            tab_body.visible = tab != 0
+            patch(design_body, tab_body)
+
+        # Validation and codegen run on the worker from a frozen snapshot,
+        # on every tab, so the Code tab is ready by the time it is opened.
+        if code_dirty:
+            dirty = code_dirty.drain()
+            with profiler.span("snapshot"):
+                snapshot = snapshotter.snapshot(root, dirty, proj.index, proj.components)
+            compiler.submit(snapshot, dirty)
+        if tab == 2:
+            result = compiler.result()
+            if result is not None:
+                code_panel.show(result)
+            else:
+                code_panel.show_pending(compiler.generation)
 
     # ─── Handlers ──────────────────────────────────────────────
 
+    @profiler.traced("tab_change")
+    @locked
     def do_tab_change(index: int):
         current_tab[0] = index
-        rebuild()
+        refresh()
 
+    @profiler.traced("select")
+    @locked
     def do_select(node_id: str):
-        state.project.selected_node_id = node_id
-        rebuild()
-
+        state.select(node_id)
+        refresh()
+
+    @profiler.traced("select")
+    @locked
+    def do_toggle_select(node_id: str):
+        state.toggle_selected(node_id)
+        refresh()
+
+    @profiler.traced("select")
+    @locked
+    def do_extend_selection(step: int):
+        proj = state.project
+        sid = proj.selected_node_id
+        target = adjacent_node(proj.index, sid, step) if sid else None
+        if target is not None:
+            state.select_range(target.id)
+            refresh()
+
+    @profiler.traced("add")
+    @locked
     def do_add_widget(widget_type: str):
         def _add(proj: ProjectState):
             new_node = WidgetNode(
                 id=new_id(widget_type.lower()), type=widget_type,
                 props=dict(defaults_for(widget_type)),
             )
+            index = proj.index
             target_id = proj.selected_node_id or proj.tree.id
-            target = find_node(proj.tree, target_id) or proj.tree
+            target = find_node(proj.tree, target_id, tree_index=index) or proj.tree
 
             if accepts_children(target.type):
-                insert_child(target, new_node, slot=default_slot(target.type))
+                insert_child(target, new_node, slot=default_slot(target.type),
+                             tree_index=index)
             else:
-                parent = find_parent(proj.tree, target.id)
+                parent = find_parent(proj.tree, target.id, tree_index=index)
                 if parent:
-                    idx = next((i for i, c in enumerate(parent.children)
-                                if c.id == target.id), len(parent.children) - 1)
-                    insert_child(parent, new_node, index=idx + 1, slot=target.slot)
+                    idx = index.position_of(target.id)
+                    insert_child(parent, new_node, index=idx + 1, slot=target.slot,
+                                 tree_index=index)
                 else:
-                    insert_child(proj.tree, new_node, slot=default_slot(proj.tree.type))
+                    insert_child(proj.tree, new_node, slot=default_slot(proj.tree.type),
+                                 tree_index=index)
             proj.selected_node_id = new_node.id
 
         state.transact(_add)
-        rebuild()
+        refresh()
 
+    @profiler.traced("delete")
+    @locked
     def do_delete():
         sid = state.project.selected_node_id
-        if not sid or sid == state.project.tree.id:
+        ids = [i for i in state.selection if i != state.project.tree.id]
+        if not sid or not ids:
             return
         def _del(proj: ProjectState):
-            parent = find_parent(proj.tree, sid)
-            delete_node(proj.tree, sid)
+            parent = find_parent(proj.tree, sid, tree_index=proj.index)
+            delete_nodes(proj.tree, ids, tree_index=proj.index)
+            while parent is not None and parent.id not in proj.index:
+                parent = find_parent(proj.tree, parent.id, tree_index=proj.index)
             proj.selected_node_id = parent.id if parent else proj.tree.id
         state.transact(_del)
-        rebuild()
+        refresh()
+
+    @profiler.traced("copy")
+    @locked
+    def do_copy():
+        proj = state.project
+        copied = copy_nodes(proj.tree, state.selection.ids(), tree_index=proj.index)
+        if copied:
+            clipboard[:] = copied
+            _show_snack(page, f"Copied {len(copied)} widget(s)")
+
+    @profiler.traced("paste")
+    @locked
+    def do_paste():
+        if not clipboard:
+            return
+        pasted: list[WidgetNode] = []
 
+        def _paste(proj: ProjectState):
+            index = proj.index
+            ids = IdAllocator(index)
+            pasted[:] = [node.clone(ids=ids) for node in clipboard]
+            target_id = proj.selected_node_id or proj.tree.id
+            target = find_node(proj.tree, target_id, tree_index=index) or proj.tree
+
+            if accepts_children(target.type):
+                insert_children(target, pasted, slot=default_slot(target.type),
+                                tree_index=index)
+            else:
+                parent = find_parent(proj.tree, target.id, tree_index=index)
+                if parent:
+                    idx = index.position_of(target.id)
+                    insert_children(parent, pasted, index=idx + 1, slot=target.slot,
+                                    tree_index=index)
+                else:
+                    insert_children(proj.tree, pasted, slot=default_slot(proj.tree.type),
+                                    tree_index=index)
+            proj.selected_node_id = pasted[-1].id
+
+        state.transact(_paste)
+        state.select_many(n.id for n in pasted)
+        refresh()
+
+    @profiler.traced("duplicate")
+    @locked
+    def do_duplicate():
+        copies: list[WidgetNode] = []
+
+        def _dup(proj: ProjectState):
+            copies[:] = duplicate_nodes(proj.tree, state.selection.ids(),
+                                        tree_index=proj.index)
+            if copies:
+                proj.selected_node_id = copies[-1].id
+
+        state.transact(_dup)
+        if copies:
+            state.select_many(n.id for n in copies)
+        refresh()
+
+    @profiler.traced("make_component")
+    @locked
+    def do_make_component():
+        """Turn the selected subtree into a component and an instance of it."""
+        sid = state.project.selected_node_id
+        if not sid or sid == state.project.tree.id:
+            return
+
+        def _make(proj: ProjectState):
+            node = proj.index.get(sid)
+            if node is None or is_instance(node):
+                return
+            n = len(proj.components) + 1
+            while f"Component{n}" in proj.components:
+                n += 1
+            definition = make_component(f"Component{n}", node)
+            instance = make_instance(new_id("component"), definition)
+            parent = find_parent(proj.tree, sid, tree_index=proj.index)
+            position = proj.index.position_of(sid)
+            slot = node.slot
+            # Definitions are replaced, never mutated; see ProjectState.
+            proj.components = {**proj.components, definition.name: definition}
+            delete_node(proj.tree, sid, tree_index=proj.index)
+            insert_child(parent, instance, index=position, slot=slot,
+                         tree_index=proj.index)
+            proj.selected_node_id = instance.id
+
+        state.transact(_make)
+        refresh()
+
+    @profiler.traced("move")
+    @locked
     def do_move_up():
         sid = state.project.selected_node_id
         if sid:
-            state.transact(lambda proj: reorder_sibling(proj.tree, sid, -1))
-            rebuild()
+            state.transact(lambda proj: reorder_sibling(
+                proj.tree, sid, -1, tree_index=proj.index))
+            refresh()
 
+    @profiler.traced("move")
+    @locked
     def do_move_down():
         sid = state.project.selected_node_id
         if sid:
-            state.transact(lambda proj: reorder_sibling(proj.tree, sid, 1))
-            rebuild()
+            state.transact(lambda proj: reorder_sibling(
+                proj.tree, sid, 1, tree_index=proj.index))
+            refresh()
 
+    @profiler.traced("wrap")
+    @locked
     def do_wrap(wrapper_type: str):
         sid = state.project.selected_node_id
         if not sid or sid == state.project.tree.id:
@@ -186,72 +434,112 @@ def main(page: ft.Page) -> None:
                 props=dict(defaults_for(wrapper_type)),
             )
             ws = default_slot(wrapper_type) or "content"
-            wrap_node(proj.tree, sid, wrapper, wrapper_slot=ws)
+            wrap_node(proj.tree, sid, wrapper, wrapper_slot=ws, tree_index=proj.index)
             proj.selected_node_id = wrapper.id
         state.transact(_wrap)
-        rebuild()
+        refresh()
 
+    @profiler.traced("prop_change")
+    @locked
     def do_prop_change(prop_name: str, value):
-        sid = state.project.selected_node_id
-        if not sid:
+        proj = state.project
+        # The edit goes to every selected widget whose type has the prop,
+        # as one undo step that reports only the nodes it changed.
+        ids = [i for i in state.selection
+               if _has_prop(proj.index.get(i), prop_name, proj.components)]
+        if not ids:
             return
-        def _change(proj: ProjectState):
-            node = find_node(proj.tree, sid)
-            if node:
-                node.props[prop_name] = value
-        state.transact(_change)
-        rebuild()
-
+        # Keystrokes in one field merge into a single undo step, and
+        # the rest of the UI catches up when typing pauses.
+        state.transact(lambda proj: set_props(
+            proj.tree, ids, {prop_name: value}, tree_index=proj.index),
+            coalesce_key=(tuple(ids), prop_name))
+        idle_refresh.trigger()
+
+    @profiler.traced("undo")
+    @locked
     def do_undo():
         state.undo()
-        rebuild()
+        refresh()
 
+    @profiler.traced("redo")
+    @locked
     def do_redo():
         state.redo()
-        rebuild()
+        refresh()
 
     def do_save():
         def _on_result(e: ft.FilePickerResultEvent):
             if e.path:
-                path = e.path if e.path.endswith(".fvb.json") else e.path + ".fvb.json"
-                save_project(state.project, path)
+                path = e.path
+                if not path.endswith((".fvb.json", BINARY_SUFFIX)):
+                    path += ".fvb.json"
+                try:
+                    save_to(path)
+                except OSError as ex:
+                    _show_snack(page, f"Save error: {ex}", "#d32f2f")
+                    return
                 _show_snack(page, f"Saved to {path}")
         picker = ft.FilePicker(on_result=_on_result)
         page.overlay.append(picker)
         page.update()
         picker.save_file(dialog_title="Save FVB Project",
                          file_name=f"{state.project.name}.fvb.json",
-                         allowed_extensions=["json"])
+                         allowed_extensions=["json", "fvb"])
 
     def do_load():
         def _on_result(e: ft.FilePickerResultEvent):
             if e.files and e.files[0].path:
+                path = e.files[0].path
                 try:
-                    loaded = load_project(e.files[0].path)
-                    state.project = loaded
-                    state._undo_stack.clear()
-                    state._redo_stack.clear()
-                    rebuild()
-                    _show_snack(page, f"Loaded: {loaded.name}")
+                    loaded = load_project(path)
                 except Exception as ex:
                     _show_snack(page, f"Load error: {ex}", "#d32f2f")
+                    return
+                # Open the journal before swapping state: a project we cannot
+                # write still loads, just without autosave.
+                target: Journal | None = Journal(path)
+                warning = None
+                try:
+                    target.open(loaded)
+                except OSError as ex:
+                    target = None
+                    warning = f"Autosave off: {ex}"
+                with refresh_lock:
+                    state.load(loaded)
+                    journal_to(target)
+                    for panel in (canvas, tree_view, props_panel):
+                        panel.reset()
+                    refresh()
+                if warning is not None:
+                    _show_snack(page, f"Loaded: {loaded.name}. {warning}", "#f57c00")
+                else:
+                    _show_snack(page, f"Loaded: {loaded.name}")
         picker = ft.FilePicker(on_result=_on_result)
         page.overlay.append(picker)
         page.update()
         picker.pick_files(dialog_title="Open FVB Project",
-                          allowed_extensions=["json"])
+                          allowed_extensions=["json", "fvb"])
 
     def do_copy_code(code: str):
         page.clipboard = code
         page.update()
         _show_snack(page, "Code copied to clipboard!")
 
-    def do_export_code(code: str):
+    def do_export_code():
         def _on_result(e: ft.FilePickerResultEvent):
             if e.path:
-                path = e.path if e.path.endswith(".py") else e.path + ".py"
-                with open(path, "w", encoding="utf-8") as f:
-                    f.write(code)
+                path = Path(e.path if e.path.endswith(".py") else e.path + ".py")
+                tmp = path.with_name(path.name + ".tmp")
+                try:
+                    # Streamed straight from the tree: no full code string.
+                    with tmp.open("w", encoding="utf-8") as f:
+                        write_code(state.project.tree, f, state.project.components)
+                    os.replace(tmp, path)
+                except (OSError, KeyError, ValueError) as ex:
+                    tmp.unlink(missing_ok=True)
+                    _show_snack(page, f"Export error: {ex}", "#d32f2f")
+                    return
                 _show_snack(page, f"Exported to {path}")
         picker = ft.FilePicker(on_result=_on_result)
         page.overlay.append(picker)
@@ -269,13 +557,51 @@ def main(page: ft.Page) -> None:
                 do_redo()
             elif e.key == "S":
                 do_save()
+            elif e.key == "C":
+                do_copy()
+            elif e.key == "V":
+                do_paste()
+            elif e.key == "D":
+                do_duplicate()
+            elif e.key == "K":
+                do_make_component()
         elif e.key == "Delete":
             do_delete()
+        elif e.shift and e.key in ("Arrow Down", "Arrow Up"):
+            do_extend_selection(1 if e.key == "Arrow Down" else -1)
 
     page.on_keyboard_event = on_keyboard
 
+    # ─── Layout ────────────────────────────────────────────────
+
+    canvas = CanvasPanel(
+        on_select=do_select, on_delete=do_delete,
+        on_move_up=do_move_up, on_move_down=do_move_down,
+        on_wrap=do_wrap, on_toggle_select=do_toggle_select,
+        on_duplicate=do_duplicate, on_make_component=do_make_component,
+    )
+    tree_view = TreeViewPanel(on_select=do_select, on_toggle_select=do_toggle_select)
+    props_panel = PropertiesPanel(on_prop_change=do_prop_change)
+    live_preview = LivePreviewPanel()
+    code_panel = CodePreviewPanel(on_copy=do_copy_code, on_export=do_export_code)
+
+    left_col = ft.Column(controls=[
+        ft.Container(content=build_palette(on_add_widget=do_add_widget), expand=3),
+        ft.Container(content=tree_view.control, expand=2),
+    ], expand=True, spacing=0)
+
+    design_body = ft.Row(controls=[
+        ft.Container(content=left_col, width=200),
+        ft.Container(content=canvas.control, expand=True),
+        ft.Container(content=props_panel.control, width=260),
+    ], expand=True, spacing=0)
+    tab_body = ft.Container(expand=True, visible=False)
+    toolbar_holder = ft.Container()
+
     # ─── Go ────────────────────────────────────────────────────
-    rebuild()
+    refresh()
+    page.add(ft.Column(controls=[toolbar_holder, design_body, tab_body],
+                       expand=True, spacing=0))
 
 
 def run() -> None:
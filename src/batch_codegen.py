@@ -0,0 +1,165 @@
+"""Headless batch code generation: project files in, Flet scripts out.
+
+    python codegen.py projects/ -o generated/ --workers 8
+
+Every ``*.fvb.json`` / ``*.fvb`` under the input directory is loaded with
+``load_project`` (journal included), validated and written as a ``.py``
+script at the same relative path under the output directory.  Work is
+spread over a process pool.  Inputs whose content hash matches the
+manifest from the previous run (and whose output still exists) are
+skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.engine.code_generator import write_code
+from src.engine.tree_ops import walk
+from src.engine.validator import ValidationError, validate_tree
+from src.utils.serializer import journal_path_for, load_project
+
+PROJECT_SUFFIXES = (".fvb.json", ".fvb")
+MANIFEST_NAME = ".codegen-manifest.json"
+# Bump when generated output changes so cached hashes are invalidated.
+GENERATOR_VERSION = "1"
+
+
+@dataclass(frozen=True)
+class Result:
+    """Outcome of generating one project."""
+    source: str
+    digest: str
+    nodes: int = 0
+    size: int = 0
+    error: str | None = None
+
+
+def find_projects(root: Path) -> list[Path]:
+    return sorted(
+        p for p in root.rglob("*")
+        if p.is_file() and p.name.endswith(PROJECT_SUFFIXES)
+    )
+
+
+def output_path(source: Path, src_root: Path, out_root: Path) -> Path:
+    rel = source.relative_to(src_root)
+    stem = next(rel.name[:-len(s)] for s in PROJECT_SUFFIXES if rel.name.endswith(s))
+    return out_root / rel.parent / f"{stem}.py"
+
+
+def content_hash(source: Path) -> str:
+    """Hash of everything ``load_project`` reads for *source*."""
+    digest = hashlib.sha256(GENERATOR_VERSION.encode())
+    digest.update(source.read_bytes())
+    journal = journal_path_for(source)
+    if journal.exists():
+        digest.update(b"\0journal\0")
+        digest.update(journal.read_bytes())
+    return digest.hexdigest()
+
+
+def generate_one(source: str, target: str, digest: str) -> Result:
+    """Load, validate and generate one project (runs in a worker process)."""
+    target_path = Path(target)
+    tmp = target_path.with_name(target_path.name + ".tmp")
+    try:
+        project = load_project(source)
+        validate_tree(project.tree, project.components)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("w", encoding="utf-8") as fp:
+            size = write_code(project.tree, fp, project.components)
+    except Exception as exc:  # one bad project must not stop the batch
+        tmp.unlink(missing_ok=True)
+        kind = "invalid" if isinstance(exc, ValidationError) else type(exc).__name__
+        return Result(source, digest, error=f"{kind}: {exc}")
+    os.replace(tmp, target_path)
+    return Result(source, digest, nodes=sum(1 for _ in walk(project.tree)), size=size)
+
+
+def _load_manifest(path: Path) -> dict[str, str]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def run_batch(
+    src_root: Path,
+    out_root: Path,
+    workers: int | None = None,
+    force: bool = False,
+) -> tuple[list[Result], int]:
+    """Generate every changed project; returns (results, skipped count)."""
+    manifest_path = out_root / MANIFEST_NAME
+    manifest = {} if force else _load_manifest(manifest_path)
+    jobs: list[tuple[str, str, str]] = []
+    skipped = 0
+    for source in find_projects(src_root):
+        key = source.relative_to(src_root).as_posix()
+        digest = content_hash(source)
+        target = output_path(source, src_root, out_root)
+        if manifest.get(key) == digest and target.exists():
+            skipped += 1
+            continue
+        jobs.append((str(source), str(target), digest))
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [generate_one(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(generate_one, *zip(*jobs), chunksize=4))
+
+    for result in results:
+        key = Path(result.source).relative_to(src_root).as_posix()
+        if result.error is None:
+            manifest[key] = result.digest
+        else:
+            manifest.pop(key, None)
+    out_root.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    return results, skipped
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="codegen.py",
+        description="Validate projects and generate Flet code without the UI.",
+    )
+    parser.add_argument("input", type=Path, help="directory searched for *.fvb.json / *.fvb")
+    parser.add_argument("-o", "--output", type=Path,
+                        help="output directory (default: next to the inputs)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true",
+                        help="regenerate every project, ignoring the manifest")
+    args = parser.parse_args(argv)
+    if not args.input.is_dir():
+        parser.error(f"not a directory: {args.input}")
+
+    workers = max(1, args.workers or 1)
+    start = time.perf_counter()
+    results, skipped = run_batch(args.input, args.output or args.input, workers, args.force)
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if r.error is not None]
+    for result in failed:
+        print(f"FAILED {result.source}: {result.error}", file=sys.stderr)
+    done = len(results) - len(failed)
+    nodes = sum(r.nodes for r in results)
+    size = sum(r.size for r in results)
+    seconds = elapsed or 1e-9
+    print(
+        f"{done} generated, {skipped} unchanged, {len(failed)} failed "
+        f"in {elapsed:.2f}s ({workers} workers)\n"
+        f"{done / seconds:.1f} projects/s, {nodes / seconds:,.0f} nodes/s, "
+        f"{size / seconds / 1024:,.0f} KiB/s of code"
+    )
+    return 1 if failed else 0
@@ -0,0 +1,148 @@
+"""Code generation and validation on a worker thread."""
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from src.engine.code_generator import CodeGenerator, code_head
+from src.engine.snapshot import Snapshot
+from src.engine.validator import Diagnostic, Validator
+from src.utils.profiling import profiler
+
+
+@dataclass(frozen=True)
+class CompileResult:
+    """Generated code and diagnostics for snapshot number *generation*."""
+    generation: int
+    code: str
+    diagnostics: list[Diagnostic]
+
+
+class BackgroundCompiler:
+    """Validate and generate code for tree snapshots on one worker thread.
+
+    :meth:`submit` is cheap and never blocks: it records the newest
+    :class:`Snapshot` and the ids dirtied since the last one.  The worker
+    always compiles the newest snapshot it finds; a run whose snapshot is
+    superseded mid-way stops early and leaves the result to the run that
+    picks up the newer one.  Dirty ids are accumulated until a run consumes
+    them, so the incremental :class:`CodeGenerator` and :class:`Validator`
+    caches stay correct no matter how many snapshots are skipped.
+
+    *on_ready* is called on the worker thread with each finished result.
+    Full (non-incremental) runs are slow on big trees, so they first pass
+    the opening *preview_lines* of the script to *on_preview*, streamed
+    without building the rest.
+    """
+
+    def __init__(
+        self,
+        on_ready: Callable[[CompileResult], None] | None = None,
+        on_preview: Callable[[int, str], None] | None = None,
+        preview_lines: int = 60,
+    ) -> None:
+        self.on_ready = on_ready
+        self.on_preview = on_preview
+        self.preview_lines = preview_lines
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="compile")
+        self._lock = threading.Lock()
+        self._generator = CodeGenerator()
+        self._validator = Validator()
+        self._generation = 0
+        self._snapshot: Snapshot | None = None
+        self._dirty: set[str] | None = set()
+        self._queued: Future | None = None
+        self._last: Future | None = None
+        self._result: CompileResult | None = None
+
+    @property
+    def generation(self) -> int:
+        """Number of the newest submitted snapshot."""
+        return self._generation
+
+    def result(self) -> CompileResult | None:
+        """The result for the newest snapshot, or None while it is pending."""
+        result = self._result
+        if result is None or result.generation != self._generation:
+            return None
+        return result
+
+    def latest(self) -> CompileResult | None:
+        """The most recent finished result, possibly for an older snapshot."""
+        return self._result
+
+    def submit(self, snapshot: Snapshot, dirty: set[str] | None) -> int:
+        """Queue *snapshot* (with the ids changed since the previous one)."""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = snapshot
+            if dirty is None or self._dirty is None:
+                self._dirty = None
+            else:
+                self._dirty |= dirty
+            if self._queued is None:
+                self._queued = self._last = self._executor.submit(self._run)
+            return self._generation
+
+    def wait(self, timeout: float | None = None) -> CompileResult | None:
+        """Block until the newest snapshot is compiled (tests, shutdown)."""
+        while True:
+            with self._lock:
+                future = self._last
+            if future is not None:
+                future.result(timeout)
+            with self._lock:
+                if self._last is future:
+                    return self.result()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _superseded(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def _restore_dirty(self, dirty: set[str] | None) -> None:
+        with self._lock:
+            if dirty is None or self._dirty is None:
+                self._dirty = None
+            else:
+                self._dirty |= dirty
+
+    def _run(self) -> None:
+        with self._lock:
+            self._queued = None
+            snapshot, dirty, generation = self._snapshot, self._dirty, self._generation
+            self._dirty = set()
+        if snapshot is None:
+            return
+        with profiler.span("background.compile", generation=generation):
+            if dirty is None and self.on_preview is not None:
+                try:
+                    head = code_head(snapshot.root, self.preview_lines, snapshot.components)
+                except (KeyError, ValueError):
+                    head = None  # reported by the full run below
+                if head is not None:
+                    self.on_preview(generation, head)
+            diagnostics = self._validator.validate(
+                snapshot.root, dirty, snapshot, snapshot.components)
+            if self._superseded(generation):
+                # The generator has not seen these ids yet: hand them on.
+                self._restore_dirty(dirty)
+                profiler.count("background.superseded")
+                return
+            try:
+                code = self._generator.generate(
+                    snapshot.root, dirty, snapshot, snapshot.components)
+            except (KeyError, ValueError):
+                # Unknown widget types etc. are already in the diagnostics.
+                # The generator's cache may be partial now: rebuild it next run.
+                self._restore_dirty(None)
+                code = "# Fix the problems above to generate code.\n"
+        if self._superseded(generation):
+            profiler.count("background.superseded")
+            return
+        self._result = CompileResult(generation, code, diagnostics)
+        if self.on_ready is not None:
+            self.on_ready(self._result)
@@ -1,88 +1,330 @@
 from __future__ import annotations
 
-from src.models.enum_map import ENUM_MAP
-from src.models.widget_node import WidgetNode
-from src.models.widget_registry import WIDGET_REGISTRY, enum_key_for
+import re
+from collections.abc import Iterator, Mapping
+from typing import TextIO
 
+from src.engine.tree_index import TreeIndex
+from src.models.component import COMPONENT_REF, COMPONENT_TYPE, ComponentDef, resolve
+from src.models.widget_node import WidgetNode
+from src.models.widget_registry import WIDGET_SPECS
+from src.utils.profiling import profiler
 
-def _is_event_prop(widget_type: str, key: str) -> bool:
-    """Check if a property is an event handler."""
-    pdef = WIDGET_REGISTRY.get(widget_type, {}).get("props", {}).get(key, {})
-    return pdef.get("type") == "event"
 
+def _format_value(enum_codes: dict[str, str] | None, value):
+    """Format a property value for code output.
 
-def _format_value(enum_key: str | None, value):
-    """Format a property value for code output."""
+    *enum_codes* maps option values to ``ft.X.Y`` source (see
+    ``WidgetSpec.enum_codes``); None for non-enum props.
+    """
     if value is None:
         return "None"
     # bool MUST be checked before int (True/False are instances of int)
     if isinstance(value, bool):
         return "True" if value else "False"
     if isinstance(value, str):
-        if enum_key and enum_key in ENUM_MAP and value in ENUM_MAP[enum_key]:
-            return ENUM_MAP[enum_key][value]
+        if enum_codes and value in enum_codes:
+            return enum_codes[value]
         return repr(value)
     if isinstance(value, (int, float)):
         return str(value)
     return repr(value)
 
 
-def _props_to_code(node: WidgetNode) -> list[str]:
-    """Build list of 'key=value' strings for non-default properties."""
-    spec = WIDGET_REGISTRY[node.type]
-    defaults = {k: v["default"] for k, v in spec["props"].items()}
+def _props_to_code(node: WidgetNode, bound: dict[str, str] | None = None) -> list[str]:
+    """Build list of 'key=value' strings for non-default properties.
+
+    Props in *bound* (prop -> param, inside a component function) are
+    passed the param instead of their value.
+    """
+    spec = WIDGET_SPECS[node.type]
+    defaults = spec.defaults
+    event_props = spec.event_props
+    enum_codes = spec.enum_codes
     pairs: list[str] = []
 
     for key, value in node.props.items():
-        if key not in spec["props"]:
+        if key not in defaults:
+            continue
+        if bound and key in bound:
+            pairs.append(f"{key}={bound[key]}")
             continue
         # Skip values that match the default
-        if key in defaults and value == defaults[key]:
+        if value == defaults[key]:
             continue
 
-        pdef = spec["props"][key]
-
         # Event handlers: render as bare function names, not strings
-        if pdef["type"] == "event":
+        if key in event_props:
             if value:
                 pairs.append(f"{key}={value}")
             continue
 
-        enum_key = (
-            enum_key_for(node.type, key)
-            if pdef["type"] == "enum"
-            else None
-        )
-        pairs.append(f"{key}={_format_value(enum_key, value)}")
+        pairs.append(f"{key}={_format_value(enum_codes.get(key), value)}")
 
+    if bound:
+        pairs.extend(f"{key}={param}" for key, param in bound.items()
+                     if key in defaults and key not in node.props)
     return pairs
 
 
-def _render_node(node: WidgetNode, indent: int = 2) -> str:
-    """Recursively render a node as Flet constructor code."""
+# ---------------------------------------------------------------------------
+# Components: each definition becomes one function, each instance a call.
+# ---------------------------------------------------------------------------
+
+def function_name(component: str) -> str:
+    """Name of the generated function that builds *component*."""
+    snake = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", component)
+    return "build_" + (re.sub(r"\W+", "_", snake).strip("_").lower() or "component")
+
+
+def _definition(node: WidgetNode, components: Mapping[str, ComponentDef] | None) -> ComponentDef:
+    definition = resolve(node, components)
+    if definition is None:
+        raise KeyError(f"Unknown component: {node.props.get(COMPONENT_REF)}")
+    return definition
+
+
+def _param_code(definition: ComponentDef, param: str, value) -> str:
+    node_id, prop = definition.params[param]
+    spec = WIDGET_SPECS[definition.nodes[node_id].type]
+    if prop in spec.event_props:
+        return value if isinstance(value, str) and value else "None"
+    return _format_value(spec.enum_codes.get(prop), value)
+
+
+def _instance_call(node: WidgetNode, definition: ComponentDef) -> str:
+    """``build_x(param=value, ...)`` for the params *node* overrides."""
+    props = node.props
+    args = ", ".join(
+        f"{param}={_param_code(definition, param, props[param])}"
+        for param in definition.params
+        if param in props and props[param] != definition.default(param)
+    )
+    return f"{function_name(definition.name)}({args})"
+
+
+def _instance_handlers(node: WidgetNode, definition: ComponentDef) -> Iterator[str]:
+    """Handler names *node* passes to event params of its definition."""
+    for param, value in node.props.items():
+        target = definition.params.get(param)
+        if target is None or not isinstance(value, str) or not value:
+            continue
+        if target[1] in WIDGET_SPECS[definition.nodes[target[0]].type].event_props:
+            yield value
+
+
+def _scan(
+    nodes: list[WidgetNode],
+    components: Mapping[str, ComponentDef] | None,
+    used: dict[str, ComponentDef],
+) -> set[str]:
+    """Handler names under *nodes*; adds every component reached to *used*.
+
+    Follows instances into their definitions (once each), so nested
+    components are found too.
+    """
+    names: set[str] = set()
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if node.type == COMPONENT_TYPE:
+            definition = _definition(node, components)
+            names.update(_instance_handlers(node, definition))
+            if definition.name not in used:
+                used[definition.name] = definition
+                stack.append(definition.root)
+            continue
+        event_props = WIDGET_SPECS[node.type].event_props
+        names.update(
+            v for k, v in node.props.items()
+            if k in event_props and isinstance(v, str) and v
+        )
+        stack.extend(node.children)
+    return names
+
+
+def _component_source(
+    definition: ComponentDef, components: Mapping[str, ComponentDef] | None,
+) -> str:
+    """The ``def build_x(...)`` function for *definition*."""
+    args = ", ".join(
+        f"{param}={_param_code(definition, param, definition.default(param))}"
+        for param in definition.params
+    )
+    stack: list = [(definition.root, 1, False)]
+    body = "".join(_drain(stack, components, definition.bindings))
+    return f"def {function_name(definition.name)}({args}):\n    return {body}\n"
+
+
+class _Fragment:
+    """Rendered source of one node plus the handler and component names used
+    in its subtree."""
+
+    __slots__ = ("key", "version", "indent", "text", "handlers", "components")
+
+    def __init__(
+        self, key, version: int, indent: int, text: str,
+        handlers: frozenset[str], components: frozenset[str] = frozenset(),
+    ):
+        self.key = key
+        self.version = version
+        self.indent = indent
+        self.text = text
+        self.handlers = handlers
+        self.components = components
+
+
+class CodeGenerator:
+    """Memoizing code generator.
+
+    Every node's rendered fragment is cached by node id together with a key
+    built from its type, props, indent and the (id, slot, version) of each
+    child.  A fragment is rebuilt only when that key changes, so after an
+    edit only the path from the edited node up to the root is re-rendered.
+    Handler names are unioned per fragment, so collecting them needs no
+    extra walk.
+
+    Pass the ids drained from a DirtySet plus the tree index to
+    :meth:`generate` to skip even the key checks for untouched subtrees.
+    Component instances render as calls; the functions they call are
+    cached per definition and emitted once, before ``main``.
+    """
+
+    def __init__(self) -> None:
+        self._fragments: dict[str, _Fragment] = {}
+        self._version = 0
+        self._components: Mapping[str, ComponentDef] | None = None
+        self._functions: dict[str, tuple[ComponentDef, str]] = {}
+
+    def generate(
+        self,
+        root: WidgetNode,
+        dirty: set[str] | None = None,
+        tree_index: TreeIndex | None = None,
+        components: Mapping[str, ComponentDef] | None = None,
+    ) -> str:
+        if components is not self._components:
+            # Instance fragments depend on their definitions: re-key them all.
+            self._components = components
+            self._functions.clear()
+            dirty = None
+        stale: set[str] | None = None
+        if dirty is not None and tree_index is not None:
+            stale = set()
+            for node_id in dirty:
+                if node_id not in tree_index:
+                    self._fragments.pop(node_id, None)
+                    continue
+                stale.add(node_id)
+                stale.update(p.id for p in tree_index.ancestors(node_id))
+            if len(self._fragments) > 2 * len(tree_index):
+                self._fragments = {
+                    k: v for k, v in self._fragments.items() if k in tree_index
+                }
+            seen = None
+        else:
+            seen = set()
+
+        version = self._version
+        with profiler.span("codegen.generate"):
+            fragment = self._render(root, 2, stale, seen)
+            if seen is not None:
+                self._fragments = {k: v for k, v in self._fragments.items() if k in seen}
+            code = self._assemble(fragment)
+        profiler.count("codegen.fragments_rendered", self._version - version)
+        return code
+
+    def _render(
+        self, node: WidgetNode, indent: int, stale: set[str] | None, seen: set[str] | None
+    ) -> _Fragment:
+        cached = self._fragments.get(node.id)
+        if seen is not None:
+            seen.add(node.id)
+        elif cached is not None and cached.indent == indent and node.id not in stale:
+            return cached
+
+        if node.type == COMPONENT_TYPE:
+            definition = _definition(node, self._components)
+            key = (node.type, tuple(node.props.items()), definition)
+            if cached is not None and cached.key == key and cached.indent == indent:
+                return cached
+            self._version += 1
+            fragment = _Fragment(
+                key, self._version, indent,
+                " " * (indent * 4) + _instance_call(node, definition),
+                frozenset(_instance_handlers(node, definition)),
+                frozenset({definition.name}),
+            )
+            self._fragments[node.id] = fragment
+            return fragment
+
+        # Build children grouped by slot
+        spec = WIDGET_SPECS[node.type]
+        child_indent = {
+            name: indent + 1 if max_ == 1 else indent + 2 for name, max_ in spec.slots
+        }
+        children = [
+            (c, self._render(c, child_indent.get(c.slot or "controls", indent + 2), stale, seen))
+            for c in node.children
+        ]
+        key = (
+            node.type,
+            tuple(node.props.items()),
+            tuple((c.id, c.slot, f.version) for c, f in children),
+        )
+        if cached is not None and cached.key == key and cached.indent == indent:
+            return cached
+
+        handlers = frozenset(
+            v for k, v in node.props.items()
+            if k in spec.event_props and isinstance(v, str) and v
+        ).union(*(f.handlers for _, f in children))
+        used = frozenset().union(*(f.components for _, f in children))
+        self._version += 1
+        fragment = _Fragment(
+            key, self._version, indent, _render_node(node, indent, children), handlers, used,
+        )
+        self._fragments[node.id] = fragment
+        return fragment
+
+    def _assemble(self, root: _Fragment) -> str:
+        """Wrap the root fragment into a complete runnable script."""
+        if not root.components:
+            return _header(sorted(root.handlers)) + root.text + _FOOTER
+        components = self._components
+        used = {name: components[name] for name in root.components}
+        handlers = root.handlers | _scan([d.root for d in used.values()], components, used)
+        functions = []
+        for name in sorted(used):
+            definition = used[name]
+            cached = self._functions.get(name)
+            if cached is None or cached[0] is not definition:
+                cached = self._functions[name] = (
+                    definition, _component_source(definition, components))
+            functions.append(cached[1])
+        return _header(sorted(handlers), functions) + root.text + _FOOTER
+
+
+def _render_node(
+    node: WidgetNode, indent: int, children: list[tuple[WidgetNode, _Fragment]]
+) -> str:
+    """Render a node as Flet constructor code from its children's fragments."""
     space = " " * (indent * 4)
     child_space = " " * ((indent + 1) * 4)
     props = _props_to_code(node)
 
-    # Build children grouped by slot
-    slots = WIDGET_REGISTRY[node.type]["children"]
-    slot_map: dict[str, list[WidgetNode]] = {}
-    for child in node.children:
-        slot_map.setdefault(child.slot or "controls", []).append(child)
+    slot_map: dict[str, list[_Fragment]] = {}
+    for child, fragment in children:
+        slot_map.setdefault(child.slot or "controls", []).append(fragment)
 
-    for slot in slots:
-        name = slot["slot"]
-        children = slot_map.get(name, [])
-        if slot["max"] == 1:
-            if children:
-                props.append(
-                    f"{name}={_render_node(children[0], indent + 1).strip()}"
-                )
+    for name, max_children in WIDGET_SPECS[node.type].slots:
+        fragments = slot_map.get(name, [])
+        if max_children == 1:
+            if fragments:
+                props.append(f"{name}={fragments[0].text.strip()}")
         else:
-            if children:
-                rendered = ",\n".join(
-                    _render_node(c, indent + 2) for c in children
-                )
+            if fragments:
+                rendered = ",\n".join(f.text for f in fragments)
                 props.append(f"{name}=[\n{rendered}\n{child_space}]")
 
     if not props:
@@ -91,18 +333,12 @@ def _render_node(node: WidgetNode, indent: int = 2) -> str:
     return f"{space}ft.{node.type}(\n{child_space}{joined}\n{space})"
 
 
-def generate_code(root: WidgetNode) -> str:
-    """Generate a complete runnable Flet script from a widget tree."""
-    # Collect unique event handler names
-    handlers = sorted(
-        {
-            v
-            for n in _walk(root)
-            for k, v in n.props.items()
-            if _is_event_prop(n.type, k) and isinstance(v, str) and v
-        }
-    )
+# Emitted after the root widget; everything before it is :func:`_header`.
+_FOOTER = "\n    )\n\n\nft.app(target=main)"
 
+
+def _header(handlers: list[str], functions: list[str] = ()) -> str:
+    """Script text up to where the root widget goes."""
     # Handler stubs must be defined BEFORE main() so the names are in scope
     # when page.add() builds the control tree.
     lines: list[str] = [
@@ -112,6 +348,8 @@ def generate_code(root: WidgetNode) -> str:
 
     for name in handlers:
         lines.extend([f"def {name}(e: ft.ControlEvent):", "    pass", ""])
+    for source in functions:
+        lines.append(source)
 
     lines.extend([
         "def main(page: ft.Page):",
@@ -119,18 +357,143 @@ def generate_code(root: WidgetNode) -> str:
         "    page.theme_mode = ft.ThemeMode.LIGHT",
         "",
         "    page.add(",
-        _render_node(root, indent=2),
-        "    )",
-        "",
         "",
-        "ft.app(target=main)",
     ])
-
     return "\n".join(lines)
 
 
-def _walk(node: WidgetNode):
-    """Yield all nodes in the tree (depth-first)."""
-    yield node
-    for c in node.children:
-        yield from _walk(c)
\ No newline at end of file
+def generate_code(
+    root: WidgetNode, components: Mapping[str, ComponentDef] | None = None,
+) -> str:
+    """Generate a complete runnable Flet script from a widget tree."""
+    return "".join(iter_code(root, components=components))
+
+
+# ---------------------------------------------------------------------------
+# Streaming emitter
+# ---------------------------------------------------------------------------
+
+_CHUNK_SIZE = 64 * 1024
+
+
+def iter_code(
+    root: WidgetNode,
+    chunk_size: int = _CHUNK_SIZE,
+    components: Mapping[str, ComponentDef] | None = None,
+) -> Iterator[str]:
+    """Yield the script for *root* in order, in chunks of ~*chunk_size* chars.
+
+    Output is identical to :meth:`CodeGenerator.generate`.  Nodes are
+    expanded from an explicit stack of pending text and nodes, so no
+    subtree's source is built as a string and re-joined by its parent:
+    every character is produced once, whatever the tree depth.  Handler
+    stubs and component functions come first in the script, so one cheap
+    pass collects their names before the first chunk.
+    """
+    with profiler.span("codegen.stream"):
+        used: dict[str, ComponentDef] = {}
+        handlers = sorted(_scan([root], components, used))
+        functions = [_component_source(used[name], components) for name in sorted(used)]
+        buffer = [_header(handlers, functions)]
+        size = len(buffer[0])
+        # Items are literal text or (node, indent, leading space?) to expand.
+        stack: list[str | tuple[WidgetNode, int, bool]] = [_FOOTER, (root, 2, True)]
+        for text in _drain(stack, components, {}):
+            buffer.append(text)
+            size += len(text)
+            if size >= chunk_size:
+                yield "".join(buffer)
+                buffer.clear()
+                size = 0
+        if buffer:
+            yield "".join(buffer)
+
+
+def write_code(
+    root: WidgetNode, fp: TextIO, components: Mapping[str, ComponentDef] | None = None,
+) -> int:
+    """Stream the script for *root* to the text file *fp*; returns its length."""
+    written = 0
+    for chunk in iter_code(root, components=components):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def code_head(
+    root: WidgetNode, max_lines: int, components: Mapping[str, ComponentDef] | None = None,
+) -> str:
+    """The first *max_lines* lines of the script, without emitting the rest."""
+    text = ""
+    for chunk in iter_code(root, chunk_size=4096, components=components):
+        text += chunk
+        if text.count("\n") >= max_lines:
+            break
+    return "\n".join(text.split("\n")[:max_lines])
+
+
+def _drain(
+    stack: list,
+    components: Mapping[str, ComponentDef] | None,
+    bindings: dict[str, dict[str, str]],
+) -> Iterator[str]:
+    """Pop *stack* to empty, yielding its text and expanding its nodes."""
+    while stack:
+        item = stack.pop()
+        yield item if type(item) is str else _expand(*item, stack, components, bindings)
+
+
+def _expand(
+    node: WidgetNode,
+    indent: int,
+    lead: bool,
+    stack: list,
+    components: Mapping[str, ComponentDef] | None,
+    bindings: dict[str, dict[str, str]],
+) -> str:
+    """Return *node*'s opening text; push the rest of its source onto *stack*.
+
+    Mirrors :func:`_render_node`.  *lead* is False for a single-slot child,
+    which follows ``name=`` on its parent's line.  *bindings* maps node
+    ids to the props they take from component params.
+    """
+    space = " " * (indent * 4)
+    if node.type == COMPONENT_TYPE:
+        call = _instance_call(node, _definition(node, components))
+        return f"{space}{call}" if lead else call
+    child_space = " " * ((indent + 1) * 4)
+    entries: list[str | list] = _props_to_code(node, bindings.get(node.id))
+
+    slot_map: dict[str, list[WidgetNode]] = {}
+    for child in node.children:
+        slot_map.setdefault(child.slot or "controls", []).append(child)
+
+    for name, max_children in WIDGET_SPECS[node.type].slots:
+        children = slot_map.get(name)
+        if not children:
+            continue
+        if max_children == 1:
+            entries.append([f"{name}=", (children[0], indent + 1, False)])
+        else:
+            items: list = [f"{name}=[\n"]
+            for i, child in enumerate(children):
+                if i:
+                    items.append(",\n")
+                items.append((child, indent + 2, True))
+            items.append(f"\n{child_space}]")
+            entries.append(items)
+
+    opening = f"{space if lead else ''}ft.{node.type}("
+    if not entries:
+        return opening + ")"
+    rest: list = []
+    for i, entry in enumerate(entries):
+        if i:
+            rest.append(f",\n{child_space}")
+        if type(entry) is str:
+            rest.append(entry)
+        else:
+            rest.extend(entry)
+    rest.append(f"\n{space})")
+    stack.extend(reversed(rest))
+    return f"{opening}\n{child_space}"
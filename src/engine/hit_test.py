@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from bisect import insort
 from dataclasses import dataclass
 from enum import Enum, auto
+from math import floor
 
 
 class DropZone(Enum):
@@ -22,6 +24,10 @@ class HitBox:
     accepts_children: bool = False  # does this node accept drops inside?
 
 
+def _contains(box: HitBox, x: float, y: float) -> bool:
+    return box.x <= x <= box.x + box.w and box.y <= y <= box.y + box.h
+
+
 @dataclass
 class HitResult:
     box: HitBox
@@ -31,26 +37,140 @@ class HitResult:
 class HitTestEngine:
     """Canvas-level hit-test engine.
 
-    Boxes are registered front-to-back (parent first, children after).
-    ``hit()`` iterates in reverse so the innermost (last registered) box wins.
+    Boxes are registered front-to-back (parent first, children after) and
+    the innermost (last registered) box containing the pointer wins.
+
+    Boxes are bucketed in a hierarchical grid: level ``k`` has cells of
+    ``cell_size * 2**k`` pixels and each box goes into the finest level
+    where it overlaps at most ``_MAX_CELLS`` cells, so page-sized
+    containers and single rows both stay in a handful of buckets.
+    ``hit()`` checks one bucket per level; buckets are kept in registration
+    order so the first match from the back is the innermost box.  Use
+    :meth:`build` after a layout pass, and :meth:`update` / :meth:`remove`
+    when a single box changes.
     """
 
-    def __init__(self) -> None:
-        self._boxes: list[HitBox] = []
+    _MAX_CELLS = 4
+
+    def __init__(self, cell_size: float = 64.0) -> None:
+        self.cell_size = cell_size
+        self._boxes: list[HitBox | None] = []   # registration order; None = removed
+        self._order: dict[str, int] = {}        # node_id -> index into _boxes
+        self._cells: dict[tuple[int, int, int], list[int]] = {}  # (level, cx, cy)
+        self._levels: list[int] = []            # per level: number of boxes
+
+    def __len__(self) -> int:
+        return len(self._order)
 
     def clear(self) -> None:
         self._boxes.clear()
+        self._order.clear()
+        self._cells.clear()
+        self._levels.clear()
+
+    def build(self, boxes: list[HitBox], cell_size: float | None = None) -> None:
+        """Replace all boxes with *boxes*, given in registration order.
+
+        Without *cell_size* the finest grid is sized to the median box
+        (square root of its area).
+        """
+        self.clear()
+        if cell_size is None and boxes:
+            extents = sorted((b.w * b.h) ** 0.5 for b in boxes)
+            cell_size = extents[len(extents) // 2]
+        if cell_size:
+            self.cell_size = max(cell_size, 1.0)
+        for box in boxes:
+            self.register(box)
 
     def register(self, box: HitBox) -> None:
+        """Add *box* on top of everything registered so far.
+
+        Registering a node id again replaces its earlier box.
+        """
+        old = self._order.get(box.node_id)
+        if old is not None:
+            self._unlink(old)
+        seq = len(self._boxes)
         self._boxes.append(box)
+        self._order[box.node_id] = seq
+        self._link(seq, box)
+
+    def update(self, box: HitBox) -> None:
+        """Replace the box for ``box.node_id`` keeping its stacking order."""
+        seq = self._order.get(box.node_id)
+        if seq is None:
+            self.register(box)
+            return
+        self._unlink(seq)
+        self._boxes[seq] = box
+        self._link(seq, box)
+
+    def remove(self, node_id: str) -> bool:
+        seq = self._order.pop(node_id, None)
+        if seq is None:
+            return False
+        self._unlink(seq)
+        self._boxes[seq] = None
+        return True
 
     def hit(self, x: float, y: float) -> HitResult | None:
         """Find the innermost box containing (x, y) and compute the drop zone."""
-        for box in reversed(self._boxes):
-            if box.x <= x <= box.x + box.w and box.y <= y <= box.y + box.h:
-                zone = self._compute_zone(box, y)
-                return HitResult(box=box, zone=zone)
-        return None
+        boxes = self._boxes
+        cells = self._cells
+        best = -1
+        size = self.cell_size
+        for level, count in enumerate(self._levels):
+            if count:
+                bucket = cells.get((level, floor(x / size), floor(y / size)), ())
+                for seq in reversed(bucket):
+                    if seq <= best:
+                        break
+                    if _contains(boxes[seq], x, y):
+                        best = seq
+                        break
+            size *= 2
+        if best < 0:
+            return None
+        box = boxes[best]
+        return HitResult(box=box, zone=self._compute_zone(box, y))
+
+    def _cells_for(self, box: HitBox) -> tuple[int, range, range]:
+        """Level and cell ranges *box* is bucketed under."""
+        level, size = 0, self.cell_size
+        while True:
+            cols = range(floor(box.x / size), floor((box.x + box.w) / size) + 1)
+            rows = range(floor(box.y / size), floor((box.y + box.h) / size) + 1)
+            if len(cols) * len(rows) <= self._MAX_CELLS:
+                return level, cols, rows
+            level += 1
+            size *= 2
+
+    def _link(self, seq: int, box: HitBox) -> None:
+        level, cols, rows = self._cells_for(box)
+        while len(self._levels) <= level:
+            self._levels.append(0)
+        self._levels[level] += 1
+        cells = self._cells
+        for cx in cols:
+            for cy in rows:
+                bucket = cells.get((level, cx, cy))
+                if bucket is None:
+                    cells[(level, cx, cy)] = [seq]
+                elif bucket[-1] < seq:
+                    bucket.append(seq)
+                else:
+                    insort(bucket, seq)
+
+    def _unlink(self, seq: int) -> None:
+        level, cols, rows = self._cells_for(self._boxes[seq])
+        self._levels[level] -= 1
+        for cx in cols:
+            for cy in rows:
+                bucket = self._cells[(level, cx, cy)]
+                bucket.remove(seq)
+                if not bucket:
+                    del self._cells[(level, cx, cy)]
 
     @staticmethod
     def _compute_zone(box: HitBox, y: float) -> DropZone:
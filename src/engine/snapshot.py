@@ -0,0 +1,166 @@
+"""Immutable, structurally shared snapshots of the widget tree.
+
+Background work (code generation, validation) must not read the live tree
+while the UI thread edits it.  :class:`Snapshotter` hands out frozen copies
+that share every unchanged subtree with the previous snapshot: after an
+edit only the dirty nodes and their ancestors are copied, so taking a
+snapshot costs O(edit x depth) plus one dict copy, not a tree walk.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from types import MappingProxyType
+from typing import Any, NamedTuple
+
+from src.engine.tree_index import TreeIndex
+from src.models.component import ComponentDef
+from src.models.widget_node import WidgetNode
+
+
+class FrozenNode(NamedTuple):
+    """Read-only stand-in for a :class:`WidgetNode` inside a snapshot."""
+
+    id: str
+    type: str
+    props: Mapping[str, Any]
+    children: tuple[FrozenNode, ...]
+    parent_id: str | None
+    order: int
+    slot: str | None
+
+    @classmethod
+    def of(
+        cls,
+        node: WidgetNode,
+        children: tuple[FrozenNode, ...],
+        props: Mapping[str, Any] | None = None,
+    ) -> FrozenNode:
+        if props is None:
+            props = MappingProxyType(dict(node.props))
+        return cls(node.id, node.type, props, children, node.parent_id, node.order, node.slot)
+
+    def __repr__(self) -> str:
+        return f"FrozenNode(id={self.id!r}, type={self.type!r}, children={len(self.children)})"
+
+
+class Snapshot:
+    """A frozen tree plus the lookups :class:`TreeIndex` offers, read-only.
+
+    Safe to hand to another thread: nothing in it changes after creation.
+    *components* is the project's definitions mapping, shared as is:
+    definitions are replaced rather than edited, so it never changes either.
+    """
+
+    __slots__ = ("root", "components", "_nodes")
+
+    def __init__(
+        self,
+        root: FrozenNode,
+        nodes: dict[str, FrozenNode],
+        components: Mapping[str, ComponentDef] | None = None,
+    ) -> None:
+        self.root = root
+        self.components = components
+        self._nodes = nodes
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def get(self, node_id: str) -> FrozenNode | None:
+        return self._nodes.get(node_id)
+
+    def parent_of(self, node_id: str) -> FrozenNode | None:
+        node = self._nodes.get(node_id)
+        if node is None or node.parent_id is None or node is self.root:
+            return None
+        return self._nodes.get(node.parent_id)
+
+    def position_of(self, node_id: str) -> int | None:
+        node = self._nodes.get(node_id)
+        return node.order if node is not None else None
+
+    def ancestors(self, node_id: str) -> Iterator[FrozenNode]:
+        parent = self.parent_of(node_id)
+        while parent is not None:
+            yield parent
+            parent = self.parent_of(parent.id)
+
+
+class Snapshotter:
+    """Produces :class:`Snapshot` objects of one live tree, sharing structure."""
+
+    def __init__(self) -> None:
+        self._nodes: dict[str, FrozenNode] = {}
+        self._root: FrozenNode | None = None
+
+    def snapshot(
+        self,
+        root: WidgetNode,
+        dirty: set[str] | None = None,
+        tree_index: TreeIndex | None = None,
+        components: Mapping[str, ComponentDef] | None = None,
+    ) -> Snapshot:
+        """Freeze *root*, re-copying only *dirty* ids (None copies everything)."""
+        if (dirty is None or tree_index is None or self._root is None
+                or self._root.id != root.id):
+            self._nodes = {}
+            self._root = self._freeze_subtree(root)
+        else:
+            self._root = self._refreeze(root, dirty, tree_index)
+        return Snapshot(self._root, dict(self._nodes), components)
+
+    def _refreeze(self, root: WidgetNode, dirty: set[str], tree_index: TreeIndex) -> FrozenNode:
+        for node_id in dirty:
+            if node_id not in tree_index:
+                self._forget(node_id, tree_index)
+
+        # Dirty nodes plus their ancestors, deepest first.
+        stale: dict[str, int] = {}
+        for node_id in dirty:
+            if node_id in tree_index and node_id not in stale:
+                path = [node_id, *(a.id for a in tree_index.ancestors(node_id))]
+                for depth, path_id in enumerate(reversed(path)):
+                    stale[path_id] = depth
+        for node_id in sorted(stale, key=stale.__getitem__, reverse=True):
+            node = tree_index.get(node_id)
+            self._nodes[node_id] = FrozenNode.of(node, self._frozen_children(node, stale))
+        return self._nodes[root.id]
+
+    def _frozen_children(self, node: WidgetNode, stale: dict[str, int]) -> tuple[FrozenNode, ...]:
+        children = []
+        for child in node.children:
+            frozen = self._nodes.get(child.id)
+            if frozen is None:
+                frozen = self._freeze_subtree(child)
+            elif child.id not in stale and (
+                frozen.parent_id != child.parent_id or frozen.order != child.order
+                or frozen.slot != child.slot
+            ):
+                # Reordered or re-parented, otherwise unchanged: shallow copy.
+                frozen = self._nodes[child.id] = FrozenNode.of(child, frozen.children, frozen.props)
+            children.append(frozen)
+        return tuple(children)
+
+    def _forget(self, node_id: str, tree_index: TreeIndex) -> None:
+        """Drop a removed subtree (except nodes that now live elsewhere)."""
+        stack = [node_id]
+        while stack:
+            current = self._nodes.pop(stack.pop(), None)
+            if current is not None:
+                stack.extend(c.id for c in current.children if c.id not in tree_index)
+
+    def _freeze_subtree(self, start: WidgetNode) -> FrozenNode:
+        # Post-order with an explicit stack so depth is unbounded.
+        stack: list[tuple[WidgetNode, bool]] = [(start, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((c, False) for c in node.children)
+                continue
+            self._nodes[node.id] = FrozenNode.of(
+                node, tuple([self._nodes[c.id] for c in node.children]))
+        return self._nodes[start.id]
@@ -0,0 +1,113 @@
+"""Id → node/parent/position index kept in step with tree_ops edits."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+
+from src.models.widget_node import WidgetNode
+
+
+class TreeIndex:
+    """Constant-time lookups over a widget tree.
+
+    Maps every node id to its node, its parent and its position in the
+    parent's ``children`` list.  The index is only correct while every edit
+    goes through :mod:`src.engine.tree_ops` with ``tree_index=`` set; after
+    any other mutation call :meth:`rebuild`.
+
+    ``on_touch`` is called with every node right before tree_ops mutates it,
+    which is how the undo history records what an edit changed.
+    """
+
+    def __init__(self, root: WidgetNode) -> None:
+        self.root = root
+        self.on_touch: Callable[[WidgetNode], None] | None = None
+        self._nodes: dict[str, WidgetNode] = {}
+        self._parents: dict[str, WidgetNode | None] = {}
+        self._positions: dict[str, int] = {}
+        self.rebuild()
+
+    def rebuild(self, root: WidgetNode | None = None) -> None:
+        """Re-index from scratch (O(n))."""
+        if root is not None:
+            self.root = root
+        self._nodes.clear()
+        self._parents.clear()
+        self._positions.clear()
+        self.add_subtree(self.root, None)
+        self._positions[self.root.id] = 0
+
+    # --- queries ---------------------------------------------------------
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def get(self, node_id: str) -> WidgetNode | None:
+        return self._nodes.get(node_id)
+
+    def parent_of(self, node_id: str) -> WidgetNode | None:
+        return self._parents.get(node_id)
+
+    def position_of(self, node_id: str) -> int | None:
+        return self._positions.get(node_id)
+
+    def ancestors(self, node_id: str) -> Iterator[WidgetNode]:
+        """Yield the parents of *node_id*, nearest first (O(depth))."""
+        parent = self._parents.get(node_id)
+        while parent is not None:
+            yield parent
+            parent = self._parents.get(parent.id)
+
+    def is_ancestor(self, ancestor_id: str, descendant_id: str) -> bool:
+        if ancestor_id == descendant_id or ancestor_id not in self._nodes:
+            return False
+        return any(p.id == ancestor_id for p in self.ancestors(descendant_id))
+
+    def depth_of(self, node_id: str) -> int:
+        return sum(1 for _ in self.ancestors(node_id))
+
+    # --- maintenance (called by tree_ops) --------------------------------
+
+    def touch(self, *nodes: WidgetNode) -> None:
+        """Announce that *nodes* are about to be mutated."""
+        if self.on_touch is not None:
+            for node in nodes:
+                self.on_touch(node)
+
+    def add_subtree(self, node: WidgetNode, parent: WidgetNode | None) -> None:
+        """Register *node* and all of its descendants."""
+        stack: list[tuple[WidgetNode, WidgetNode | None]] = [(node, parent)]
+        while stack:
+            current, current_parent = stack.pop()
+            self._nodes[current.id] = current
+            self._parents[current.id] = current_parent
+            for i, child in enumerate(current.children):
+                self._positions[child.id] = i
+                stack.append((child, current))
+
+    def remove_subtree(self, node: WidgetNode) -> None:
+        """Forget *node* and all of its descendants."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self._nodes.pop(current.id, None)
+            self._parents.pop(current.id, None)
+            self._positions.pop(current.id, None)
+            stack.extend(current.children)
+
+    def add_node(self, node: WidgetNode, parent: WidgetNode | None, position: int) -> None:
+        """Register a single node without walking its children."""
+        self._nodes[node.id] = node
+        self._parents[node.id] = parent
+        self._positions[node.id] = position
+
+    def set_parent(self, node: WidgetNode, parent: WidgetNode | None) -> None:
+        self._parents[node.id] = parent
+
+    def reindex_children(self, parent: WidgetNode, start: int = 0) -> None:
+        """Refresh stored positions of ``parent.children[start:]``."""
+        children = parent.children
+        for i in range(start, len(children)):
+            self._positions[children[i].id] = i
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+from src.engine.tree_index import TreeIndex
 from src.models.widget_node import WidgetNode
+from src.utils.id_generator import IdAllocator
 
 
 def walk(root: WidgetNode):
@@ -10,22 +12,44 @@ def walk(root: WidgetNode):
         yield from walk(child)
 
 
-def find_node(root: WidgetNode, node_id: str) -> WidgetNode | None:
+def find_node(
+    root: WidgetNode,
+    node_id: str,
+    *,
+    tree_index: TreeIndex | None = None,
+) -> WidgetNode | None:
+    if tree_index is not None:
+        return tree_index.get(node_id)
     for node in walk(root):
         if node.id == node_id:
             return node
     return None
 
 
-def find_parent(root: WidgetNode, node_id: str) -> WidgetNode | None:
+def find_parent(
+    root: WidgetNode,
+    node_id: str,
+    *,
+    tree_index: TreeIndex | None = None,
+) -> WidgetNode | None:
+    if tree_index is not None:
+        return tree_index.parent_of(node_id)
     for node in walk(root):
         if any(child.id == node_id for child in node.children):
             return node
     return None
 
 
-def is_ancestor(root: WidgetNode, ancestor_id: str, descendant_id: str) -> bool:
+def is_ancestor(
+    root: WidgetNode,
+    ancestor_id: str,
+    descendant_id: str,
+    *,
+    tree_index: TreeIndex | None = None,
+) -> bool:
     """Return True if *ancestor_id* is a (strict) ancestor of *descendant_id*."""
+    if tree_index is not None:
+        return tree_index.is_ancestor(ancestor_id, descendant_id)
     ancestor = find_node(root, ancestor_id)
     if not ancestor:
         return False
@@ -40,22 +64,40 @@ def insert_child(
     child: WidgetNode,
     index: int | None = None,
     slot: str | None = None,
+    *,
+    tree_index: TreeIndex | None = None,
 ) -> None:
+    if tree_index is not None:
+        tree_index.touch(parent, child)
     child.parent_id = parent.id
     child.slot = slot
     if index is None:
         parent.children.append(child)
+        start = len(parent.children) - 1
     else:
         parent.children.insert(index, child)
-    _reindex(parent)
+        start = min(index, len(parent.children) - 1) if index >= 0 else 0
+    if tree_index is not None:
+        tree_index.add_subtree(child, parent)
+    _reindex(parent, tree_index=tree_index, start=start)
 
 
-def delete_node(root: WidgetNode, node_id: str) -> bool:
-    parent = find_parent(root, node_id)
+def delete_node(
+    root: WidgetNode,
+    node_id: str,
+    *,
+    tree_index: TreeIndex | None = None,
+) -> bool:
+    parent = find_parent(root, node_id, tree_index=tree_index)
     if not parent:
         return False
-    parent.children = [c for c in parent.children if c.id != node_id]
-    _reindex(parent)
+    idx = _position(parent, node_id, tree_index)
+    if tree_index is not None:
+        tree_index.touch(parent)
+    node = parent.children.pop(idx)
+    if tree_index is not None:
+        tree_index.remove_subtree(node)
+    _reindex(parent, tree_index=tree_index, start=idx)
     return True
 
 
@@ -65,39 +107,63 @@ def move_node(
     target_parent_id: str,
     index: int | None = None,
     slot: str | None = None,
+    *,
+    tree_index: TreeIndex | None = None,
 ) -> bool:
     """Move a node to a new parent.  Returns False if the move would create a
     cycle (i.e. moving a node into its own descendant) or if any id is invalid.
     """
-    node = find_node(root, node_id)
-    source_parent = find_parent(root, node_id)
-    target_parent = find_node(root, target_parent_id)
+    node = find_node(root, node_id, tree_index=tree_index)
+    source_parent = find_parent(root, node_id, tree_index=tree_index)
+    target_parent = find_node(root, target_parent_id, tree_index=tree_index)
     if not node or not source_parent or not target_parent:
         return False
 
     # Prevent cycles: target must not be inside the subtree of node
-    if target_parent_id == node_id or is_ancestor(root, node_id, target_parent_id):
+    if target_parent_id == node_id or is_ancestor(
+        root, node_id, target_parent_id, tree_index=tree_index
+    ):
         return False
 
-    source_parent.children = [c for c in source_parent.children if c.id != node_id]
-    _reindex(source_parent)
-    insert_child(target_parent, node, index=index, slot=slot)
+    idx = _position(source_parent, node_id, tree_index)
+    if tree_index is not None:
+        tree_index.touch(source_parent, target_parent, node)
+    source_parent.children.pop(idx)
+    _reindex(source_parent, tree_index=tree_index, start=idx)
+    node.parent_id = target_parent.id
+    node.slot = slot
+    if index is None:
+        target_parent.children.append(node)
+    else:
+        target_parent.children.insert(index, node)
+    if tree_index is not None:
+        # The subtree itself is unchanged, only its attachment point moves.
+        tree_index.set_parent(node, target_parent)
+    _reindex(target_parent, tree_index=tree_index)
     return True
 
 
-def reorder_sibling(root: WidgetNode, node_id: str, delta: int) -> bool:
-    parent = find_parent(root, node_id)
+def reorder_sibling(
+    root: WidgetNode,
+    node_id: str,
+    delta: int,
+    *,
+    tree_index: TreeIndex | None = None,
+) -> bool:
+    parent = find_parent(root, node_id, tree_index=tree_index)
     if not parent:
         return False
-    idx = next((i for i, c in enumerate(parent.children) if c.id == node_id), None)
+    idx = _position(parent, node_id, tree_index)
     if idx is None:
         return False
     new_idx = idx + delta
     if new_idx < 0 or new_idx >= len(parent.children):
         return False
+    if tree_index is not None:
+        tree_index.touch(parent)
     node = parent.children.pop(idx)
     parent.children.insert(new_idx, node)
-    _reindex(parent)
+    _reindex(parent, tree_index=tree_index, start=min(idx, new_idx))
     return True
 
 
@@ -106,12 +172,16 @@ def wrap_node(
     node_id: str,
     wrapper: WidgetNode,
     wrapper_slot: str = "content",
+    *,
+    tree_index: TreeIndex | None = None,
 ) -> bool:
-    parent = find_parent(root, node_id)
-    node = find_node(root, node_id)
+    parent = find_parent(root, node_id, tree_index=tree_index)
+    node = find_node(root, node_id, tree_index=tree_index)
     if not parent or not node:
         return False
-    idx = next(i for i, c in enumerate(parent.children) if c.id == node_id)
+    idx = _position(parent, node_id, tree_index)
+    if tree_index is not None:
+        tree_index.touch(parent, node, wrapper)
     parent.children[idx] = wrapper
     wrapper.parent_id = parent.id
     wrapper.slot = node.slot
@@ -119,11 +189,305 @@ def wrap_node(
     node.parent_id = wrapper.id
     node.slot = wrapper_slot
     wrapper.children.append(node)
-    _reindex(parent)
-    _reindex(wrapper)
+    if tree_index is not None:
+        tree_index.add_node(wrapper, parent, idx)
+        tree_index.set_parent(node, wrapper)
+    _reindex(parent, tree_index=tree_index, start=idx)
+    _reindex(wrapper, tree_index=tree_index)
     return True
 
 
-def _reindex(parent: WidgetNode) -> None:
-    for i, child in enumerate(parent.children):
-        child.order = i
\ No newline at end of file
+def set_prop(
+    root: WidgetNode,
+    node_id: str,
+    key: str,
+    value,
+    *,
+    tree_index: TreeIndex | None = None,
+) -> bool:
+    node = find_node(root, node_id, tree_index=tree_index)
+    if not node:
+        return False
+    if tree_index is not None:
+        tree_index.touch(node)
+    node.props[key] = value
+    return True
+
+
+# --- bulk edits -------------------------------------------------------------
+# Same effect as calling the single-node operation once per node, but every
+# affected parent's children are spliced and reindexed only once.
+
+
+def insert_children(
+    parent: WidgetNode,
+    children: list[WidgetNode],
+    index: int | None = None,
+    slot: str | None = None,
+    *,
+    tree_index: TreeIndex | None = None,
+) -> None:
+    """Insert *children*, in order, at *index* (None appends)."""
+    if not children:
+        return
+    if tree_index is not None:
+        tree_index.touch(parent, *children)
+    for child in children:
+        child.parent_id = parent.id
+        child.slot = slot
+    siblings = parent.children
+    if index is None or index >= len(siblings):
+        start = len(siblings)
+    else:
+        start = max(0, index + len(siblings) if index < 0 else index)
+    siblings[start:start] = children
+    if tree_index is not None:
+        for child in children:
+            tree_index.add_subtree(child, parent)
+    _reindex(parent, tree_index=tree_index, start=start)
+
+
+def delete_nodes(
+    root: WidgetNode,
+    node_ids: list[str],
+    *,
+    tree_index: TreeIndex | None = None,
+) -> int:
+    """Delete every node in *node_ids*; returns how many were removed.
+
+    Nodes inside another deleted node's subtree go with it and are not
+    counted; the root and unknown ids are skipped.
+    """
+    doomed = set(node_ids) - {root.id}
+    parents: dict[str, WidgetNode] = {}
+    if tree_index is not None:
+        for node_id in doomed:
+            parent = tree_index.parent_of(node_id)
+            if parent is not None and not any(
+                a.id in doomed for a in tree_index.ancestors(node_id)
+            ):
+                parents.setdefault(parent.id, parent)
+    else:
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            for child in node.children:
+                if child.id in doomed:
+                    parents.setdefault(node.id, node)
+                else:
+                    stack.append(child)
+
+    removed = 0
+    for parent in parents.values():
+        if tree_index is not None:
+            tree_index.touch(parent)
+        kept: list[WidgetNode] = []
+        start = None
+        for i, child in enumerate(parent.children):
+            if child.id not in doomed:
+                kept.append(child)
+                continue
+            if start is None:
+                start = i
+            removed += 1
+            if tree_index is not None:
+                tree_index.remove_subtree(child)
+        parent.children[:] = kept
+        _reindex(parent, tree_index=tree_index, start=start or 0)
+    return removed
+
+
+def move_nodes(
+    root: WidgetNode,
+    node_ids: list[str],
+    target_parent_id: str,
+    index: int | None = None,
+    slot: str | None = None,
+    *,
+    tree_index: TreeIndex | None = None,
+) -> int:
+    """Move the nodes in *node_ids*, in that order, under *target_parent_id*.
+
+    *index* counts positions among the target's children once the moved
+    nodes are gone (as in :func:`move_node`).  Moves that would create a
+    cycle, unknown ids, the root and nodes whose ancestor is moved too are
+    skipped.  Returns how many nodes moved.
+    """
+    # Without an index, build a throwaway one: one walk instead of one per id.
+    lookup = tree_index if tree_index is not None else TreeIndex(root)
+    target = lookup.get(target_parent_id)
+    if target is None:
+        return 0
+    wanted = set(node_ids) - {root.id}
+    moving: list[tuple[WidgetNode, WidgetNode]] = []
+    for node_id in dict.fromkeys(node_ids):
+        node = lookup.get(node_id)
+        source = lookup.parent_of(node_id)
+        if node is None or source is None or node_id == target_parent_id:
+            continue
+        if lookup.is_ancestor(node_id, target_parent_id) or any(
+            a.id in wanted for a in lookup.ancestors(node_id)
+        ):
+            continue
+        moving.append((node, source))
+    if not moving:
+        return 0
+
+    nodes = [node for node, _ in moving]
+    sources: dict[str, WidgetNode] = {s.id: s for _, s in moving}
+    if tree_index is not None:
+        tree_index.touch(*sources.values(), target, *nodes)
+    moved = {id(node) for node in nodes}
+    starts: dict[str, int] = {}
+    for source in sources.values():
+        kept: list[WidgetNode] = []
+        for i, child in enumerate(source.children):
+            if id(child) in moved:
+                starts.setdefault(source.id, i)
+            else:
+                kept.append(child)
+        source.children[:] = kept
+
+    for node in nodes:
+        node.parent_id = target.id
+        node.slot = slot
+    siblings = target.children
+    if index is None or index >= len(siblings):
+        at = len(siblings)
+    else:
+        at = max(0, index + len(siblings) if index < 0 else index)
+    siblings[at:at] = nodes
+    if tree_index is not None:
+        for node in nodes:
+            tree_index.set_parent(node, target)
+    for source in sources.values():
+        if source is not target:
+            _reindex(source, tree_index=tree_index, start=starts[source.id])
+    _reindex(target, tree_index=tree_index, start=min(at, starts.get(target.id, at)))
+    return len(nodes)
+
+
+def set_props(
+    root: WidgetNode,
+    node_ids: list[str],
+    props: dict,
+    *,
+    tree_index: TreeIndex | None = None,
+) -> int:
+    """Apply *props* to every node in *node_ids*; returns how many changed.
+
+    Nodes that already hold every value, and unknown ids, are left alone
+    (and not touched), so only the nodes that really change are reported.
+    """
+    wanted = set(node_ids)
+    if tree_index is not None:
+        nodes = [n for n in map(tree_index.get, dict.fromkeys(node_ids)) if n is not None]
+    else:
+        nodes = [n for n in walk(root) if n.id in wanted]
+    changed = 0
+    for node in nodes:
+        current = node.props
+        if all(k in current and current[k] == v for k, v in props.items()):
+            continue
+        if tree_index is not None:
+            tree_index.touch(node)
+        current.update(props)
+        changed += 1
+    return changed
+
+
+def copy_nodes(
+    root: WidgetNode,
+    node_ids: list[str],
+    *,
+    tree_index: TreeIndex | None = None,
+) -> list[WidgetNode]:
+    """Detached exact copies of the nodes in *node_ids*, e.g. for a clipboard.
+
+    Nodes inside another listed node's subtree come along with it and are
+    not copied twice; the root and unknown ids are skipped.
+    """
+    lookup = tree_index if tree_index is not None else TreeIndex(root)
+    return [node.clone(deep_new_ids=False) for node in _outermost(lookup, node_ids)]
+
+
+def duplicate_nodes(
+    root: WidgetNode,
+    node_ids: list[str],
+    *,
+    tree_index: TreeIndex | None = None,
+    ids: IdAllocator | None = None,
+) -> list[WidgetNode]:
+    """Insert a fresh-id copy of each node in *node_ids* right after it.
+
+    Skips what :func:`copy_nodes` skips.  New ids come from *ids*, by
+    default an allocator checked against the tree.  Returns the copies.
+    """
+    lookup = tree_index if tree_index is not None else TreeIndex(root)
+    if ids is None:
+        ids = IdAllocator(lookup)
+    copies: dict[str, WidgetNode] = {}
+    parents: dict[str, WidgetNode] = {}
+    for node in _outermost(lookup, node_ids):
+        copies[node.id] = node.clone(ids=ids)
+        parent = lookup.parent_of(node.id)
+        parents.setdefault(parent.id, parent)
+    if tree_index is not None:
+        tree_index.touch(*parents.values(), *copies.values())
+
+    for parent in parents.values():
+        merged: list[WidgetNode] = []
+        added: list[WidgetNode] = []
+        start = None
+        for i, child in enumerate(parent.children):
+            merged.append(child)
+            copy = copies.get(child.id)
+            if copy is not None:
+                if start is None:
+                    start = i + 1
+                merged.append(copy)
+                added.append(copy)
+        parent.children[:] = merged
+        if tree_index is not None:
+            for copy in added:
+                tree_index.add_subtree(copy, parent)
+        _reindex(parent, tree_index=tree_index, start=start)
+    return list(copies.values())
+
+
+def _outermost(lookup: TreeIndex, node_ids: list[str]) -> list[WidgetNode]:
+    """Nodes of *node_ids* (first-seen order) not inside another one's subtree.
+
+    The root and unknown ids are dropped.
+    """
+    wanted = set(node_ids) - {lookup.root.id}
+    out: list[WidgetNode] = []
+    for node_id in dict.fromkeys(node_ids):
+        node = lookup.get(node_id)
+        if node is None or node_id not in wanted:
+            continue
+        if not any(a.id in wanted for a in lookup.ancestors(node_id)):
+            out.append(node)
+    return out
+
+
+def _position(
+    parent: WidgetNode, node_id: str, tree_index: TreeIndex | None
+) -> int | None:
+    """Index of *node_id* within ``parent.children``."""
+    if tree_index is not None:
+        return tree_index.position_of(node_id)
+    return next((i for i, c in enumerate(parent.children) if c.id == node_id), None)
+
+
+def _reindex(
+    parent: WidgetNode,
+    *,
+    tree_index: TreeIndex | None = None,
+    start: int = 0,
+) -> None:
+    children = parent.children
+    for i in range(start, len(children)):
+        children[i].order = i
+    if tree_index is not None:
+        tree_index.reindex_children(parent, start)
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 import operator
-from functools import reduce
+from collections.abc import Mapping
+from functools import lru_cache, reduce
+from typing import Any, NamedTuple
 
 import flet as ft
 
-from src.models.enum_map import ENUM_MAP
+from src.models.component import COMPONENT_REF, COMPONENT_TYPE, ComponentDef, resolve
 from src.models.widget_node import WidgetNode
-from src.models.widget_registry import WIDGET_REGISTRY, enum_key_for
+from src.models.widget_registry import WIDGET_SPECS
 from src.utils.icons import resolve_icon
+from src.utils.profiling import profiler
 
 FLET_CLASS_MAP: dict[str, type] = {
     "Text": ft.Text,
@@ -20,6 +23,7 @@ FLET_CLASS_MAP: dict[str, type] = {
 }
 
 
+@lru_cache(maxsize=None)
 def _resolve_flet_constant(dotted: str):
     """Safely resolve a string like 'ft.FontWeight.BOLD' to the real object.
 
@@ -34,57 +38,148 @@ def _resolve_flet_constant(dotted: str):
         raise ValueError(f"Unknown flet constant: {dotted}")
 
 
+def _same_controls(a: list[ft.Control], b: list[ft.Control]) -> bool:
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+
+class _Rendered:
+    """A live control plus what it was last rendered from."""
+
+    __slots__ = ("control", "type", "props", "slots")
+
+    def __init__(self, control: ft.Control, node_type: str, props: dict) -> None:
+        self.control = control
+        self.type = node_type
+        self.props = props
+        self.slots: dict[str, list[ft.Control]] = {}
+
+
+class _Scope(NamedTuple):
+    """Where a component definition is being rendered from."""
+    prefix: str                               # cache key prefix: "<instance key>/"
+    overrides: dict[str, dict[str, Any]]      # definition node id -> props
+    active: tuple[str, ...]                   # components being expanded
+
+
 class TreeRenderer:
-    """Convert a WidgetNode tree into real Flet controls."""
+    """Convert a WidgetNode tree into real Flet controls.
 
-    def render(self, node: WidgetNode) -> ft.Control:
-        cls = FLET_CLASS_MAP.get(node.type)
-        if cls is None:
-            raise ValueError(f"No Flet class mapped for widget type: {node.type}")
+    Controls are cached by node id and reused across renders: only props
+    that changed since the last render are assigned, and a slot is
+    reassigned only when its child controls changed.  A node whose type
+    changed or that lost a prop gets a fresh control.  Calling ``update()``
+    on a mounted ancestor then sends just those deltas to the client.
 
-        # Resolve props — skip event props (they are handler name strings,
-        # not meaningful for live preview).
-        props: dict = {}
-        for k, v in node.props.items():
-            pdef = WIDGET_REGISTRY.get(node.type, {}).get("props", {}).get(k, {})
-            if pdef.get("type") == "event":
-                continue  # skip event handlers in preview
-            props[k] = self._resolve_prop(node.type, k, v)
+    Component instances render their definition's nodes with the
+    instance's overrides applied, cached under ``"<instance id>/<node id>"``
+    so every instance keeps its own controls.
+    """
 
-        # Flet Button API compatibility:
-        # newer versions can reject `text=` in favor of content-based buttons.
-        if node.type == "ElevatedButton" and "text" in props and "content" not in props:
-            label = props.pop("text")
-            if label is not None:
-                props["content"] = ft.Text(str(label))
+    def __init__(self) -> None:
+        self._cache: dict[str, _Rendered] = {}
+        self._created = 0
+        self._components: Mapping[str, ComponentDef] | None = None
+
+    def render(
+        self, node: WidgetNode, components: Mapping[str, ComponentDef] | None = None,
+    ) -> ft.Control:
+        seen: set[str] = set()
+        self._created = 0
+        self._components = components
+        with profiler.span("preview.render"):
+            control = self._render(node, seen)
+        profiler.count("preview.nodes_rendered", len(seen))
+        profiler.count("preview.controls_created", self._created)
+        if len(self._cache) > len(seen):
+            self._cache = {k: v for k, v in self._cache.items() if k in seen}
+        return control
 
-        control = cls(**props)
+    def _render(self, node: WidgetNode, seen: set[str], scope: _Scope | None = None) -> ft.Control:
+        key = node.id if scope is None else scope.prefix + node.id
+        if node.type == COMPONENT_TYPE:
+            return self._render_instance(node, key, seen, scope)
+        cls = FLET_CLASS_MAP.get(node.type)
+        if cls is None:
+            raise ValueError(f"No Flet class mapped for widget type: {node.type}")
+        seen.add(key)
+        spec = WIDGET_SPECS[node.type]
+        props = node.props
+        if scope is not None and node.id in scope.overrides:
+            props = {**props, **scope.overrides[node.id]}
+
+        entry = self._cache.get(key)
+        if entry is None or entry.type != node.type or not entry.props.keys() <= props.keys():
+            entry = _Rendered(cls(**self._control_props(node, props)), node.type, dict(props))
+            self._cache[key] = entry
+            self._created += 1
+        elif entry.props != props:
+            changed = {
+                k: v for k, v in props.items()
+                if k not in entry.props or entry.props[k] != v
+            }
+            for attr, value in self._control_props(node, changed).items():
+                setattr(entry.control, attr, value)
+            entry.props = dict(props)
+        control = entry.control
 
         # Apply children respecting slot definitions from the registry
-        spec = WIDGET_REGISTRY.get(node.type, {})
-        slots = spec.get("children", [])
         slot_map: dict[str, list[WidgetNode]] = {}
         for child in node.children:
             slot_map.setdefault(child.slot or "controls", []).append(child)
 
-        for slot_def in slots:
-            slot_name = slot_def["slot"]
+        for slot_name, max_children in spec.slots:
             children = slot_map.get(slot_name, [])
-            rendered = [self.render(c) for c in children]
-
-            if slot_def["max"] == 1:
+            rendered = [self._render(c, seen, scope) for c in children]
+            previous = entry.slots.get(slot_name)
+            if previous is not None and _same_controls(previous, rendered):
+                continue
+            entry.slots[slot_name] = rendered
+            if max_children == 1:
                 setattr(control, slot_name, rendered[0] if rendered else None)
             else:
-                setattr(control, slot_name, rendered)
+                setattr(control, slot_name, list(rendered))
 
         return control
 
+    def _render_instance(
+        self, node: WidgetNode, key: str, seen: set[str], scope: _Scope | None,
+    ) -> ft.Control:
+        definition = resolve(node, self._components)
+        if definition is None:
+            raise ValueError(f"Unknown component: {node.props.get(COMPONENT_REF)}")
+        active = scope.active if scope is not None else ()
+        if definition.name in active:
+            raise ValueError(f"Component {definition.name} contains itself")
+        seen.add(key)
+        inner = _Scope(key + "/", definition.overrides(node), (*active, definition.name))
+        return self._render(definition.root, seen, inner)
+
+    def _control_props(self, node: WidgetNode, props: dict) -> dict:
+        """Constructor kwargs / attributes for the given subset of node props.
+
+        Skips event props (they are handler name strings, not meaningful
+        for live preview).
+        """
+        spec = WIDGET_SPECS[node.type]
+        out: dict = {}
+        for k, v in props.items():
+            if k in spec.event_props:
+                continue  # skip event handlers in preview
+            out[k] = self._resolve_prop(node.type, k, v)
+
+        # Flet Button API compatibility:
+        # newer versions can reject `text=` in favor of content-based buttons.
+        if node.type == "ElevatedButton" and "text" in out and "content" not in out:
+            label = out.pop("text")
+            out["content"] = ft.Text(str(label)) if label is not None else None
+        return out
+
     def _resolve_prop(self, widget_type: str, prop: str, value):
         """Map enum string values to real Flet constants."""
-        pdef = WIDGET_REGISTRY.get(widget_type, {}).get("props", {}).get(prop, {})
-        if pdef.get("type") == "enum" and isinstance(value, str):
-            ek = enum_key_for(widget_type, prop)
-            mapped = ENUM_MAP.get(ek, {}).get(value)
+        spec = WIDGET_SPECS.get(widget_type)
+        enum_codes = spec.enum_codes.get(prop) if spec is not None else None
+        if enum_codes is not None and isinstance(value, str):
+            mapped = enum_codes.get(value)
             if mapped:
                 return _resolve_flet_constant(mapped)
         if (widget_type, prop) in {("Icon", "name"), ("IconButton", "icon"), ("ElevatedButton", "icon")}:
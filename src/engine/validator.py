@@ -1,39 +1,216 @@
 from __future__ import annotations
 
+import keyword
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from src.engine.tree_index import TreeIndex
+from src.models.component import COMPONENT_REF, COMPONENT_TYPE, ComponentDef, resolve
 from src.models.widget_node import WidgetNode
-from src.models.widget_registry import WIDGET_REGISTRY
+from src.models.widget_registry import WIDGET_SPECS
 
 
 class ValidationError(ValueError):
     pass
 
 
-def validate_tree(root: WidgetNode) -> None:
+@dataclass(frozen=True)
+class Diagnostic:
+    """One validation problem; *node_id* is the node to select to fix it."""
+    node_id: str
+    message: str
+
+
+def validate_tree(
+    root: WidgetNode, components: Mapping[str, ComponentDef] | None = None,
+) -> None:
     """Validate the entire widget tree.  Raises ValidationError on first failure."""
-    _validate_node(root)
+    problems = validate_components(components)
+    if problems:
+        raise ValidationError(problems[0].message)
+    for node in _preorder(root):
+        problems = _check_node(node, components)
+        if problems:
+            raise ValidationError(problems[0].message)
+
+
+def validate_all(
+    root: WidgetNode, components: Mapping[str, ComponentDef] | None = None,
+) -> list[Diagnostic]:
+    """Return every problem in the components, then the tree in tree order."""
+    return validate_components(components) + [
+        d for node in _preorder(root) for d in _check_node(node, components)]
+
+
+def validate_components(components: Mapping[str, ComponentDef] | None) -> list[Diagnostic]:
+    """Problems inside component definitions, reported against their nodes."""
+    problems: list[Diagnostic] = []
+    for name, definition in sorted((components or {}).items()):
+        for node in _preorder(definition.root):
+            problems.extend(_check_node(node, components))
+        for param, (node_id, prop) in definition.params.items():
+            if not param.isidentifier() or keyword.iskeyword(param) or param == COMPONENT_REF:
+                problems.append(Diagnostic(
+                    definition.root.id, f"Component {name} has an invalid param name '{param}'"))
+            elif definition.param_spec(param) is None:
+                problems.append(Diagnostic(
+                    definition.root.id,
+                    f"Component {name} param '{param}' is bound to unknown "
+                    f"property '{prop}' of node '{node_id}'",
+                ))
+        if _contains_itself(definition, components):
+            problems.append(Diagnostic(definition.root.id, f"Component {name} contains itself"))
+    return problems
+
+
+def _contains_itself(definition: ComponentDef, components: Mapping[str, ComponentDef]) -> bool:
+    seen: set[str] = set()
+    stack = [definition.root]
+    while stack:
+        node = stack.pop()
+        if node.type == COMPONENT_TYPE:
+            nested = resolve(node, components)
+            if nested is definition:
+                return True
+            if nested is not None and nested.name not in seen:
+                seen.add(nested.name)
+                stack.append(nested.root)
+        stack.extend(node.children)
+    return False
+
+
+class Validator:
+    """Validation engine that caches each node's diagnostics.
+
+    A node's result depends only on its type, props and the (id, slot) of
+    its children, and is reused while that key is unchanged.  Pass the ids
+    drained from a DirtySet plus the tree index to :meth:`validate` to
+    re-check only those nodes and their parents (for slot-count rules)
+    instead of walking the whole tree.  Nothing recurses, so tree depth is
+    unbounded.  Component definitions are checked again only when the
+    *components* mapping is replaced.
+    """
 
+    def __init__(self) -> None:
+        self._results: dict[str, tuple[tuple, list[Diagnostic]]] = {}
+        self._failing: set[str] = set()
+        self._components: Mapping[str, ComponentDef] | None = None
+        self._component_problems: list[Diagnostic] = []
 
-def _validate_node(node: WidgetNode) -> None:
-    if node.type not in WIDGET_REGISTRY:
-        raise ValidationError(f"Unknown widget type: {node.type}")
+    def validate(
+        self,
+        root: WidgetNode,
+        dirty: set[str] | None = None,
+        tree_index: TreeIndex | None = None,
+        components: Mapping[str, ComponentDef] | None = None,
+    ) -> list[Diagnostic]:
+        """Return every problem in the components, then the tree in tree order."""
+        if components is not self._components:
+            self._components = components
+            self._component_problems = validate_components(components)
+            dirty = None  # instances may now resolve differently
+        return self._component_problems + self._validate(root, dirty, tree_index)
 
-    spec = WIDGET_REGISTRY[node.type]
-    props = spec["props"]
+    def _validate(
+        self,
+        root: WidgetNode,
+        dirty: set[str] | None,
+        tree_index: TreeIndex | None,
+    ) -> list[Diagnostic]:
+        if dirty is None or tree_index is None or root.id not in self._results:
+            seen: set[str] = set()
+            for node in _preorder(root):
+                seen.add(node.id)
+                self._update(node)
+            self._results = {k: v for k, v in self._results.items() if k in seen}
+            self._failing &= seen
+            return [d for node in _preorder(root) if node.id in self._failing
+                    for d in self._results[node.id][1]]
+
+        for node_id in dirty:
+            node = tree_index.get(node_id)
+            if node is None:
+                continue
+            parent = tree_index.parent_of(node_id)
+            if parent is not None:
+                self._update(parent)
+            # New subtrees have no cached results yet: check them whole.
+            stack = [node]
+            while stack:
+                current = stack.pop()
+                self._update(current)
+                stack.extend(c for c in current.children if c.id not in self._results)
+        if len(self._results) > 2 * len(tree_index):
+            self._results = {k: v for k, v in self._results.items() if k in tree_index}
+            self._failing = {k for k in self._failing if k in tree_index}
+
+        failing = [tree_index.get(i) for i in self._failing if i in tree_index]
+        failing.sort(key=lambda n: _tree_position(n, tree_index))
+        return [d for node in failing for d in self._results[node.id][1]]
+
+    def _update(self, node: WidgetNode) -> None:
+        key = (
+            node.type,
+            tuple(node.props.items()),
+            tuple((c.id, c.slot) for c in node.children),
+        )
+        if node.type == COMPONENT_TYPE:
+            key += (resolve(node, self._components),)
+        cached = self._results.get(node.id)
+        if cached is not None and cached[0] == key:
+            return
+        problems = _check_node(node, self._components)
+        self._results[node.id] = (key, problems)
+        if problems:
+            self._failing.add(node.id)
+        else:
+            self._failing.discard(node.id)
+
+
+def _preorder(root: WidgetNode):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
+
+
+def _tree_position(node: WidgetNode, tree_index: TreeIndex) -> tuple[int, ...]:
+    """Sort key placing nodes in tree (pre-)order."""
+    path = [tree_index.position_of(node.id) or 0]
+    path.extend(tree_index.position_of(a.id) or 0 for a in tree_index.ancestors(node.id))
+    return tuple(reversed(path))
+
+
+def _check_node(
+    node: WidgetNode, components: Mapping[str, ComponentDef] | None = None,
+) -> list[Diagnostic]:
+    """All problems with *node* itself and the slots of its direct children."""
+    if node.type == COMPONENT_TYPE:
+        return _check_instance(node, components)
+    spec = WIDGET_SPECS.get(node.type)
+    if spec is None:
+        return [Diagnostic(node.id, f"Unknown widget type: {node.type}")]
+    problems: list[Diagnostic] = []
 
     # --- property checks ---
+    prop_types = spec.prop_types
+    enum_options = spec.enum_options
     for key, value in node.props.items():
-        if key not in props:
-            raise ValidationError(f"Unknown property '{key}' on {node.type}")
-        pdef = props[key]
-        if pdef["type"] == "enum" and value is not None and value not in pdef["options"]:
-            raise ValidationError(f"Invalid value '{value}' for {node.type}.{key}")
+        if key not in prop_types:
+            problems.append(Diagnostic(node.id, f"Unknown property '{key}' on {node.type}"))
+            continue
+        options = enum_options.get(key)
+        if options is not None and value is not None and value not in options:
+            problems.append(Diagnostic(node.id, f"Invalid value '{value}' for {node.type}.{key}"))
 
     # --- children / slot checks ---
-    slots = spec["children"]
-    declared_slot_names = {s["slot"] for s in slots}
+    slots = spec.slots
+    declared_slot_names = spec.slot_names
 
     if not slots and node.children:
-        raise ValidationError(f"{node.type} does not accept children")
+        problems.append(Diagnostic(node.id, f"{node.type} does not accept children"))
+        return problems
 
     # Check each child is in a valid slot
     slot_counts: dict[str, int] = {}
@@ -41,32 +218,54 @@ def _validate_node(node: WidgetNode) -> None:
         child_slot = child.slot
         # If slot is None, try to infer the default (only valid if exactly one slot exists)
         if child_slot is None:
-            if len(slots) == 1:
-                child_slot = slots[0]["slot"]
-            elif slots:
-                raise ValidationError(
+            if spec.default_slot is not None:
+                child_slot = spec.default_slot
+            else:
+                problems.append(Diagnostic(
+                    child.id,
                     f"Child '{child.id}' under {node.type} has no slot assigned "
-                    f"and parent has multiple slots: {declared_slot_names}"
-                )
+                    f"and parent has multiple slots: {set(declared_slot_names)}",
+                ))
+                continue
 
         if child_slot not in declared_slot_names:
-            raise ValidationError(
+            problems.append(Diagnostic(
+                child.id,
                 f"Child '{child.id}' assigned to slot '{child_slot}' "
                 f"which is not declared on {node.type} "
-                f"(valid slots: {declared_slot_names})"
-            )
+                f"(valid slots: {set(declared_slot_names)})",
+            ))
+            continue
         slot_counts[child_slot] = slot_counts.get(child_slot, 0) + 1
 
     # Check max-children constraints per slot
-    for slot_def in slots:
-        slot_name = slot_def["slot"]
-        max_children = slot_def["max"]
+    for slot_name, max_children in slots:
         count = slot_counts.get(slot_name, 0)
         if max_children is not None and count > max_children:
-            raise ValidationError(
-                f"{node.type}.{slot_name} allows {max_children} child, found {count}"
-            )
+            problems.append(Diagnostic(
+                node.id,
+                f"{node.type}.{slot_name} allows {max_children} child, found {count}",
+            ))
+    return problems
 
-    # Recurse
-    for child in node.children:
-        _validate_node(child)
\ No newline at end of file
+
+def _check_instance(
+    node: WidgetNode, components: Mapping[str, ComponentDef] | None,
+) -> list[Diagnostic]:
+    definition = resolve(node, components)
+    if definition is None:
+        return [Diagnostic(node.id, f"Unknown component: {node.props.get(COMPONENT_REF)}")]
+    problems: list[Diagnostic] = []
+    for key, value in node.props.items():
+        if key == COMPONENT_REF:
+            continue
+        pdef = definition.param_spec(key) if key in definition.params else None
+        if pdef is None:
+            problems.append(Diagnostic(
+                node.id, f"Unknown property '{key}' on component {definition.name}"))
+        elif pdef["type"] == "enum" and value is not None and value not in pdef["options"]:
+            problems.append(Diagnostic(
+                node.id, f"Invalid value '{value}' for {definition.name}.{key}"))
+    if node.children:
+        problems.append(Diagnostic(node.id, "Component instances do not accept children"))
+    return problems
@@ -0,0 +1,117 @@
+"""Reusable components: a subtree defined once and placed by instance nodes."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.models.widget_node import WidgetNode
+from src.models.widget_registry import WIDGET_SPECS
+
+# Instance nodes have this type and name their definition in this prop;
+# every other prop on an instance overrides one of the definition's params.
+COMPONENT_TYPE = "Component"
+COMPONENT_REF = "component"
+
+# Prop types exposed as params when a component is made from a subtree.
+_PARAM_TYPES = frozenset({"str"})
+
+
+@dataclass(slots=True, eq=False)
+class ComponentDef:
+    """A named subtree shared by every instance that references it.
+
+    *params* exposes props inside *root* to instances as
+    ``{param: (node id, prop)}``.  Instances hold no copy of the subtree,
+    only their overrides.  A definition is never edited in place: store a
+    new one in ``ProjectState.components``, so caches and snapshots can
+    tell definitions apart by identity.
+    """
+
+    name: str
+    root: WidgetNode
+    params: dict[str, tuple[str, str]] = field(default_factory=dict)
+    nodes: dict[str, WidgetNode] = field(init=False, repr=False)
+    bindings: dict[str, dict[str, str]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.nodes = {}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            self.nodes[node.id] = node
+            stack.extend(node.children)
+        # node id -> {prop: param}: what each definition node takes from outside.
+        self.bindings = {}
+        for param, (node_id, prop) in self.params.items():
+            self.bindings.setdefault(node_id, {})[prop] = param
+
+    def default(self, param: str) -> Any:
+        """The definition's own value for *param*."""
+        node_id, prop = self.params[param]
+        node = self.nodes[node_id]
+        if prop in node.props:
+            return node.props[prop]
+        spec = WIDGET_SPECS.get(node.type)
+        return spec.defaults.get(prop) if spec is not None else None
+
+    def param_spec(self, param: str) -> dict[str, Any] | None:
+        """Registry prop definition behind *param*, defaulting to :meth:`default`."""
+        node_id, prop = self.params[param]
+        spec = WIDGET_SPECS.get(self.nodes[node_id].type)
+        if spec is None or prop not in spec.props:
+            return None
+        return {**spec.props[prop], "default": self.default(param)}
+
+    def overrides(self, instance: WidgetNode) -> dict[str, dict[str, Any]]:
+        """``{node id: {prop: value}}`` set by *instance* on this definition."""
+        out: dict[str, dict[str, Any]] = {}
+        for param, value in instance.props.items():
+            target = self.params.get(param)
+            if target is not None:
+                out.setdefault(target[0], {})[target[1]] = value
+        return out
+
+
+def is_instance(node) -> bool:
+    return node.type == COMPONENT_TYPE
+
+
+def make_instance(node_id: str, definition: ComponentDef, **overrides: Any) -> WidgetNode:
+    return WidgetNode(id=node_id, type=COMPONENT_TYPE,
+                      props={COMPONENT_REF: definition.name, **overrides})
+
+
+def make_component(name: str, node: WidgetNode) -> ComponentDef:
+    """Define component *name* from a copy of *node*'s subtree.
+
+    Every text prop set inside the subtree becomes a param, named after
+    the prop (``value``, ``value_2``, ...) in tree order.
+    """
+    root = node.clone(deep_new_ids=False)
+    root.parent_id = None
+    root.slot = None
+    params: dict[str, tuple[str, str]] = {}
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        spec = WIDGET_SPECS.get(current.type)
+        if spec is not None:
+            for prop in current.props:
+                if spec.prop_types.get(prop) in _PARAM_TYPES:
+                    param, n = prop, 1
+                    while param in params or param == COMPONENT_REF:
+                        n += 1
+                        param = f"{prop}_{n}"
+                    params[param] = (current.id, prop)
+        stack.extend(reversed(current.children))
+    return ComponentDef(name, root, params)
+
+
+def resolve(
+    instance: WidgetNode, components: Mapping[str, ComponentDef] | None,
+) -> ComponentDef | None:
+    """The definition *instance* refers to, if there is one."""
+    if not components:
+        return None
+    return components.get(instance.props.get(COMPONENT_REF))
@@ -1,13 +1,36 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
+from operator import is_
 from typing import Any
 
-from src.utils.id_generator import new_id
+from src.utils.id_generator import IdAllocator
 
+# Interned prop key tuples, keyed by themselves: nodes of one widget type
+# are created with the same keys, so they end up sharing one layout.
+_KEY_LAYOUTS: dict[tuple[str, ...], tuple[str, ...]] = {}
 
-@dataclass
+
+def shared_keys(props: dict[str, Any]) -> dict[str, Any]:
+    """*props*, rebuilt on interned keys unless it already uses them."""
+    keys = tuple(props)
+    layout = _KEY_LAYOUTS.get(keys)
+    if layout is None:
+        layout = _KEY_LAYOUTS[keys] = tuple(sys.intern(k) for k in keys)
+    if all(map(is_, keys, layout)):
+        return props
+    return dict(zip(layout, props.values()))
+
+
+@dataclass(slots=True)
 class WidgetNode:
+    """One widget in the tree.
+
+    Slotted, with interned ``type``/``slot`` strings and prop keys, so a
+    node costs a few hundred bytes even in 100k-node projects.
+    """
+
     id: str
     type: str
     props: dict[str, Any] = field(default_factory=dict)
@@ -16,23 +39,61 @@ class WidgetNode:
     order: int = 0
     slot: str | None = None
 
-    def clone(self, *, deep_new_ids: bool = True) -> "WidgetNode":
+    def __post_init__(self) -> None:
+        self.type = sys.intern(self.type)
+        if self.slot is not None:
+            self.slot = sys.intern(self.slot)
+        if self.props:
+            self.props = shared_keys(self.props)
+
+    def clone(
+        self, *, deep_new_ids: bool = True, ids: IdAllocator | None = None,
+    ) -> "WidgetNode":
         """Create a deep copy of this node.
 
         Args:
             deep_new_ids: If True (default), every node in the cloned subtree
                 gets a fresh unique id.  Set to False only when you need an
                 exact structural copy (e.g. for undo snapshots).
+            ids: Allocator for the fresh ids; pass one built on the target
+                project's index to rule out clashes with existing ids.
+
+        Iterative, so deep subtrees cannot hit the recursion limit.  The
+        copies' ``parent_id`` point at their copied parents.
         """
-        copied = WidgetNode(
-            id=new_id(self.type.lower()) if deep_new_ids else self.id,
-            type=self.type,
-            props=dict(self.props),
-            parent_id=self.parent_id,
-            order=self.order,
-            slot=self.slot,
-        )
-        copied.children = [
-            child.clone(deep_new_ids=deep_new_ids) for child in self.children
-        ]
-        return copied
\ No newline at end of file
+        if deep_new_ids and ids is None:
+            ids = IdAllocator()
+        prefixes: dict[str, str] = {}
+        new_node = object.__new__
+
+        def copy(node: WidgetNode, parent_id: str | None) -> WidgetNode:
+            if deep_new_ids:
+                prefix = prefixes.get(node.type)
+                if prefix is None:
+                    prefix = prefixes[node.type] = node.type.lower()
+                node_id = ids.new_id(prefix)
+            else:
+                node_id = node.id
+            # The source's strings and prop keys are already interned, so
+            # skip __init__/__post_init__ (most of the cost per node).
+            copied = new_node(WidgetNode)
+            copied.id = node_id
+            copied.type = node.type
+            copied.props = node.props.copy()
+            copied.children = []
+            copied.parent_id = parent_id
+            copied.order = node.order
+            copied.slot = node.slot
+            return copied
+
+        top = copy(self, self.parent_id)
+        stack = [(self, top)]
+        while stack:
+            source, target = stack.pop()
+            children = target.children
+            for child in source.children:
+                copied = copy(child, target.id)
+                children.append(copied)
+                if child.children:
+                    stack.append((child, copied))
+        return top
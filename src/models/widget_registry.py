@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import Any
 
+from src.models.enum_map import ENUM_MAP
+
 WIDGET_REGISTRY: dict[str, dict[str, Any]] = {
     # ── Basic ──────────────────────────────────────────────────
     "Text": {
@@ -215,8 +217,60 @@ WIDGET_REGISTRY: dict[str, dict[str, Any]] = {
 }
 
 
+class WidgetSpec:
+    """Pre-compiled view of one ``WIDGET_REGISTRY`` entry.
+
+    Built once at import so hot loops (code generation, rendering,
+    validation) do plain attribute and set lookups instead of chained
+    ``.get()`` calls on the nested registry dicts.
+    """
+
+    __slots__ = (
+        "type", "category", "icon", "props", "prop_types", "defaults",
+        "event_props", "enum_options", "enum_codes", "slots", "slot_max",
+        "slot_names", "default_slot", "accepts_children",
+    )
+
+    def __init__(self, widget_type: str, raw: dict[str, Any]) -> None:
+        props: dict[str, dict[str, Any]] = raw["props"]
+        self.type = widget_type
+        self.category: str = raw["category"]
+        self.icon: str = raw.get("icon", "widgets")
+        self.props = props
+        self.prop_types: dict[str, str] = {k: v["type"] for k, v in props.items()}
+        self.defaults: dict[str, Any] = {k: v["default"] for k, v in props.items()}
+        self.event_props = frozenset(k for k, v in props.items() if v["type"] == "event")
+        self.enum_options: dict[str, frozenset[str]] = {
+            k: frozenset(v["options"]) for k, v in props.items() if v["type"] == "enum"
+        }
+        # prop -> {option value -> "ft.X.Y" source string}
+        self.enum_codes: dict[str, dict[str, str]] = {
+            k: ENUM_MAP.get(v.get("enum_key", k), {})
+            for k, v in props.items() if v["type"] == "enum"
+        }
+        self.slots: tuple[tuple[str, int | None], ...] = tuple(
+            (s["slot"], s["max"]) for s in raw["children"]
+        )
+        self.slot_max: dict[str, int | None] = dict(self.slots)
+        self.slot_names = frozenset(self.slot_max)
+        self.default_slot: str | None = self.slots[0][0] if len(self.slots) == 1 else None
+        self.accepts_children = bool(self.slots)
+
+    def __repr__(self) -> str:
+        return f"WidgetSpec({self.type!r})"
+
+
+WIDGET_SPECS: dict[str, WidgetSpec] = {
+    name: WidgetSpec(name, raw) for name, raw in WIDGET_REGISTRY.items()
+}
+
+
+def spec_for(widget_type: str) -> WidgetSpec | None:
+    return WIDGET_SPECS.get(widget_type)
+
+
 def defaults_for(widget_type: str) -> dict[str, Any]:
-    return {k: v["default"] for k, v in WIDGET_REGISTRY[widget_type]["props"].items()}
+    return dict(WIDGET_SPECS[widget_type].defaults)
 
 
 def enum_key_for(widget_type: str, prop: str) -> str:
@@ -225,11 +279,10 @@ def enum_key_for(widget_type: str, prop: str) -> str:
 
 
 def accepts_children(widget_type: str) -> bool:
-    return bool(WIDGET_REGISTRY.get(widget_type, {}).get("children"))
+    spec = WIDGET_SPECS.get(widget_type)
+    return spec.accepts_children if spec is not None else False
 
 
 def default_slot(widget_type: str) -> str | None:
-    slots = WIDGET_REGISTRY.get(widget_type, {}).get("children", [])
-    if len(slots) == 1:
-        return slots[0]["slot"]
-    return None
\ No newline at end of file
+    spec = WIDGET_SPECS.get(widget_type)
+    return spec.default_slot if spec is not None else None
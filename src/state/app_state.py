@@ -1,49 +1,214 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from contextlib import contextmanager
 
+from src.state.events import ChangeEvent, ChangeKind, DirtySet, events_for
+from src.state.history import History, HistoryEntry
 from src.state.project_state import ProjectState
-from src.utils.serializer import project_to_dict, project_from_dict
+from src.state.selection import Selection
+from src.utils.profiling import profiler
 
 
 class AppState:
-    def __init__(self, project: ProjectState):
+    def __init__(self, project: ProjectState, history_limit: int = 50):
         self.project = project
+        self.history = History(limit=history_limit)
+        self.selection = Selection(_ids(project.selected_node_id))
         self._listeners: list[Callable[[ProjectState], None]] = []
-        self._undo_stack: list[dict] = []
-        self._redo_stack: list[dict] = []
-
-    def transact(self, fn: Callable[[ProjectState], None]) -> None:
-        self._undo_stack.append(self._snapshot())
-        if len(self._undo_stack) > 50:
-            self._undo_stack.pop(0)
-        fn(self.project)
-        self._redo_stack.clear()
-        self._notify()
+        self._event_listeners: list[
+            tuple[Callable[[list[ChangeEvent]], None], frozenset[ChangeKind] | None]
+        ] = []
+        self._dirty_sets: list[DirtySet] = []
+        self._history_listeners: list[Callable[[HistoryEntry, ProjectState], None]] = []
+        self._batch_depth = 0
+        self._deferred: list[ChangeEvent] = []
 
-    def undo(self) -> None:
-        if not self._undo_stack:
-            return
-        self._redo_stack.append(self._snapshot())
-        self._restore(self._undo_stack.pop())
-        self._notify()
+    @property
+    def can_undo(self) -> bool:
+        return self.history.can_undo
+
+    @property
+    def can_redo(self) -> bool:
+        return self.history.can_redo
+
+    def transact(
+        self,
+        fn: Callable[[ProjectState], None],
+        coalesce_key: Hashable | None = None,
+    ) -> list[ChangeEvent]:
+        """Run *fn* as one undoable edit and publish what it changed.
+
+        Tree edits inside *fn* must go through ``tree_ops`` with
+        ``tree_index=proj.index`` so the history can record them.  Quick
+        successive edits with the same *coalesce_key* share one undo step.
+        Inside :meth:`batch`, *fn* joins the batch and nothing is returned.
+        """
+        if self._batch_depth:
+            fn(self.project)
+            return []
+        with profiler.span("state.transact"):
+            self.history.begin(self.project)
+            try:
+                fn(self.project)
+            finally:
+                entry = self.history.commit(self.project, coalesce_key)
+            return self._publish(entry)
+
+    @property
+    def batching(self) -> bool:
+        return self._batch_depth > 0
+
+    @contextmanager
+    def batch(self, coalesce_key: Hashable | None = None) -> Iterator[ProjectState]:
+        """Group every edit in the block into one undo step and one publish.
 
-    def redo(self) -> None:
-        if not self._redo_stack:
+        ``transact`` calls (and tree_ops edits through ``proj.index``) in
+        the block apply at once, but history listeners, events and
+        subscribers hear about them only when the outermost batch exits,
+        as a single change.  Selection changes are held back the same way.
+        """
+        if self._batch_depth:
+            self._batch_depth += 1
+            try:
+                yield self.project
+            finally:
+                self._batch_depth -= 1
             return
-        self._undo_stack.append(self._snapshot())
-        self._restore(self._redo_stack.pop())
-        self._notify()
+        with profiler.span("state.batch"):
+            self.history.begin(self.project)
+            self._batch_depth = 1
+            try:
+                yield self.project
+            finally:
+                self._batch_depth = 0
+                entry = self.history.commit(self.project, coalesce_key)
+                self._publish(entry)
+
+    def undo(self) -> list[ChangeEvent]:
+        self._check_not_batching("undo")
+        with profiler.span("state.undo"):
+            return self._publish(self.history.undo(self.project))
+
+    def redo(self) -> list[ChangeEvent]:
+        self._check_not_batching("redo")
+        with profiler.span("state.redo"):
+            return self._publish(self.history.redo(self.project))
+
+    def select(self, node_id: str | None) -> list[ChangeEvent]:
+        """Select just *node_id* without recording an undo step."""
+        return self.select_many(_ids(node_id))
+
+    def select_many(self, node_ids: Iterable[str]) -> list[ChangeEvent]:
+        """Select exactly *node_ids*; the last one becomes primary."""
+        return self._reselect(self.selection.set(node_ids))
+
+    def toggle_selected(self, node_id: str) -> list[ChangeEvent]:
+        """Add *node_id* to the selection, or drop it if already selected."""
+        self.selection.toggle(node_id)
+        return self._reselect(True)
+
+    def select_range(self, node_id: str) -> list[ChangeEvent]:
+        """Select everything from the anchor to *node_id* in tree order."""
+        return self._reselect(self.selection.extend_to(node_id, self.project.index))
+
+    def load(self, project: ProjectState) -> None:
+        """Replace the project and drop its undo history."""
+        self._check_not_batching("load")
+        self.project = project
+        self.history.clear()
+        self.selection.set(_ids(project.selected_node_id))
+        self._emit([ChangeEvent(ChangeKind.PROJECT_REPLACED, (project.tree.id,))])
 
     def subscribe(self, cb: Callable[[ProjectState], None]) -> None:
         self._listeners.append(cb)
 
+    def subscribe_events(
+        self,
+        cb: Callable[[list[ChangeEvent]], None],
+        kinds: frozenset[ChangeKind] | None = None,
+    ) -> None:
+        """Call *cb* with the events of each change, filtered to *kinds*."""
+        self._event_listeners.append((cb, kinds))
+
+    def subscribe_history(self, cb: Callable[[HistoryEntry, ProjectState], None]) -> None:
+        """Call *cb* with every committed, undone or redone history entry.
+
+        The entry holds the state before the change; *cb* runs before any
+        event listener.
+        """
+        self._history_listeners.append(cb)
+
+    def unsubscribe_history(self, cb: Callable[[HistoryEntry, ProjectState], None]) -> None:
+        if cb in self._history_listeners:
+            self._history_listeners.remove(cb)
+
+    def dirty_set(self, kinds: frozenset[ChangeKind] | None = None) -> DirtySet:
+        """Return a new :class:`DirtySet` fed by all future events."""
+        dirty = DirtySet(kinds)
+        self._dirty_sets.append(dirty)
+        return dirty
+
+    def _reselect(self, changed: bool) -> list[ChangeEvent]:
+        """Mirror the selection's primary into the project and announce it."""
+        previous = self.project.selected_node_id
+        primary = self.selection.primary
+        if not changed and primary == previous:
+            return []
+        self.project.selected_node_id = primary
+        events = [ChangeEvent(ChangeKind.SELECTION_CHANGED, (primary, previous))]
+        self._emit(events)
+        return events
+
+    def _publish(self, entry: HistoryEntry | None) -> list[ChangeEvent]:
+        if entry is not None:
+            self._follow_project_selection()  # before listeners see the project
+            for cb in self._history_listeners:
+                cb(entry, self.project)
+        events = events_for(entry, self.project) if entry is not None else []
+        if self._deferred:
+            events = self._deferred + events
+            self._deferred = []
+        if events:
+            self._emit(events)
+        return events
+
+    def _follow_project_selection(self) -> None:
+        """Re-sync the selection after an edit, undo or redo.
+
+        Deleted ids drop out, and a primary deleted from under the
+        project hands over to the next selected node.  An edit that moved
+        ``selected_node_id`` elsewhere (e.g. to a newly added node)
+        collapses the selection onto it.
+        """
+        project, selection = self.project, self.selection
+        selection.prune(project.index)
+        primary = project.selected_node_id
+        if primary is not None and primary not in project.index:
+            project.selected_node_id = selection.primary
+        if selection.primary != project.selected_node_id:
+            selection.set(_ids(project.selected_node_id))
+
+    def _check_not_batching(self, action: str) -> None:
+        if self._batch_depth:
+            raise RuntimeError(f"Cannot {action} inside a batch")
+
+    def _emit(self, events: list[ChangeEvent]) -> None:
+        if self._batch_depth:
+            self._deferred.extend(events)
+            return
+        for dirty in self._dirty_sets:
+            dirty.add(events)
+        for cb, kinds in self._event_listeners:
+            relevant = events if kinds is None else [e for e in events if e.kind in kinds]
+            if relevant:
+                cb(relevant)
+        self._notify()
+
     def _notify(self) -> None:
         for cb in self._listeners:
             cb(self.project)
 
-    def _snapshot(self) -> dict:
-        return project_to_dict(self.project)
 
-    def _restore(self, snapshot: dict) -> None:
-        self.project = project_from_dict(snapshot)
+def _ids(node_id: str | None) -> list[str]:
+    return [node_id] if node_id is not None else []
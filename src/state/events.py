@@ -0,0 +1,138 @@
+"""Typed change events published by :class:`AppState`.
+
+Events are derived from the :class:`HistoryEntry` of an edit (or of an
+undo/redo), so every path that changes the project reports changes the
+same way.  Consumers either subscribe to events directly or keep a
+:class:`DirtySet` and drain it when they next render.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum, auto
+
+from src.models.widget_node import WidgetNode
+from src.state.history import HistoryEntry
+from src.state.project_state import ProjectState
+
+
+class ChangeKind(Enum):
+    NODE_ADDED = auto()         # node_ids: (node, parent)
+    NODE_REMOVED = auto()       # node_ids: (node, former parent)
+    NODE_MOVED = auto()         # node_ids: (node, new parent, old parent)
+    PROP_CHANGED = auto()       # node_ids: (node,); keys: changed props
+    SELECTION_CHANGED = auto()  # node_ids: (new primary, old primary)
+    PROJECT_CHANGED = auto()    # name / theme / device frame / components
+    PROJECT_REPLACED = auto()   # whole tree replaced (load, new root)
+
+
+TREE_KINDS = frozenset({
+    ChangeKind.NODE_ADDED, ChangeKind.NODE_REMOVED, ChangeKind.NODE_MOVED,
+    ChangeKind.PROP_CHANGED, ChangeKind.PROJECT_REPLACED,
+})
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    kind: ChangeKind
+    node_ids: tuple[str, ...] = ()
+    keys: tuple[str, ...] = ()
+
+
+class DirtySet:
+    """Node ids touched by events since the consumer last drained it.
+
+    An added or removed id stands for its whole subtree.  ``drain()``
+    returns None when everything must be treated as dirty (first use, or
+    a project-level change).
+    """
+
+    def __init__(self, kinds: frozenset[ChangeKind] | None = None) -> None:
+        self.kinds = kinds
+        self._ids: set[str] = set()
+        self._everything = True
+
+    def __bool__(self) -> bool:
+        return self._everything or bool(self._ids)
+
+    def add(self, events: list[ChangeEvent]) -> None:
+        for event in events:
+            if self.kinds is not None and event.kind not in self.kinds:
+                continue
+            if event.kind in (ChangeKind.PROJECT_REPLACED, ChangeKind.PROJECT_CHANGED):
+                self._everything = True
+            self._ids.update(i for i in event.node_ids if i is not None)
+
+    def mark_all(self) -> None:
+        self._everything = True
+
+    def drain(self) -> set[str] | None:
+        ids = None if self._everything else self._ids
+        self._ids = set()
+        self._everything = False
+        return ids
+
+
+_MISSING = object()
+
+
+def events_for(entry: HistoryEntry, project: ProjectState) -> list[ChangeEvent]:
+    """Describe how *project* differs from the pre-edit state in *entry*."""
+    events: list[ChangeEvent] = []
+    if entry.field("tree") is not project.tree:
+        events.append(ChangeEvent(ChangeKind.PROJECT_REPLACED, (project.tree.id,)))
+
+    before: dict[int, tuple[str, str]] = {}   # id(child) -> (child id, parent id)
+    after: dict[int, tuple[str, str]] = {}
+    reordered: list[tuple[list, list, str]] = []
+    relinked: list[tuple[WidgetNode, str | None]] = []  # (node, old parent id)
+    for node, props, children, parent_id, slot in entry.nodes.values():
+        if node.parent_id != parent_id or node.slot != slot:
+            relinked.append((node, parent_id))
+        if node.props != props:
+            keys = tuple(sorted(
+                k for k in node.props.keys() | props.keys()
+                if node.props.get(k, _MISSING) != props.get(k, _MISSING)
+            ))
+            events.append(ChangeEvent(ChangeKind.PROP_CHANGED, (node.id,), keys))
+        if node.children != children:
+            for c in children:
+                before[id(c)] = (c.id, node.id)
+            for c in node.children:
+                after[id(c)] = (c.id, node.id)
+            reordered.append((children, node.children, node.id))
+
+    for key, (child_id, parent_id) in before.items():
+        if key not in after:
+            events.append(ChangeEvent(ChangeKind.NODE_REMOVED, (child_id, parent_id)))
+    for key, (child_id, parent_id) in after.items():
+        if key not in before:
+            events.append(ChangeEvent(ChangeKind.NODE_ADDED, (child_id, parent_id)))
+        elif before[key][1] != parent_id:
+            events.append(ChangeEvent(
+                ChangeKind.NODE_MOVED, (child_id, parent_id, before[key][1])))
+
+    # Same-parent reorders: survivors whose relative order changed.
+    for old, new, parent_id in reordered:
+        old_order = [c for c in old if id(c) in after and after[id(c)][1] == parent_id]
+        new_order = [c for c in new if id(c) in before and before[id(c)][1] == parent_id]
+        for a, b in zip(old_order, new_order):
+            if a is not b:
+                events.append(ChangeEvent(ChangeKind.NODE_MOVED, (b.id, parent_id, parent_id)))
+
+    # A move into another slot of the same parent may keep the child
+    # order, so it shows up only in the node's own recorded slot.
+    reported = {e.node_ids[0] for e in events if e.kind in (
+        ChangeKind.NODE_MOVED, ChangeKind.NODE_ADDED, ChangeKind.NODE_REMOVED)}
+    for node, old_parent_id in relinked:
+        if node.id not in reported and node.parent_id is not None \
+                and old_parent_id is not None:
+            events.append(ChangeEvent(
+                ChangeKind.NODE_MOVED, (node.id, node.parent_id, old_parent_id)))
+
+    old_sel, new_sel = entry.field("selected_node_id"), project.selected_node_id
+    if old_sel != new_sel:
+        events.append(ChangeEvent(ChangeKind.SELECTION_CHANGED, (new_sel, old_sel)))
+    if any(entry.field(f) != getattr(project, f) for f in ("name", "theme", "device_frame")) \
+            or entry.field("components") is not project.components:
+        events.append(ChangeEvent(ChangeKind.PROJECT_CHANGED))
+    return events
@@ -1 +1,211 @@
-"""Reserved for future standalone history helpers."""
+"""Patch-based undo/redo history.
+
+Instead of serializing the whole project before every edit, a history entry
+stores a shallow copy of only the nodes an edit touched (props, children
+list, parent id and slot).  Untouched nodes — and the subtrees hanging off
+touched ones — are shared between the live tree and every entry, so both
+memory and latency scale with the size of the edit rather than the tree.
+
+Nodes announce themselves through :attr:`TreeIndex.on_touch`, so edits made
+inside :meth:`History.begin` / :meth:`History.commit` must go through
+``tree_ops`` with ``tree_index=project.index``.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from src.engine.tree_index import TreeIndex
+from src.models.widget_node import WidgetNode
+from src.state.project_state import ProjectState
+
+_PROJECT_FIELDS = (
+    "name", "tree", "theme", "device_frame", "selected_node_id", "components",
+)
+
+
+class HistoryEntry:
+    """Pre-edit state of every node (and project field) an edit changed."""
+
+    __slots__ = ("nodes", "fields")
+
+    def __init__(self, project: ProjectState) -> None:
+        self.nodes: dict[int, tuple[WidgetNode, dict[str, Any], list[WidgetNode], str | None, str | None]] = {}
+        self.fields = tuple(getattr(project, f) for f in _PROJECT_FIELDS)
+
+    def absorb(self, later: HistoryEntry) -> None:
+        """Fold *later* into this entry, keeping this entry's pre-edit state."""
+        for key, state in later.nodes.items():
+            self.nodes.setdefault(key, state)
+
+    def record(self, node: WidgetNode) -> None:
+        """Remember *node* as it is now, unless already recorded."""
+        key = id(node)
+        if key not in self.nodes:
+            self.nodes[key] = (
+                node, dict(node.props), list(node.children), node.parent_id, node.slot,
+            )
+
+    def touched(self) -> list[WidgetNode]:
+        """The recorded nodes, in their current state."""
+        return [state[0] for state in self.nodes.values()]
+
+    def attached(self, project: ProjectState) -> list[WidgetNode]:
+        """Roots of the subtrees the edit added.
+
+        These are new children of recorded nodes, plus the tree itself if
+        it was replaced.
+        """
+        before = {id(c) for _, _, children, _, _ in self.nodes.values() for c in children}
+        roots = [c for node, *_ in self.nodes.values()
+                 for c in node.children if id(c) not in before]
+        if self.field("tree") is not project.tree:
+            roots.append(project.tree)
+        return roots
+
+    def field(self, name: str) -> Any:
+        """Pre-edit value of project field *name*."""
+        return self.fields[_PROJECT_FIELDS.index(name)]
+
+    def is_noop(self, project: ProjectState) -> bool:
+        if any(getattr(project, f) is not v and getattr(project, f) != v
+               for f, v in zip(_PROJECT_FIELDS, self.fields)):
+            return False
+        return all(
+            node.props == props and node.children == children
+            and node.parent_id == parent_id and node.slot == slot
+            for node, props, children, parent_id, slot in self.nodes.values()
+        )
+
+
+class History:
+    """Bounded undo/redo stacks of :class:`HistoryEntry` patches.
+
+    Commits carrying the same *coalesce_key* (e.g. ``(node id, prop)``)
+    less than *coalesce_window* seconds apart merge into one undo step, so
+    typing a label undoes as a whole instead of one keystroke at a time.
+    """
+
+    def __init__(
+        self,
+        limit: int = 50,
+        coalesce_window: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limit = limit
+        self.coalesce_window = coalesce_window
+        self._clock = clock
+        self._undo: list[HistoryEntry] = []
+        self._redo: list[HistoryEntry] = []
+        self._pending: tuple[HistoryEntry, TreeIndex] | None = None
+        self._last_key: Hashable | None = None
+        self._last_time = 0.0
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self._last_key = None
+
+    def begin(self, project: ProjectState) -> None:
+        """Start recording the nodes touched through ``project.index``."""
+        entry = HistoryEntry(project)
+        index = project.index
+        index.on_touch = entry.record
+        self._pending = (entry, index)
+
+    def commit(
+        self, project: ProjectState, coalesce_key: Hashable | None = None,
+    ) -> HistoryEntry | None:
+        """Finish the pending entry and push it if anything changed.
+
+        Returns the entry for this edit (its pre-edit state), or None for a
+        no-op.  When the edit coalesces with the previous one it is folded
+        into the top undo entry, but is still returned on its own so
+        listeners see just what this edit changed.
+        """
+        if self._pending is None:
+            return None
+        entry, index = self._pending
+        self._pending = None
+        index.on_touch = None
+        if entry.is_noop(project):
+            return None
+        now = self._clock()
+        merge = (
+            coalesce_key is not None and coalesce_key == self._last_key
+            and self._undo and now - self._last_time < self.coalesce_window
+        )
+        self._last_key, self._last_time = coalesce_key, now
+        if merge:
+            self._undo[-1].absorb(entry)
+            return entry
+        self._undo.append(entry)
+        if len(self._undo) > self.limit:
+            self._undo.pop(0)
+        self._redo.clear()
+        return entry
+
+    def undo(self, project: ProjectState) -> HistoryEntry | None:
+        """Revert the last edit; returns the state it was reverted from."""
+        if not self._undo:
+            return None
+        self._last_key = None
+        inverse = _apply(self._undo.pop(), project)
+        self._redo.append(inverse)
+        return inverse
+
+    def redo(self, project: ProjectState) -> HistoryEntry | None:
+        if not self._redo:
+            return None
+        self._last_key = None
+        inverse = _apply(self._redo.pop(), project)
+        self._undo.append(inverse)
+        return inverse
+
+
+def _apply(entry: HistoryEntry, project: ProjectState) -> HistoryEntry:
+    """Restore *entry* onto *project* and return the entry that reverts it."""
+    inverse = HistoryEntry(project)
+    changes: list[tuple[WidgetNode, list[WidgetNode]]] = []
+    for node, props, children, parent_id, slot in entry.nodes.values():
+        inverse.record(node)
+        changes.append((node, node.children))
+        node.props = props
+        node.children = children
+        node.parent_id = parent_id
+        node.slot = slot
+    for name, value in zip(_PROJECT_FIELDS, entry.fields):
+        setattr(project, name, value)
+    _sync_index(project.index, changes)
+    return inverse
+
+
+def _sync_index(index: TreeIndex, changes: list[tuple[WidgetNode, list[WidgetNode]]]) -> None:
+    """Bring *index* and ``order`` fields in line with restored children lists."""
+    before = {id(c): c for _, old in changes for c in old}
+    after = {id(c): (c, parent) for parent, _ in changes for c in parent.children}
+    for key, child in before.items():
+        if key not in after:
+            index.remove_subtree(child)
+    for child, parent in after.values():
+        if index.get(parent.id) is not parent:
+            # Detached, or re-attached by an add_subtree() that walks it anyway.
+            continue
+        if index.get(child.id) is child:
+            index.set_parent(child, parent)
+        else:
+            index.add_subtree(child, parent)
+    for parent, _ in changes:
+        for i, child in enumerate(parent.children):
+            child.order = i
+        if index.get(parent.id) is parent:
+            index.reindex_children(parent)
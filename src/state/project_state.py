@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from src.engine.tree_index import TreeIndex
+from src.models.component import ComponentDef
 from src.models.widget_node import WidgetNode
 
 
@@ -13,3 +15,13 @@ class ProjectState:
     theme: str = "light"
     device_frame: str = "desktop"
     selected_node_id: str | None = None
+    # Replaced, never mutated, so undo history can restore the previous dict.
+    components: dict[str, ComponentDef] = field(default_factory=dict)
+    _index: TreeIndex | None = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def index(self) -> TreeIndex:
+        """Lookup index for ``tree``, rebuilt lazily if the root was replaced."""
+        if self._index is None or self._index.root is not self.tree:
+            self._index = TreeIndex(self.tree)
+        return self._index
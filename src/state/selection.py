@@ -0,0 +1,145 @@
+"""Multi-node selection: an ordered set of ids with a primary and an anchor."""
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
+from src.engine.tree_index import TreeIndex
+from src.models.widget_node import WidgetNode
+
+
+class Selection:
+    """The selected node ids, in the order they were selected.
+
+    The last id is the *primary* node: the one the properties panel shows
+    and single-node actions (move, wrap) work on.  ``anchor`` is where a
+    range selection starts; plain selects and toggles move it.
+    """
+
+    __slots__ = ("_ids", "anchor")
+
+    def __init__(self, node_ids: Iterable[str] = ()) -> None:
+        self._ids: dict[str, None] = dict.fromkeys(node_ids)
+        self.anchor: str | None = self.primary
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def primary(self) -> str | None:
+        return next(reversed(self._ids), None)
+
+    def ids(self) -> list[str]:
+        return list(self._ids)
+
+    def set(self, node_ids: Iterable[str]) -> bool:
+        """Select exactly *node_ids*; the last becomes primary and anchor."""
+        ids = dict.fromkeys(node_ids)
+        changed = list(ids) != list(self._ids)
+        self._ids = ids
+        self.anchor = self.primary
+        return changed
+
+    def toggle(self, node_id: str) -> bool:
+        """Add *node_id* (as primary) or drop it; returns whether it is now selected."""
+        self.anchor = node_id
+        if self._ids.pop(node_id, False) is None:
+            return False
+        self._ids[node_id] = None
+        return True
+
+    def extend_to(self, node_id: str, tree_index: TreeIndex) -> bool:
+        """Select every node from the anchor to *node_id* in tree order.
+
+        The anchor stays put so repeated extends pivot around it, and
+        *node_id* becomes primary.  Without a usable anchor this is a
+        plain select.  Returns whether the selection changed.
+        """
+        anchor = self.anchor
+        if anchor is None or anchor not in tree_index or node_id not in tree_index:
+            return self.set([node_id])
+        ids = [n.id for n in nodes_between(tree_index, anchor, node_id)]
+        if ids[0] == node_id:
+            ids.reverse()
+        changed = self.set(ids)
+        self.anchor = anchor
+        return changed
+
+    def prune(self, tree_index: TreeIndex) -> bool:
+        """Drop ids no longer in the tree; returns whether any were dropped."""
+        gone = [i for i in self._ids if i not in tree_index]
+        for node_id in gone:
+            del self._ids[node_id]
+        if self.anchor is not None and self.anchor not in tree_index:
+            self.anchor = self.primary
+        return bool(gone)
+
+
+def nodes_between(tree_index: TreeIndex, first_id: str, last_id: str) -> list[WidgetNode]:
+    """Nodes from *first_id* to *last_id* (inclusive, either order) in pre-order.
+
+    Walks forward from the earlier of the two, so the cost is the size of
+    the range plus the two nodes' depths, not the size of the tree.
+    """
+    if _path(tree_index, last_id) < _path(tree_index, first_id):
+        first_id, last_id = last_id, first_id
+    out: list[WidgetNode] = []
+    for node in _preorder_from(tree_index, tree_index.get(first_id)):
+        out.append(node)
+        if node.id == last_id:
+            break
+    return out
+
+
+def adjacent_node(tree_index: TreeIndex, node_id: str, step: int) -> WidgetNode | None:
+    """The node just after (*step* > 0) or before *node_id* in pre-order."""
+    node = tree_index.get(node_id)
+    if node is None:
+        return None
+    if step > 0:
+        following = _preorder_from(tree_index, node)
+        next(following)
+        return next(following, None)
+    parent = tree_index.parent_of(node_id)
+    if parent is None:
+        return None
+    position = tree_index.position_of(node_id)
+    if position == 0:
+        return parent
+    node = parent.children[position - 1]
+    while node.children:
+        node = node.children[-1]
+    return node
+
+
+def _path(tree_index: TreeIndex, node_id: str) -> tuple[int, ...]:
+    """Child positions from the root down to *node_id*; sorts in pre-order."""
+    path = [tree_index.position_of(node_id) or 0]
+    path.extend(tree_index.position_of(a.id) or 0 for a in tree_index.ancestors(node_id))
+    path.reverse()
+    return tuple(path)
+
+
+def _preorder_from(tree_index: TreeIndex, node: WidgetNode) -> Iterator[WidgetNode]:
+    """Yield *node*, its subtree, then everything after it in pre-order."""
+    while True:
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(reversed(current.children))
+        # Climb until some ancestor has a next sibling.
+        while True:
+            parent = tree_index.parent_of(node.id)
+            if parent is None:
+                return
+            position = tree_index.position_of(node.id) + 1
+            if position < len(parent.children):
+                node = parent.children[position]
+                break
+            node = parent
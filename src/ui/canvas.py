@@ -1,11 +1,18 @@
 """Canvas panel — interactive tree-based design surface."""
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
+from collections.abc import Collection
+
 import flet as ft
 
+from src.engine.tree_index import TreeIndex
+from src.models.component import COMPONENT_REF, COMPONENT_TYPE
 from src.models.widget_node import WidgetNode
-from src.models.widget_registry import WIDGET_REGISTRY, accepts_children
+from src.models.widget_registry import accepts_children, spec_for
+from src.ui.reconciler import patch
 from src.utils.icons import resolve_icon
+from src.utils.profiling import profiler
 
 
 # Nesting depth colors
@@ -17,7 +24,6 @@ _DEPTH_COLORS = [
 
 def _label_for(node: WidgetNode) -> str:
     """Build a short display label for a node."""
-    spec = WIDGET_REGISTRY.get(node.type, {})
     props = node.props
     # Pick the most descriptive prop to show
     if node.type == "Text":
@@ -29,153 +35,490 @@ def _label_for(node: WidgetNode) -> str:
         return f'TextField: "{props.get("label", "")}"'
     if node.type in ("Checkbox", "Switch"):
         return f'{node.type}: "{props.get("label", "")}"'
+    if node.type == COMPONENT_TYPE:
+        return f"Component: {props.get(COMPONENT_REF, '')}"
     return node.type
 
 
-def build_canvas(
-    root: WidgetNode,
-    selected_id: str | None,
-    on_select: callable,
-    on_delete: callable,
-    on_move_up: callable,
-    on_move_down: callable,
-    on_wrap: callable,
-) -> ft.Control:
-    """Build the canvas panel showing widget tree as interactive blocks."""
+# Estimated block geometry in pixels.  Blocks are never measured; these
+# estimates place them in scroll windows, and overscan absorbs the error.
+HEADER_HEIGHT = 22
+BLOCK_PADDING = 6       # above and below a block's content
+BLOCK_GAP = 6           # between a block's header and its children
+BLOCK_SPACING = 4       # between sibling blocks
+DROP_ZONE_HEIGHT = 40
+# A layout block whose children would stand taller than this scrolls them
+# in a window of this height instead, materializing only the ones in view.
+WINDOW_HEIGHT = 480
+# Pixels materialized above and below each window's viewport.
+OVERSCAN = 240
 
-    def _render_block(node: WidgetNode, depth: int = 0) -> ft.Control:
-        is_selected = node.id == selected_id
-        is_layout = accepts_children(node.type)
-        color = _DEPTH_COLORS[min(depth, len(_DEPTH_COLORS) - 1)]
-        icon_name = WIDGET_REGISTRY.get(node.type, {}).get("icon", "widgets")
 
-        # Build children blocks
-        child_controls = []
-        if node.children:
-            for child in node.children:
-                child_controls.append(_render_block(child, depth + 1))
-
-        # Empty drop zone indicator for layout widgets with no children
-        if is_layout and not node.children:
-            child_controls.append(
-                ft.Container(
-                    content=ft.Text(
-                        "Drop widgets here", size=11,
-                        color="#9e9e9e", italic=True,
-                        text_align=ft.TextAlign.CENTER,
+class _Window:
+    """Scroll state and spacers of one block's windowed children."""
+
+    __slots__ = ("list_view", "top", "bottom", "offset", "viewport", "bounds")
+
+    def __init__(self, list_view, top, bottom, viewport: float) -> None:
+        self.list_view = list_view
+        self.top = top
+        self.bottom = bottom
+        self.offset = 0.0
+        self.viewport = viewport
+        self.bounds = (0, 0)  # children materialized as of the last render
+
+
+class _Block:
+    """Live controls for one materialized node block."""
+
+    __slots__ = ("container", "content", "header", "chevron", "label",
+                 "children_col", "drop_zone", "window", "windowed", "parent_id", "key")
+
+    def __init__(self, container, content, header, chevron, label, parent_id) -> None:
+        self.container = container
+        self.content = content
+        self.header = header
+        self.chevron = chevron
+        self.label = label
+        self.children_col: ft.Column | None = None
+        self.drop_zone: ft.Control | None = None
+        self.window: _Window | None = None
+        self.windowed = False  # children currently in window rather than children_col
+        self.parent_id = parent_id
+        self.key = None  # render key last filled in; None until first fill
+
+
+def _empty_drop_zone() -> ft.Control:
+    """Placeholder shown inside layout widgets with no children."""
+    return ft.Container(
+        content=ft.Text(
+            "Drop widgets here", size=11,
+            color="#9e9e9e", italic=True,
+            text_align=ft.TextAlign.CENTER,
+        ),
+        height=DROP_ZONE_HEIGHT,
+        border=ft.Border.all(1, "#e0e0e0"),
+        border_radius=4,
+        bgcolor="#fafafa",
+        alignment=ft.Alignment.CENTER,
+        padding=4,
+    )
+
+
+class CanvasPanel:
+    """Canvas panel showing the widget tree as nested, interactive blocks.
+
+    Virtualization happens inside the nested layout: the root's children,
+    and the children of any block that would stand taller than
+    :data:`WINDOW_HEIGHT`, scroll in a ``ListView`` that only builds the
+    blocks within its viewport plus :data:`OVERSCAN`; spacers sized from
+    estimated block heights stand in for the rest.  Control count is
+    bounded by the viewports, not the tree.  Collapsed blocks show their
+    header only and their subtrees are not walked until expanded; nodes
+    with more than *collapse_above* children start collapsed.
+
+    A block is re-filled only when its label, depth, expansion or
+    selection changes, so a selection change patches just two blocks.
+    """
+
+    def __init__(
+        self,
+        on_select: callable,
+        on_delete: callable,
+        on_move_up: callable,
+        on_move_down: callable,
+        on_wrap: callable,
+        collapse_above: int = 100,
+        on_toggle_select: callable | None = None,
+        on_duplicate: callable | None = None,
+        on_make_component: callable | None = None,
+    ) -> None:
+        self._on_select = on_select
+        self._on_toggle_select = on_toggle_select
+        self.collapse_above = collapse_above
+        self._collapsed: set[str] = set()
+        self._opened: set[str] = set()  # expanded explicitly despite collapse_above
+        self._blocks: dict[str, _Block] = {}
+        # node id -> (block height, children's total height), for expanded state
+        self._heights: dict[str, tuple[float, float]] = {}
+        self._tops: dict[str, list[float]] = {}  # windowed node -> child offsets
+        self._root: WidgetNode | None = None
+        self._index: TreeIndex | None = None
+        self._selected_ids: Collection[str] = ()
+
+        # Action bar for selected node
+        self._action_bar = ft.Row(
+            controls=[
+                ft.IconButton(
+                    icon=resolve_icon("arrow_upward"), icon_size=18, tooltip="Move up",
+                    on_click=lambda e: on_move_up(),
+                ),
+                ft.IconButton(
+                    icon=resolve_icon("arrow_downward"), icon_size=18, tooltip="Move down",
+                    on_click=lambda e: on_move_down(),
+                ),
+                ft.IconButton(
+                    icon=resolve_icon("crop_square"), icon_size=18, tooltip="Wrap in Container",
+                    on_click=lambda e: on_wrap("Container"),
+                ),
+                ft.IconButton(
+                    icon=resolve_icon("view_agenda"), icon_size=18, tooltip="Wrap in Column",
+                    on_click=lambda e: on_wrap("Column"),
+                ),
+                ft.IconButton(
+                    icon=resolve_icon("view_week"), icon_size=18, tooltip="Wrap in Row",
+                    on_click=lambda e: on_wrap("Row"),
+                ),
+                ft.IconButton(
+                    icon=resolve_icon("content_copy"), icon_size=18, tooltip="Duplicate",
+                    on_click=lambda e: on_duplicate(),
+                    visible=on_duplicate is not None,
+                ),
+                ft.IconButton(
+                    icon=resolve_icon("widgets"), icon_size=18, tooltip="Make component",
+                    on_click=lambda e: on_make_component(),
+                    visible=on_make_component is not None,
+                ),
+                ft.IconButton(
+                    icon=resolve_icon("delete_outline"), icon_size=18, tooltip="Delete",
+                    icon_color="#d32f2f",
+                    on_click=lambda e: on_delete(),
+                ),
+            ],
+            spacing=0,
+            alignment=ft.MainAxisAlignment.CENTER,
+            visible=False,
+        )
+        self._root_holder = ft.Container(expand=True)
+
+        self.control = ft.Container(
+            content=ft.Column(
+                controls=[
+                    ft.Row(
+                        controls=[
+                            ft.Text("Canvas", size=16, weight=ft.FontWeight.BOLD),
+                            ft.Container(expand=True),
+                            ft.Text("Click to select, long-press to add", size=11, color="#9e9e9e"),
+                        ],
                     ),
-                    height=40,
-                    border=ft.border.all(1, "#e0e0e0"),
-                    border_radius=4,
-                    bgcolor="#fafafa",
-                    alignment=ft.alignment.center,
-                    padding=4,
-                )
-            )
-
-        # The node block itself
+                    ft.Divider(height=1),
+                    self._action_bar,
+                    self._root_holder,
+                ],
+                spacing=8,
+                expand=True,
+            ),
+            expand=True,
+            padding=10,
+            bgcolor="#ffffff",
+        )
+
+    @property
+    def materialized(self) -> int:
+        """Number of node blocks currently built."""
+        return len(self._blocks)
+
+    def reset(self) -> None:
+        """Forget all cached blocks (e.g. after loading another project)."""
+        self._blocks.clear()
+        self._heights.clear()
+        self._tops.clear()
+        self._collapsed.clear()
+        self._opened.clear()
+        self._root = None
+        self._index = None
+        self._selected_ids = ()
+        self._root_holder.content = None
+
+    def sync(
+        self,
+        root: WidgetNode,
+        selected_id: str | None,
+        dirty: set[str] | None = None,
+        tree_index: TreeIndex | None = None,
+        selected_ids: Collection[str] | None = None,
+    ) -> None:
+        """Patch the canvas to match *root* and the selection.
+
+        Blocks in *selected_ids* (default: just *selected_id*) are
+        highlighted; the action bar follows the primary *selected_id*.
+
+        *dirty* (drained from a DirtySet) limits re-measuring to those
+        node ids and their ancestors; None re-measures the whole tree.
+        """
+        if tree_index is None:
+            tree_index = TreeIndex(root)
+            dirty = None
+        self._selected_ids = selected_ids if selected_ids is not None else (selected_id,)
+        if dirty is None or root is not self._root:
+            self._heights.clear()
+            self._tops.clear()
+        else:
+            for node_id in dirty:
+                self._invalidate(node_id, tree_index)
+        self._root = root
+        self._index = tree_index
+
+        changed = self._render()
+        root_block = self._blocks[root.id]
+        if self._root_holder.content is not root_block.container:
+            self._root_holder.content = root_block.container
+            changed.append(self._root_holder)
+        show_actions = bool(selected_id) and selected_id != root.id
+        if self._action_bar.visible != show_actions:
+            self._action_bar.visible = show_actions
+            changed.append(self._action_bar)
+        patch(*changed)
+
+    def is_expanded(self, node: WidgetNode) -> bool:
+        if node.id in self._collapsed:
+            return False
+        return node.id in self._opened or len(node.children) <= self.collapse_above
+
+    def toggle(self, node_id: str) -> None:
+        """Expand or collapse *node_id*'s block."""
+        node = self._index.get(node_id) if self._index is not None else None
+        if node is None:
+            return
+        if self.is_expanded(node):
+            self._collapsed.add(node_id)
+            self._opened.discard(node_id)
+        else:
+            self._collapsed.discard(node_id)
+            self._opened.add(node_id)
+        self._invalidate(node_id, self._index)
+        patch(*self._render())
+
+    # --- layout ----------------------------------------------------------
+
+    def _invalidate(self, node_id: str, tree_index: TreeIndex) -> None:
+        """Drop the measurements of *node_id* and every ancestor."""
+        self._heights.pop(node_id, None)
+        self._tops.pop(node_id, None)
+        if node_id in tree_index:
+            for ancestor in tree_index.ancestors(node_id):
+                self._heights.pop(ancestor.id, None)
+                self._tops.pop(ancestor.id, None)
+
+    def _shown_children(self, node: WidgetNode) -> list[WidgetNode]:
+        return node.children if self.is_expanded(node) else []
+
+    def _measure(self, start: WidgetNode) -> tuple[float, float]:
+        """Estimated (height, children's height) of *start*'s block."""
+        heights = self._heights
+        stack = [start]
+        while stack:
+            node = stack[-1]
+            if node.id in heights:
+                stack.pop()
+                continue
+            children = self._shown_children(node)
+            unmeasured = [c for c in children if c.id not in heights]
+            if unmeasured:
+                stack.extend(unmeasured)
+                continue
+            stack.pop()
+            inner = sum(heights[c.id][0] for c in children)
+            inner += BLOCK_SPACING * max(0, len(children) - 1)
+            height = 2 * BLOCK_PADDING + HEADER_HEIGHT
+            if children:
+                height += BLOCK_GAP + min(inner, WINDOW_HEIGHT)
+            elif not node.children and accepts_children(node.type):
+                height += BLOCK_GAP + DROP_ZONE_HEIGHT
+            heights[node.id] = (height, inner)
+        return heights[start.id]
+
+    def _is_windowed(self, node: WidgetNode) -> bool:
+        if node is self._root:
+            return bool(self._shown_children(node))
+        return self._measure(node)[1] > WINDOW_HEIGHT
+
+    def _window_slice(self, node: WidgetNode, window: _Window) -> tuple[int, int]:
+        """Children of *node* overlapping *window*'s viewport plus overscan."""
+        tops = self._tops.get(node.id)
+        if tops is None:
+            tops = [0.0]
+            for child in node.children:
+                tops.append(tops[-1] + self._measure(child)[0] + BLOCK_SPACING)
+            self._tops[node.id] = tops
+        count = len(node.children)
+        start = max(0, bisect_right(tops, window.offset - OVERSCAN) - 1)
+        stop = min(count, bisect_left(tops, window.offset + window.viewport + OVERSCAN))
+        stop = max(stop, min(start + 1, count))
+        window.top.height = tops[start]
+        window.bottom.height = tops[count] - tops[stop]
+        window.bounds = (start, stop)
+        return start, stop
+
+    # --- rendering -------------------------------------------------------
+
+    def _render(self) -> list[ft.Control]:
+        """Fill and arrange every materialized block; return what to patch.
+
+        Walks only the blocks that are (or become) materialized.  Blocks
+        new in this frame need no patch: they go out with their parent.
+        """
+        root = self._root
+        changed: list[ft.Control] = []
+        old = self._blocks
+        blocks: dict[str, _Block] = {}
+        root_block = old.get(root.id)
+        if root_block is None or root_block.parent_id is not None:
+            root_block = self._make_block(root, None)
+        stack: list[tuple[WidgetNode, _Block, int]] = [(root, root_block, 0)]
+        while stack:
+            node, block, depth = stack.pop()
+            blocks[node.id] = block
+            mounted = block.key is not None
+            expanded = self.is_expanded(node)
+            key = (node.type, _label_for(node), depth, bool(node.children), expanded,
+                   node.id in self._selected_ids)
+            if block.key != key:
+                self._fill_block(block, node, key)
+                if mounted:
+                    changed.append(block.container)
+
+            children = self._shown_children(node)
+            windowed = bool(children) and self._is_windowed(node)
+            if windowed:
+                window = block.window or self._make_window(block, node)
+                before = (window.top.height, window.bottom.height)
+                start, stop = self._window_slice(node, window)
+                children = children[start:stop]
+                if mounted and before != (window.top.height, window.bottom.height):
+                    changed += [window.top, window.bottom]
+            # A Flet control cannot move between parents, so children of a
+            # new block, or of one switching to or from a window, are new.
+            rehome = not mounted or windowed != block.windowed
+            block.windowed = windowed
+            child_blocks = []
+            for child in children:
+                child_block = None if rehome else old.get(child.id)
+                if child_block is None or child_block.parent_id != node.id:
+                    child_block = self._make_block(child, node.id)
+                child_blocks.append(child_block)
+            self._arrange(block, node, child_blocks, mounted, changed)
+            stack.extend((c, b, depth + 1) for c, b in zip(reversed(children),
+                                                             reversed(child_blocks)))
+        self._blocks = blocks
+        profiler.count("canvas.blocks", len(blocks))
+        return changed
+
+    def _arrange(
+        self, block: _Block, node: WidgetNode, child_blocks: list[_Block],
+        mounted: bool, changed: list[ft.Control],
+    ) -> None:
+        """Put *child_blocks* (or the drop zone) under *block*'s header."""
+        containers = [b.container for b in child_blocks]
+        if block.windowed:
+            window = block.window
+            body = window.list_view
+            controls = [window.top, *containers, window.bottom]
+        elif child_blocks:
+            if block.children_col is None:
+                block.children_col = ft.Column(spacing=BLOCK_SPACING)
+            body = block.children_col
+            controls = containers
+        elif not node.children and accepts_children(node.type):
+            if block.drop_zone is None:
+                block.drop_zone = _empty_drop_zone()
+            body, controls = block.drop_zone, None
+        else:
+            body, controls = None, None
+
+        if controls is not None:
+            old = body.controls
+            if len(old) != len(controls) or any(a is not b for a, b in zip(old, controls)):
+                body.controls = controls
+                if mounted and body is block.content.controls[-1]:
+                    changed.append(body)
+        layout = [block.header] if body is None else [block.header, body]
+        current = block.content.controls
+        if len(current) != len(layout) or any(a is not b for a, b in zip(current, layout)):
+            block.content.controls = layout
+            if mounted:
+                changed.append(block.container)
+
+    def _make_window(self, block: _Block, node: WidgetNode) -> _Window:
+        is_root = node is self._root
+        list_view = ft.ListView(
+            spacing=BLOCK_SPACING,
+            expand=is_root,
+            height=None if is_root else WINDOW_HEIGHT,
+            on_scroll=lambda e, nid=node.id: self._handle_scroll(nid, e),
+        )
+        block.window = _Window(
+            list_view, ft.Container(height=0), ft.Container(height=0),
+            viewport=800.0 if is_root else WINDOW_HEIGHT,
+        )
+        return block.window
+
+    def _handle_scroll(self, node_id: str, e) -> None:
+        block = self._blocks.get(node_id)
+        node = self._index.get(node_id) if self._index is not None else None
+        if block is None or not block.windowed or node is None:
+            return
+        window = block.window
+        bounds = window.bounds
+        window.offset = e.pixels or 0.0
+        if e.viewport_dimension:
+            window.viewport = e.viewport_dimension
+        if self._window_slice(node, window) != bounds:
+            patch(*self._render())
+
+    def _make_block(self, node: WidgetNode, parent_id: str | None) -> _Block:
+        spec = spec_for(node.type)
+        icon_name = spec.icon if spec is not None else "widgets"
+        chevron = ft.Container(
+            content=ft.Icon(resolve_icon("expand_more"), size=16, color="#616161"),
+            width=20,
+            on_click=lambda e, nid=node.id: self.toggle(nid),
+        )
+        label = ft.Text(size=12, color="#212121", expand=True, no_wrap=True, max_lines=1)
         header = ft.Row(
             controls=[
+                chevron,
                 ft.Icon(resolve_icon(icon_name), size=14, color="#616161"),
-                ft.Text(
-                    _label_for(node), size=12,
-                    weight=ft.FontWeight.BOLD if is_layout else ft.FontWeight.NORMAL,
-                    color="#212121",
-                    expand=True,
-                    no_wrap=True,
-                    max_lines=1,
-                ),
+                label,
                 ft.Text(
                     node.id.split("-")[-1] if "-" in node.id else node.id,
                     size=9, color="#9e9e9e",
                 ),
             ],
             spacing=6,
+            height=HEADER_HEIGHT,
             vertical_alignment=ft.CrossAxisAlignment.CENTER,
         )
-
-        children_col = ft.Column(
-            controls=child_controls,
-            spacing=4,
-        ) if child_controls else None
-
-        block_content = ft.Column(
-            controls=[header] + ([children_col] if children_col else []),
-            spacing=6,
-        )
-
-        return ft.Container(
-            content=block_content,
-            padding=ft.padding.only(left=10, right=8, top=6, bottom=6),
-            bgcolor=color if not is_selected else "#fff9c4",
-            border=ft.border.all(
-                2 if is_selected else 1,
-                "#f57f17" if is_selected else "#bdbdbd",
-            ),
+        is_root = parent_id is None
+        content = ft.Column(controls=[header], spacing=BLOCK_GAP, expand=is_root)
+        container = ft.Container(
+            content=content,
+            padding=ft.Padding.only(left=10, right=8, top=BLOCK_PADDING, bottom=BLOCK_PADDING),
             border_radius=6,
-            on_click=lambda e, nid=node.id: on_select(nid),
-            animate=ft.Animation(150, ft.AnimationCurve.EASE_OUT),
+            expand=is_root,
+            on_click=lambda e, nid=node.id: self._on_select(nid),
+            on_long_press=self._toggle_handler(node.id),
         )
+        return _Block(container, content, header, chevron, label, parent_id)
 
-    # Build the canvas
-    tree_view = _render_block(root)
-
-    # Action bar for selected node
-    action_bar = ft.Row(
-        controls=[
-            ft.IconButton(
-                icon=resolve_icon("arrow_upward"), icon_size=18, tooltip="Move up",
-                on_click=lambda e: on_move_up(),
-            ),
-            ft.IconButton(
-                icon=resolve_icon("arrow_downward"), icon_size=18, tooltip="Move down",
-                on_click=lambda e: on_move_down(),
-            ),
-            ft.IconButton(
-                icon=resolve_icon("crop_square"), icon_size=18, tooltip="Wrap in Container",
-                on_click=lambda e: on_wrap("Container"),
-            ),
-            ft.IconButton(
-                icon=resolve_icon("view_agenda"), icon_size=18, tooltip="Wrap in Column",
-                on_click=lambda e: on_wrap("Column"),
-            ),
-            ft.IconButton(
-                icon=resolve_icon("view_week"), icon_size=18, tooltip="Wrap in Row",
-                on_click=lambda e: on_wrap("Row"),
-            ),
-            ft.IconButton(
-                icon=resolve_icon("delete_outline"), icon_size=18, tooltip="Delete",
-                icon_color="#d32f2f",
-                on_click=lambda e: on_delete(),
-            ),
-        ],
-        spacing=0,
-        alignment=ft.MainAxisAlignment.CENTER,
-    ) if selected_id and selected_id != root.id else ft.Container()
+    def _toggle_handler(self, node_id: str):
+        if self._on_toggle_select is None:
+            return None
+        return lambda e: self._on_toggle_select(node_id)
 
-    return ft.Container(
-        content=ft.Column(
-            controls=[
-                ft.Row(
-                    controls=[
-                        ft.Text("Canvas", size=16, weight=ft.FontWeight.BOLD),
-                        ft.Container(expand=True),
-                        ft.Text("Click a widget to select", size=11, color="#9e9e9e"),
-                    ],
-                ),
-                ft.Divider(height=1),
-                action_bar,
-                ft.Container(
-                    content=tree_view,
-                    expand=True,
-                    padding=8,
-                ),
-            ],
-            spacing=8,
-            scroll=ft.ScrollMode.AUTO,
-            expand=True,
-        ),
-        expand=True,
-        padding=10,
-        bgcolor="#ffffff",
-    )
\ No newline at end of file
+    @staticmethod
+    def _fill_block(block: _Block, node: WidgetNode, key: tuple) -> None:
+        _, label, depth, has_children, expanded, is_selected = key
+        block.key = key
+        is_layout = accepts_children(node.type)
+        block.label.value = label
+        block.label.weight = ft.FontWeight.BOLD if is_layout else ft.FontWeight.NORMAL
+        block.chevron.opacity = 1 if has_children else 0
+        block.chevron.content.icon = resolve_icon(
+            "expand_more" if expanded else "chevron_right")
+        color = _DEPTH_COLORS[min(depth, len(_DEPTH_COLORS) - 1)]
+        block.container.bgcolor = color if not is_selected else "#fff9c4"
+        block.container.border = ft.Border.all(
+            2 if is_selected else 1,
+            "#f57f17" if is_selected else "#bdbdbd",
+        )
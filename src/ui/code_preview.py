@@ -1,86 +1,145 @@
 """Code Preview panel — shows generated Flet Python code."""
 from __future__ import annotations
 
+import threading
+
 import flet as ft
 
-from src.engine.code_generator import generate_code
-from src.engine.validator import ValidationError, validate_tree
-from src.models.widget_node import WidgetNode
+from src.engine.background import CompileResult
+from src.engine.validator import Diagnostic
+from src.ui.reconciler import patch
 from src.utils.icons import resolve_icon
 
 
-def build_code_preview(
-    root: WidgetNode,
-    on_copy: callable,
-    on_export: callable,
-) -> ft.Control:
-    """Build the code preview panel."""
-    # Validate first
-    error_msg = None
-    try:
-        validate_tree(root)
-    except ValidationError as ex:
-        error_msg = str(ex)
+_MAX_SHOWN_DIAGNOSTICS = 5
+
+
+def _diagnostics_text(diagnostics: list[Diagnostic]) -> str:
+    text = "\n".join(d.message for d in diagnostics[:_MAX_SHOWN_DIAGNOSTICS])
+    if len(diagnostics) > _MAX_SHOWN_DIAGNOSTICS:
+        text += f"\n… and {len(diagnostics) - _MAX_SHOWN_DIAGNOSTICS} more"
+    return text
+
 
-    code = generate_code(root)
+class CodePreviewPanel:
+    """Code preview fed by :class:`BackgroundCompiler` results.
 
-    error_banner = ft.Container(
-        content=ft.Row(
+    Controls are built once.  :meth:`show` swaps in a finished result;
+    :meth:`show_pending` keeps the last code visible but dimmed, with a
+    progress indicator, until the result for the newest edit arrives.
+    Results arrive on the compiler's worker thread.
+    """
+
+    def __init__(self, on_copy: callable, on_export: callable) -> None:
+        self._code = ""
+        self._shown: int | None = None
+        self._lock = threading.Lock()  # orders show() against show_pending()
+        self._error_text = ft.Text("", size=11, color="#e65100", expand=True)
+        self._error_banner = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.Icon(resolve_icon("warning_amber"), color="#e65100", size=16),
+                    self._error_text,
+                ],
+                spacing=6,
+            ),
+            bgcolor="#fff3e0",
+            border_radius=6,
+            padding=8,
+            visible=False,
+        )
+        self._progress = ft.Row(
             controls=[
-                ft.Icon(resolve_icon("warning_amber"), color="#e65100", size=16),
-                ft.Text(error_msg, size=11, color="#e65100", expand=True),
+                ft.ProgressRing(width=14, height=14, stroke_width=2),
+                ft.Text("Generating code…", size=11, color="#757575"),
             ],
             spacing=6,
-        ),
-        bgcolor="#fff3e0",
-        border_radius=6,
-        padding=8,
-    ) if error_msg else ft.Container(height=0)
-
-    code_display = ft.TextField(
-        value=code,
-        multiline=True,
-        read_only=True,
-        min_lines=20,
-        max_lines=50,
-        text_size=12,
-        text_style=ft.TextStyle(font_family="Courier New"),
-        border_color="#e0e0e0",
-        expand=True,
-    )
-
-    return ft.Container(
-        content=ft.Column(
-            controls=[
-                ft.Row(
-                    controls=[
-                        ft.Text("Code", size=16, weight=ft.FontWeight.BOLD),
-                        ft.Container(expand=True),
-                        ft.ElevatedButton(
-                            "Copy",
-                            icon=resolve_icon("content_copy"),
-                            on_click=lambda e: on_copy(code),
-                            height=32,
-                        ),
-                        ft.ElevatedButton(
-                            "Export .py",
-                            icon=resolve_icon("download"),
-                            on_click=lambda e: on_export(code),
-                            height=32,
-                            color="white",
-                            bgcolor="#1976d2",
-                        ),
-                    ],
-                    spacing=8,
-                ),
-                ft.Divider(height=1),
-                error_banner,
-                code_display,
-            ],
-            spacing=8,
+            visible=False,
+        )
+        self._code_display = ft.TextField(
+            value="",
+            multiline=True,
+            read_only=True,
+            min_lines=20,
+            max_lines=50,
+            text_size=12,
+            text_style=ft.TextStyle(font_family="Courier New"),
+            border_color="#e0e0e0",
             expand=True,
-        ),
-        expand=True,
-        padding=10,
-        bgcolor="#fafafa",
-    )
\ No newline at end of file
+        )
+        self.control = ft.Container(
+            content=ft.Column(
+                controls=[
+                    ft.Row(
+                        controls=[
+                            ft.Text("Code", size=16, weight=ft.FontWeight.BOLD),
+                            self._progress,
+                            ft.Container(expand=True),
+                            ft.ElevatedButton(
+                                "Copy",
+                                icon=resolve_icon("content_copy"),
+                                on_click=lambda e: on_copy(self._code),
+                                height=32,
+                            ),
+                            ft.ElevatedButton(
+                                "Export .py",
+                                icon=resolve_icon("download"),
+                                on_click=lambda e: on_export(),
+                                height=32,
+                                color="white",
+                                bgcolor="#1976d2",
+                            ),
+                        ],
+                        spacing=8,
+                    ),
+                    ft.Divider(height=1),
+                    self._error_banner,
+                    self._code_display,
+                ],
+                spacing=8,
+                expand=True,
+            ),
+            expand=True,
+            padding=10,
+            bgcolor="#fafafa",
+        )
+
+    @property
+    def is_pending(self) -> bool:
+        return self._progress.visible
+
+    def show_pending(self, generation: int) -> None:
+        """Dim the code until the result for *generation* is shown.
+
+        A no-op if that result already landed, e.g. between the caller
+        finding none and this call.
+        """
+        with self._lock:
+            if self._progress.visible or generation == self._shown:
+                return
+            self._progress.visible = True
+            self._code_display.opacity = 0.5
+            patch(self._progress, self._code_display)
+
+    def show_preview(self, generation: int, head: str) -> None:
+        """Show the opening lines of a script still being generated."""
+        with self._lock:
+            if not self._progress.visible or generation == self._shown:
+                return
+            self._code_display.value = head
+            patch(self._code_display)
+
+    def show(self, result: CompileResult) -> None:
+        with self._lock:
+            if result.generation == self._shown and not self._progress.visible:
+                return
+            self._shown = result.generation
+            self._code = result.code
+            error_msg = _diagnostics_text(result.diagnostics)
+            self._error_text.value = error_msg
+            self._error_banner.visible = bool(error_msg)
+            self._code_display.value = result.code
+            self._code_display.opacity = 1
+            self._progress.visible = False
+            patch(self._error_banner, self._code_display, self._progress)
+
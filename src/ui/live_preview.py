@@ -1,65 +1,88 @@
 """Live Preview panel — renders real Flet controls from the widget tree."""
 from __future__ import annotations
 
+from collections.abc import Mapping
+
 import flet as ft
 
 from src.engine.tree_renderer import TreeRenderer
+from src.models.component import ComponentDef
 from src.models.widget_node import WidgetNode
+from src.ui.reconciler import patch
 
 
-_renderer = TreeRenderer()
+class LivePreviewPanel:
+    """Live preview that keeps its Flet controls between syncs.
 
+    The phone frame is built once and the rendered tree comes from a
+    caching :class:`TreeRenderer`, so each sync only sends the controls and
+    attributes that changed.
+    """
 
-def build_live_preview(root: WidgetNode, theme: str = "light") -> ft.Control:
-    """Build the live preview panel rendering actual Flet widgets."""
-    try:
-        rendered = _renderer.render(root)
-    except Exception as ex:
-        rendered = ft.Text(f"Preview error: {ex}", color="red", size=12)
-
-    # Phone frame
-    phone_frame = ft.Container(
-        content=ft.Container(
-            content=rendered,
+    def __init__(self) -> None:
+        self._renderer = TreeRenderer()
+        self._screen = ft.Container(
             padding=12,
             expand=True,
-            bgcolor="#ffffff" if theme == "light" else "#121212",
             clip_behavior=ft.ClipBehavior.HARD_EDGE,
-        ),
-        width=320,
-        height=568,
-        border_radius=24,
-        border=ft.border.all(3, "#424242"),
-        bgcolor="#212121",
-        padding=ft.padding.only(top=28, bottom=28, left=4, right=4),
-        shadow=ft.BoxShadow(
-            spread_radius=1, blur_radius=12,
-            color="#00000033", offset=ft.Offset(0, 4),
-        ),
-        clip_behavior=ft.ClipBehavior.HARD_EDGE,
-    )
+        )
+        # Phone frame
+        phone_frame = ft.Container(
+            content=self._screen,
+            width=320,
+            height=568,
+            border_radius=24,
+            border=ft.border.all(3, "#424242"),
+            bgcolor="#212121",
+            padding=ft.padding.only(top=28, bottom=28, left=4, right=4),
+            shadow=ft.BoxShadow(
+                spread_radius=1, blur_radius=12,
+                color="#00000033", offset=ft.Offset(0, 4),
+            ),
+            clip_behavior=ft.ClipBehavior.HARD_EDGE,
+        )
 
-    return ft.Container(
-        content=ft.Column(
-            controls=[
-                ft.Row(
-                    controls=[
-                        ft.Text("Live Preview", size=16, weight=ft.FontWeight.BOLD),
-                    ],
-                ),
-                ft.Divider(height=1),
-                ft.Container(
-                    content=phone_frame,
-                    alignment=ft.Alignment.TOP_CENTER,
-                    expand=True,
-                    padding=ft.padding.only(top=10),
-                ),
-            ],
-            spacing=8,
+        self.control = ft.Container(
+            content=ft.Column(
+                controls=[
+                    ft.Row(
+                        controls=[
+                            ft.Text("Live Preview", size=16, weight=ft.FontWeight.BOLD),
+                        ],
+                    ),
+                    ft.Divider(height=1),
+                    ft.Container(
+                        content=phone_frame,
+                        alignment=ft.Alignment.TOP_CENTER,
+                        expand=True,
+                        padding=ft.padding.only(top=10),
+                    ),
+                ],
+                spacing=8,
+                expand=True,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
             expand=True,
-            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-        ),
-        expand=True,
-        padding=10,
-        bgcolor="#f5f5f5",
-    )
\ No newline at end of file
+            padding=10,
+            bgcolor="#f5f5f5",
+        )
+
+    def sync(
+        self, root: WidgetNode, theme: str = "light",
+        components: Mapping[str, ComponentDef] | None = None,
+    ) -> None:
+        try:
+            rendered = self._renderer.render(root, components)
+        except Exception as ex:
+            self._renderer = TreeRenderer()  # cache may be half-updated
+            rendered = ft.Text(f"Preview error: {ex}", color="red", size=12)
+        self._screen.content = rendered
+        self._screen.bgcolor = "#ffffff" if theme == "light" else "#121212"
+        patch(self._screen)
+
+
+def build_live_preview(root: WidgetNode, theme: str = "light") -> ft.Control:
+    """Build the live preview panel rendering actual Flet widgets."""
+    panel = LivePreviewPanel()
+    panel.sync(root, theme)
+    return panel.control
@@ -2,8 +2,10 @@
 from __future__ import annotations
 
 import flet as ft
+from src.models.component import ComponentDef
 from src.models.widget_node import WidgetNode
-from src.models.widget_registry import WIDGET_REGISTRY
+from src.models.widget_registry import spec_for
+from src.ui.reconciler import patch
 
 
 def _handle_float(e, prop_name: str, on_prop_change) -> None:
@@ -17,7 +19,10 @@ def _handle_float(e, prop_name: str, on_prop_change) -> None:
         pass
 
 
-def build_properties(node: WidgetNode | None, on_prop_change) -> ft.Control:
+def build_properties(
+    node: WidgetNode | None, on_prop_change, selected_count: int = 1,
+    component: ComponentDef | None = None,
+) -> ft.Control:
     if node is None:
         return ft.Container(
             content=ft.Column(controls=[
@@ -33,14 +38,25 @@ def build_properties(node: WidgetNode | None, on_prop_change) -> ft.Control:
             border=ft.Border.only(left=ft.BorderSide(1, "#e0e0e0")),
         )
 
-    spec = WIDGET_REGISTRY.get(node.type, {})
-    props_spec = spec.get("props", {})
+    if component is not None:
+        # A component instance edits its definition's params.
+        title = f"{component.name} (component)"
+        props_spec = {p: d for p in component.params
+                      if (d := component.param_spec(p)) is not None}
+    else:
+        title = node.type
+        spec = spec_for(node.type)
+        props_spec = spec.props if spec is not None else {}
+    header: list[ft.Control] = [
+        ft.Text(title, size=14, weight=ft.FontWeight.BOLD),
+        ft.Text(f"ID: {node.id}", size=10, color="#9e9e9e"),
+    ]
+    if selected_count > 1:
+        header.append(ft.Text(f"{selected_count} selected: edits apply to all",
+                              size=10, color="#3949ab"))
     fields: list[ft.Control] = [
         ft.Container(
-            content=ft.Column(controls=[
-                ft.Text(node.type, size=14, weight=ft.FontWeight.BOLD),
-                ft.Text(f"ID: {node.id}", size=10, color="#9e9e9e"),
-            ], spacing=2),
+            content=ft.Column(controls=header, spacing=2),
             bgcolor="#e8eaf6", border_radius=6, padding=8,
         )
     ]
@@ -97,4 +113,52 @@ def build_properties(node: WidgetNode | None, on_prop_change) -> ft.Control:
         ], spacing=10, scroll=ft.ScrollMode.AUTO, expand=True),
         width=260, padding=10, bgcolor="#fafafa",
         border=ft.Border.only(left=ft.BorderSide(1, "#e0e0e0")),
-    )
\ No newline at end of file
+    )
+
+class PropertiesPanel:
+    """Properties panel that is rebuilt only when the edited node changes.
+
+    Edits typed into the panel are remembered as already shown, so the
+    panel is not torn down (and focus is not lost) after its own changes;
+    a rebuild happens on selection change or when the props change from
+    elsewhere, e.g. undo.
+    """
+
+    def __init__(self, on_prop_change) -> None:
+        self._on_prop_change = on_prop_change
+        self._node_id: str | None = None
+        self._count = 1
+        self._component: ComponentDef | None = None
+        self._shown: dict = {}
+        self._built = False
+        self.control = ft.Container(width=260)
+
+    def reset(self) -> None:
+        self._built = False
+
+    def sync(
+        self, node: WidgetNode | None, selected_count: int = 1,
+        component: ComponentDef | None = None,
+    ) -> None:
+        """Show *node*; *selected_count* > 1 notes that edits hit the whole selection.
+
+        Pass the definition of a component instance as *component*.
+        """
+        node_id = node.id if node is not None else None
+        props = dict(node.props) if node is not None else {}
+        if (self._built and node_id == self._node_id and props == self._shown
+                and selected_count == self._count and component is self._component):
+            return
+        self._built = True
+        self._node_id = node_id
+        self._count = selected_count
+        self._component = component
+        self._shown = props
+        self.control.content = build_properties(
+            node=node, on_prop_change=self._changed, selected_count=selected_count,
+            component=component)
+        patch(self.control)
+
+    def _changed(self, prop_name: str, value) -> None:
+        self._shown[prop_name] = value
+        self._on_prop_change(prop_name, value)
@@ -0,0 +1,25 @@
+"""Patching helpers for panels that keep their controls between frames."""
+from __future__ import annotations
+
+from src.utils.profiling import profiler
+
+
+def patch(*controls) -> None:
+    """Send pending attribute changes of already-mounted *controls*.
+
+    Controls that are not on the page yet are skipped; they go out with the
+    parent that mounts them.
+    """
+    with profiler.span("page.update"):
+        sent = 0
+        for control in controls:
+            if control is None:
+                continue
+            try:
+                page = control.page
+            except RuntimeError:  # flet>=1.0 raises instead of returning None
+                page = None
+            if page is not None:
+                control.update()
+                sent += 1
+    profiler.count("controls.patched", sent)
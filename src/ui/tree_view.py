@@ -1,65 +1,137 @@
 """Tree View panel — hierarchical widget tree display."""
 from __future__ import annotations
 
+from collections.abc import Collection
+
 import flet as ft
 
+from src.engine.tree_index import TreeIndex
 from src.models.widget_node import WidgetNode
-from src.models.widget_registry import WIDGET_REGISTRY
+from src.models.widget_registry import spec_for
+from src.ui.reconciler import patch
+from src.ui.virtual_list import VirtualRowList
 from src.utils.icons import resolve_icon
 
 
-def build_tree_view(
-    root: WidgetNode,
-    selected_id: str | None,
-    on_select: callable,
-) -> ft.Control:
-    """Build a collapsible tree view of the widget hierarchy."""
+ROW_HEIGHT = 26
+
+
+class _Row:
+    """Live controls for one visible tree view row."""
+
+    __slots__ = ("container", "expander", "text")
+
+    def __init__(self, container, expander, text) -> None:
+        self.container = container
+        self.expander = expander
+        self.text = text
 
-    def _build_node(node: WidgetNode, depth: int = 0) -> ft.Control:
-        is_selected = node.id == selected_id
-        icon_name = WIDGET_REGISTRY.get(node.type, {}).get("icon", "widgets")
-        has_children = bool(node.children)
 
-        label = ft.Container(
+class TreeViewPanel:
+    """Collapsible tree view of the widget hierarchy.
+
+    Visible rows are a flat ``(depth, id)`` array updated in place as nodes
+    expand, collapse or change, rendered through a :class:`VirtualRowList`
+    so only the rows near the viewport are built.  Clicking the expander
+    toggles a node, long-pressing a row adds it to or drops it from the
+    selection; nodes with many children start collapsed.
+    """
+
+    def __init__(
+        self,
+        on_select: callable,
+        collapse_above: int = 100,
+        on_toggle_select: callable | None = None,
+    ) -> None:
+        self._on_select = on_select
+        self._on_toggle_select = on_toggle_select
+        self._selected_ids: Collection[str] = ()
+        self._list = VirtualRowList(
+            self._make_row, self._row_key, self._fill_row,
+            row_height=ROW_HEIGHT, collapse_above=collapse_above,
+        )
+        self._body = ft.Column(controls=[
+            ft.Text("Tree", size=12, weight=ft.FontWeight.BOLD, color="#757575"),
+            ft.Divider(height=1),
+            self._list.control,
+        ], spacing=4, expand=True)
+        self.control = ft.Container(
+            content=self._body,
+            padding=8,
+            expand=True,
+            bgcolor="#fafafa",
+            border=ft.Border.only(top=ft.BorderSide(1, "#e0e0e0")),
+        )
+
+    @property
+    def materialized(self) -> int:
+        """Number of row controls currently built."""
+        return self._list.materialized
+
+    def reset(self) -> None:
+        self._list.reset()
+        self._selected_ids = ()
+
+    def sync(
+        self,
+        root: WidgetNode,
+        selected_id: str | None,
+        dirty: set[str] | None = None,
+        tree_index: TreeIndex | None = None,
+        selected_ids: Collection[str] | None = None,
+    ) -> None:
+        self._selected_ids = selected_ids if selected_ids is not None else (selected_id,)
+        patch(*self._list.sync(root, dirty, tree_index))
+
+    def toggle(self, node_id: str) -> None:
+        """Expand or collapse *node_id*."""
+        patch(*self._list.toggle(node_id))
+
+    def _make_row(self, node: WidgetNode) -> _Row:
+        spec = spec_for(node.type)
+        icon_name = spec.icon if spec is not None else "widgets"
+        text = ft.Text(node.type, size=12)
+        expander = ft.Container(
+            content=ft.Icon(resolve_icon("expand_more"), size=14, color="#9e9e9e"),
+            on_click=lambda e, nid=node.id: self.toggle(nid),
+        )
+        container = ft.Container(
             content=ft.Row(
                 controls=[
-                    ft.Icon(
-                        "expand_more" if has_children else "remove",
-                        size=14, color="#9e9e9e",
-                    ),
+                    expander,
                     ft.Icon(resolve_icon(icon_name), size=14, color="#616161"),
-                    ft.Text(
-                        node.type, size=12,
-                        weight=ft.FontWeight.BOLD if is_selected else ft.FontWeight.NORMAL,
-                        color="#1976d2" if is_selected else "#424242",
-                    ),
+                    text,
                 ],
                 spacing=4,
                 vertical_alignment=ft.CrossAxisAlignment.CENTER,
             ),
-            padding=ft.padding.only(left=depth * 16 + 4, top=3, bottom=3, right=4),
-            bgcolor="#e3f2fd" if is_selected else None,
+            height=ROW_HEIGHT,
             border_radius=4,
-            on_click=lambda e, nid=node.id: on_select(nid),
+            on_click=lambda e, nid=node.id: self._on_select(nid),
+            on_long_press=self._toggle_handler(node.id),
             ink=True,
         )
+        return _Row(container, expander, text)
+
+    def _toggle_handler(self, node_id: str):
+        if self._on_toggle_select is None:
+            return None
+        return lambda e: self._on_toggle_select(node_id)
+
+    def _row_key(self, node: WidgetNode, depth: int, expanded: bool) -> tuple:
+        return (node.type, depth, bool(node.children), expanded,
+                node.id in self._selected_ids)
 
-        items = [label]
-        for child in node.children:
-            items.append(_build_node(child, depth + 1))
-        return ft.Column(controls=items, spacing=0)
-
-    return ft.Container(
-        content=ft.Column(
-            controls=[
-                ft.Text("Tree", size=12, weight=ft.FontWeight.BOLD, color="#757575"),
-                ft.Divider(height=1),
-                _build_node(root),
-            ],
-            spacing=4,
-            scroll=ft.ScrollMode.AUTO,
-        ),
-        padding=8,
-        bgcolor="#fafafa",
-        border=ft.border.only(top=ft.BorderSide(1, "#e0e0e0")),
-    )
\ No newline at end of file
+    @staticmethod
+    def _fill_row(row: _Row, node: WidgetNode, key: tuple) -> None:
+        node_type, depth, has_children, expanded, is_selected = key
+        row.text.value = node_type
+        if not has_children:
+            icon = "remove"
+        else:
+            icon = "expand_more" if expanded else "chevron_right"
+        row.expander.content.icon = resolve_icon(icon)
+        row.container.padding = ft.Padding.only(left=depth * 16 + 4, right=4)
+        row.text.weight = ft.FontWeight.BOLD if is_selected else ft.FontWeight.NORMAL
+        row.text.color = "#1976d2" if is_selected else "#424242"
+        row.container.bgcolor = "#e3f2fd" if is_selected else None
@@ -0,0 +1,153 @@
+"""Windowed list of tree rows: only rows near the viewport get controls."""
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from typing import Any
+
+import flet as ft
+
+from src.engine.tree_index import TreeIndex
+from src.models.widget_node import WidgetNode
+from src.ui.reconciler import patch
+from src.ui.visible_rows import VisibleRows
+from src.utils.profiling import profiler
+
+
+class VirtualRowList:
+    """A scrolling ``ListView`` over the :class:`VisibleRows` of a tree.
+
+    Rows have a fixed *row_height*, so the scroll offset maps straight to a
+    row index.  Only the rows inside the viewport plus *overscan* on either
+    side are materialized; two spacers stand in for the rest, which keeps
+    the control count bounded by the viewport rather than the tree.
+
+    The owning panel supplies three callbacks:
+
+    * ``make_row(node)`` builds a row object with a ``container`` control;
+    * ``row_key(node, depth, expanded)`` returns what the row depends on;
+    * ``fill_row(row, node, key)`` updates the row's controls for *key*.
+
+    Rows are reused while their node stays in the window and re-filled only
+    when their key changes.  Methods return the controls to ``patch``.
+    """
+
+    def __init__(
+        self,
+        make_row: Callable[[WidgetNode], Any],
+        row_key: Callable[[WidgetNode, int, bool], Hashable],
+        fill_row: Callable[[Any, WidgetNode, Hashable], None],
+        *,
+        row_height: float,
+        overscan: int = 10,
+        collapse_above: int = 100,
+        viewport: float = 800.0,
+    ) -> None:
+        self._make_row = make_row
+        self._row_key = row_key
+        self._fill_row = fill_row
+        self.row_height = row_height
+        self.overscan = overscan
+        self.rows = VisibleRows(collapse_above)
+        self._cache: dict[str, tuple[Any, Hashable]] = {}
+        self._window = (0, 0)
+        self._scroll_offset = 0.0
+        self._viewport = viewport
+        self._index: TreeIndex | None = None
+        self._top_spacer = ft.Container(height=0)
+        self._bottom_spacer = ft.Container(height=0)
+        self.control = ft.ListView(
+            controls=[self._top_spacer, self._bottom_spacer],
+            spacing=0,
+            expand=True,
+            on_scroll=self._handle_scroll,
+        )
+
+    @property
+    def materialized(self) -> int:
+        """Number of row controls currently built."""
+        return len(self._cache)
+
+    def reset(self) -> None:
+        self.rows.reset()
+        self._cache.clear()
+        self._window = (0, 0)
+        self._index = None
+
+    def sync(
+        self,
+        root: WidgetNode,
+        dirty: set[str] | None = None,
+        tree_index: TreeIndex | None = None,
+    ) -> list[ft.Control]:
+        """Re-lay out the rows touched by *dirty* and re-render the window."""
+        if tree_index is None:
+            tree_index = TreeIndex(root)
+            dirty = None
+        self._index = tree_index
+        self.rows.sync(root, dirty, tree_index)
+        return self.render()
+
+    def is_expanded(self, node: WidgetNode) -> bool:
+        return self.rows.is_expanded(node)
+
+    def toggle(self, node_id: str) -> list[ft.Control]:
+        """Expand or collapse *node_id*'s row."""
+        node = self._index.get(node_id) if self._index is not None else None
+        if node is None:
+            return []
+        if self.rows.is_expanded(node):
+            self.rows.collapse(node_id)
+        else:
+            self.rows.expand(node)
+        return self.render()
+
+    def render(self) -> list[ft.Control]:
+        """Materialize the rows in the scroll window; return what to patch."""
+        if self._index is None:
+            return []
+        start, stop = self._window = self._window_bounds()
+        index, rows = self._index, self.rows
+        changed: list[ft.Control] = []
+        created = 0
+        cache: dict[str, tuple[Any, Hashable]] = {}
+        controls: list[ft.Control] = [self._top_spacer]
+        for depth, node_id in rows.window(start, stop):
+            node = index.get(node_id)
+            key = self._row_key(node, depth, rows.is_expanded(node))
+            cached = self._cache.get(node_id)
+            if cached is None:
+                row = self._make_row(node)
+                self._fill_row(row, node, key)
+                created += 1
+            else:
+                row = cached[0]
+                if cached[1] != key:
+                    self._fill_row(row, node, key)
+                    changed.append(row.container)
+            cache[node_id] = (row, key)
+            controls.append(row.container)
+        controls.append(self._bottom_spacer)
+        self._cache = cache
+        profiler.count("rows.created", created)
+        profiler.count("rows.refilled", len(changed))
+
+        self._top_spacer.height = start * self.row_height
+        self._bottom_spacer.height = (len(rows) - stop) * self.row_height
+        old = self.control.controls
+        if len(old) != len(controls) or any(a is not b for a, b in zip(old, controls)):
+            self.control.controls = controls
+            return [self.control]
+        return [self._top_spacer, self._bottom_spacer, *changed]
+
+    def _handle_scroll(self, e) -> None:
+        self._scroll_offset = e.pixels or 0.0
+        if e.viewport_dimension:
+            self._viewport = e.viewport_dimension
+        if self._window_bounds() != self._window:
+            patch(*self.render())
+
+    def _window_bounds(self) -> tuple[int, int]:
+        first = int(self._scroll_offset // self.row_height)
+        visible = int(self._viewport // self.row_height) + 1
+        return (max(0, first - self.overscan),
+                min(len(self.rows), first + visible + self.overscan))
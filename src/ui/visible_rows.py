@@ -0,0 +1,145 @@
+"""Flat, collapsible row model shared by the canvas and the tree view."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+from src.engine.tree_index import TreeIndex
+from src.models.widget_node import WidgetNode
+
+
+class VisibleRows:
+    """The rows a collapsible tree currently shows, as a flat array.
+
+    Rows are ``(depth, node id)`` in pre-order.  Descendants of collapsed
+    nodes are skipped, so collapsed subtrees are never walked.  Expanding
+    or collapsing a node splices only its own slice of the array, and
+    :meth:`sync` re-walks only visible nodes whose child list or expanded
+    state changed.
+
+    Nodes with more than *collapse_above* children start collapsed.
+    """
+
+    def __init__(self, collapse_above: int = 100) -> None:
+        self.collapse_above = collapse_above
+        self._depths: list[int] = []
+        self._ids: list[str] = []
+        self._collapsed: set[str] = set()
+        self._opened: set[str] = set()  # expanded explicitly despite collapse_above
+        # visible node -> child ids it was laid out with, None if collapsed
+        self._laid_out: dict[str, tuple[str, ...] | None] = {}
+        self._positions: dict[str, int] | None = {}  # node id -> row, rebuilt on demand
+        self._root_id: str | None = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, i: int) -> tuple[int, str]:
+        return self._depths[i], self._ids[i]
+
+    def __iter__(self) -> Iterator[tuple[int, str]]:
+        return zip(self._depths, self._ids)
+
+    def window(self, start: int, stop: int) -> list[tuple[int, str]]:
+        return list(zip(self._depths[start:stop], self._ids[start:stop]))
+
+    def index_of(self, node_id: str) -> int | None:
+        if self._positions is None:
+            self._positions = {nid: i for i, nid in enumerate(self._ids)}
+        return self._positions.get(node_id)
+
+    def is_expanded(self, node: WidgetNode) -> bool:
+        if node.id in self._collapsed:
+            return False
+        return node.id in self._opened or len(node.children) <= self.collapse_above
+
+    def reset(self) -> None:
+        self._depths.clear()
+        self._ids.clear()
+        self._collapsed.clear()
+        self._opened.clear()
+        self._laid_out.clear()
+        self._positions = {}
+        self._root_id = None
+
+    def rebuild(self, root: WidgetNode) -> None:
+        self._laid_out.clear()
+        self._root_id = root.id
+        self._depths, self._ids = self._walk(root, 0)
+        self._positions = None
+
+    def sync(
+        self,
+        root: WidgetNode,
+        dirty: set[str] | None = None,
+        tree_index: TreeIndex | None = None,
+    ) -> None:
+        """Bring the rows in line with *root* after an edit.
+
+        *dirty* (drained from a DirtySet) limits the check to those ids;
+        None rebuilds every row.
+        """
+        if dirty is None or tree_index is None or root.id != self._root_id:
+            self.rebuild(root)
+            return
+        for node_id in dirty:
+            if node_id not in tree_index:
+                self._laid_out.pop(node_id, None)
+                continue
+            if node_id not in self._laid_out:
+                continue  # hidden under a collapsed ancestor
+            node = tree_index.get(node_id)
+            if self._laid_out[node_id] != self._layout_key(node):
+                self._relayout(node)
+
+    def collapse(self, node_id: str) -> None:
+        self._collapsed.add(node_id)
+        self._opened.discard(node_id)
+        i = self.index_of(node_id)
+        if i is not None:
+            end = self._subtree_end(i)
+            for removed in self._ids[i + 1:end]:
+                self._laid_out.pop(removed, None)
+            del self._depths[i + 1:end]
+            del self._ids[i + 1:end]
+            self._positions = None
+            self._laid_out[node_id] = None
+
+    def expand(self, node: WidgetNode) -> None:
+        self._collapsed.discard(node.id)
+        self._opened.add(node.id)
+        self._relayout(node)
+
+    def _relayout(self, node: WidgetNode) -> None:
+        """Replace *node*'s rows with a fresh walk, if it is visible."""
+        i = self.index_of(node.id)
+        if i is None:
+            self._laid_out.pop(node.id, None)
+            return
+        end = self._subtree_end(i)
+        depths, ids = self._walk(node, self._depths[i])
+        self._depths[i:end] = depths
+        self._ids[i:end] = ids
+        self._positions = None
+
+    def _subtree_end(self, i: int) -> int:
+        depth = self._depths[i]
+        end = i + 1
+        while end < len(self._depths) and self._depths[end] > depth:
+            end += 1
+        return end
+
+    def _walk(self, start: WidgetNode, depth: int) -> tuple[list[int], list[str]]:
+        depths: list[int] = []
+        ids: list[str] = []
+        stack = [(start, depth)]
+        while stack:
+            node, depth = stack.pop()
+            depths.append(depth)
+            ids.append(node.id)
+            self._laid_out[node.id] = key = self._layout_key(node)
+            if key is not None:
+                stack.extend((c, depth + 1) for c in reversed(node.children))
+        return depths, ids
+
+    def _layout_key(self, node: WidgetNode) -> tuple[str, ...] | None:
+        return tuple(c.id for c in node.children) if self.is_expanded(node) else None
@@ -0,0 +1,62 @@
+"""Run work once a burst of calls has gone idle."""
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+
+
+class Debouncer:
+    """Call *fn* once :meth:`trigger` has not been called for *delay* seconds.
+
+    Each trigger restarts the countdown, so a burst of triggers (one per
+    keystroke) ends in a single call.  *fn* runs on a timer thread made by
+    *timer* (``threading.Timer``-compatible); :meth:`flush` runs pending
+    work right away on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[], None],
+        delay: float = 0.15,
+        *,
+        timer: Callable[..., threading.Timer] = threading.Timer,
+    ) -> None:
+        self.delay = delay
+        self._fn = fn
+        self._timer_factory = timer
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._generation = 0  # tells a stale timer that beat cancel() apart
+
+    @property
+    def pending(self) -> bool:
+        return self._timer is not None
+
+    def trigger(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._generation += 1
+            self._timer = self._timer_factory(self.delay, self._fire, args=(self._generation,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self) -> bool:
+        """Drop pending work; returns whether there was any."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+            if timer is not None:
+                timer.cancel()
+            return timer is not None
+
+    def flush(self) -> None:
+        """Run pending work now instead of when the timer fires."""
+        if self.cancel():
+            self._fn()
+
+    def _fire(self, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation or self._timer is None:
+                return
+            self._timer = None
+        self._fn()
@@ -0,0 +1,125 @@
+"""Write-ahead edit journal for cheap, crash-safe autosave.
+
+Every edit committed through :class:`AppState` (including undo and redo)
+becomes one JSON line of ``<project>.journal``, which costs time
+proportional to the edit rather than the project.  Lines are buffered
+and appended by :meth:`Journal.flush` with a single write and fsync, so
+a burst of edits (typing in a field) is synced once.  Every
+``compact_every`` edits the journal is folded into a full snapshot,
+written atomically by :func:`save_project`, and truncated.
+:func:`load_project` replays whatever the journal holds on top of the
+snapshot.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from src.state.app_state import AppState
+from src.state.history import HistoryEntry
+from src.state.project_state import ProjectState
+from src.utils.serializer import journal_op, journal_path_for, save_project
+
+
+class Journal:
+    """Autosave *path* from an :class:`AppState` through an edit journal."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        compact_every: int = 200,
+        max_buffered: int = 64,
+        durable: bool = True,
+        indent: int | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.journal_path = journal_path_for(self.path)
+        self.compact_every = compact_every
+        self.max_buffered = max_buffered  # flush on its own past this many lines
+        self.durable = durable  # fsync every flush, not just snapshots
+        self.indent = indent
+        self.pending = 0  # edits in the journal since the last snapshot
+        self._buffer: list[str] = []
+        self._fp = None
+        self._state: AppState | None = None
+        self._closed = False
+
+    def open(self, project: ProjectState) -> None:
+        """Get ready to journal edits to *project*, as loaded from ``path``.
+
+        Nothing is written unless a journal is already on disk: that one
+        (replayed into *project* by :func:`load_project`) is folded into
+        a snapshot first, so new lines never follow a torn one.  Raises
+        OSError if the journal cannot be written, so call this before
+        committing to *project*.
+        """
+        if self._fp is not None:
+            return
+        if self.journal_path.exists() and self.journal_path.stat().st_size:
+            self.compact(project)
+        self._fp = self.journal_path.open("a", encoding="utf-8")
+
+    def attach(self, state: AppState) -> None:
+        """Journal every edit *state* publishes from now on."""
+        self.open(state.project)
+        self._state = state
+        state.subscribe_history(self.record)
+
+    def record(self, entry: HistoryEntry, project: ProjectState) -> None:
+        if self._closed:
+            return
+        op = journal_op(
+            project, entry.touched(), entry.attached(project),
+            components_changed=entry.field("components") is not project.components,
+        )
+        self._buffer.append(json.dumps(op, separators=(",", ":")))
+        self.pending += 1
+        if self.pending >= self.compact_every:
+            self.compact(project)
+        elif len(self._buffer) >= self.max_buffered:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append the buffered edits to the journal and sync it once."""
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        if self._fp is None:
+            self._fp = self.journal_path.open("a", encoding="utf-8")
+        self._fp.write("\n".join(lines) + "\n")
+        self._fp.flush()
+        if self.durable:
+            os.fsync(self._fp.fileno())
+
+    def compact(self, project: ProjectState) -> None:
+        """Write a full snapshot of *project* and empty the journal.
+
+        A crash between the two steps is harmless: replaying journal
+        records over a snapshot that already contains them is a no-op.
+        """
+        save_project(project, self.path, indent=self.indent)
+        self._buffer.clear()
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+        self.journal_path.unlink(missing_ok=True)
+        self.pending = 0
+
+    def close(self) -> None:
+        """Flush and stop journaling; the snapshot plus journal on disk stay loadable."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._state is not None:
+            self._state.unsubscribe_history(self.record)
+            self._state = None
+        try:
+            self.flush()
+        finally:
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+            if self.journal_path.exists() and not self.journal_path.stat().st_size:
+                self.journal_path.unlink()
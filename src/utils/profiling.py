@@ -0,0 +1,203 @@
+"""Optional hot-path instrumentation: spans, counters and action latencies.
+
+Off unless the ``FVB_PROFILE`` environment variable is set:
+
+* ``FVB_PROFILE=1`` records in memory (see :meth:`Profiler.summary`);
+* ``FVB_PROFILE=path.trace.json`` also writes a Chrome trace-event file at
+  exit (open it in ``chrome://tracing`` or Perfetto);
+* ``FVB_PROFILE=path.json`` writes the plain JSON trace instead.
+
+While disabled, :meth:`Profiler.span` hands back one shared no-op context
+manager and :meth:`Profiler.count` returns at once, so instrumented code
+pays a method call and a flag check.
+"""
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from collections.abc import Callable
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, TypeVar
+
+ENV_VAR = "FVB_PROFILE"
+CHROME_SUFFIX = ".trace.json"
+
+# Upper bounds (ms) of the latency histogram buckets; the last is open-ended.
+BUCKETS_MS = (1, 2, 5, 10, 16, 33, 50, 100, 250, 500, 1000)
+
+_NULL = nullcontext()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _Span:
+    __slots__ = ("_profiler", "_name", "_args", "_start", "_action")
+
+    def __init__(self, profiler: Profiler, name: str, args: dict | None, action: bool) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._args = args
+        self._action = action
+
+    def __enter__(self) -> _Span:
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        end = time.perf_counter_ns()
+        self._profiler._record(self._name, self._start, end, self._args, self._action)
+
+
+class Profiler:
+    """Collects timing spans, counters and per-action latency histograms.
+
+    Spans are kept in a ring of *max_spans*; each action keeps its last
+    *window* latencies for the rolling histogram.
+    """
+
+    def __init__(self, enabled: bool = False, max_spans: int = 100_000, window: int = 500) -> None:
+        self.enabled = enabled
+        self._epoch = time.perf_counter_ns()
+        self._spans: deque[tuple[str, int, int, int, dict | None]] = deque(maxlen=max_spans)
+        self._counters: dict[str, int] = defaultdict(int)
+        self._counter_events: deque[tuple[str, int, int]] = deque(maxlen=max_spans)
+        self._actions: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    @classmethod
+    def from_env(cls) -> Profiler:
+        """A profiler configured by ``$FVB_PROFILE``, exporting at exit if asked."""
+        value = os.environ.get(ENV_VAR, "").strip()
+        profiler = cls(enabled=value not in ("", "0"))
+        if profiler.enabled and value != "1":
+            atexit.register(profiler.export, value)
+        return profiler
+
+    def reset(self) -> None:
+        self._epoch = time.perf_counter_ns()
+        self._spans.clear()
+        self._counters.clear()
+        self._counter_events.clear()
+        self._actions.clear()
+
+    # --- recording -------------------------------------------------------
+
+    def span(self, name: str, **args: Any):
+        """Context manager timing the enclosed block as *name*."""
+        if not self.enabled:
+            return _NULL
+        return _Span(self, name, args or None, False)
+
+    def action(self, name: str):
+        """Like :meth:`span`, and feeds *name*'s latency histogram."""
+        if not self.enabled:
+            return _NULL
+        return _Span(self, f"action:{name}", None, True)
+
+    def traced(self, name: str) -> Callable[[F], F]:
+        """Decorator running the function as :meth:`action` *name*.
+
+        Decided when decorating: with profiling off the function is
+        returned untouched.
+        """
+        def decorate(fn: F) -> F:
+            if not self.enabled:
+                return fn
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.action(name):
+                    return fn(*args, **kwargs)
+            return wrapper  # type: ignore[return-value]
+        return decorate
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled or not n:
+            return
+        total = self._counters[name] = self._counters[name] + n
+        self._counter_events.append((name, time.perf_counter_ns(), total))
+
+    def _record(self, name: str, start: int, end: int, args: dict | None, action: bool) -> None:
+        self._spans.append((name, start, end, threading.get_ident(), args))
+        if action:
+            self._actions[name[len("action:"):]].append((end - start) / 1e6)
+
+    # --- reporting -------------------------------------------------------
+
+    def summary(self) -> dict[str, Any]:
+        """Counters, per-span totals and per-action latency statistics (ms)."""
+        totals: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+        for name, start, end, _, _ in self._spans:
+            total = totals[name]
+            total[0] += 1
+            total[1] += (end - start) / 1e6
+        return {
+            "counters": dict(self._counters),
+            "spans": {name: {"count": n, "total_ms": round(ms, 3)}
+                      for name, (n, ms) in sorted(totals.items())},
+            "actions": {name: _latency_stats(list(lat))
+                        for name, lat in sorted(self._actions.items())},
+        }
+
+    def to_json(self) -> dict[str, Any]:
+        """Raw span events (µs since start) plus :meth:`summary`."""
+        epoch = self._epoch
+        return {
+            "events": [
+                {"name": name, "start_us": (start - epoch) / 1e3,
+                 "dur_us": (end - start) / 1e3, "thread": tid, **({"args": args} if args else {})}
+                for name, start, end, tid, args in self._spans
+            ],
+            **self.summary(),
+        }
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Trace-event format: complete ("X") events plus counter ("C") tracks."""
+        epoch, pid = self._epoch, os.getpid()
+        events: list[dict[str, Any]] = [
+            {"name": name, "ph": "X", "ts": (start - epoch) / 1e3,
+             "dur": (end - start) / 1e3, "pid": pid, "tid": tid, "args": args or {}}
+            for name, start, end, tid, args in self._spans
+        ]
+        events.extend(
+            {"name": name, "ph": "C", "ts": (ts - epoch) / 1e3, "pid": pid,
+             "args": {"value": total}}
+            for name, ts, total in self._counter_events
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": self.summary()}
+
+    def export(self, path: str | Path) -> None:
+        """Write a Chrome trace (``*.trace.json``) or plain JSON trace to *path*."""
+        path = Path(path)
+        data = self.to_chrome_trace() if path.name.endswith(CHROME_SUFFIX) else self.to_json()
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _latency_stats(latencies: list[float]) -> dict[str, Any]:
+    ordered = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+    histogram = [0] * (len(BUCKETS_MS) + 1)
+    for ms in ordered:
+        histogram[bisect_left(BUCKETS_MS, ms)] += 1
+    return {
+        "count": len(ordered),
+        "p50_ms": pct(0.5), "p95_ms": pct(0.95), "p99_ms": pct(0.99),
+        "max_ms": round(ordered[-1], 3),
+        "histogram": {
+            **{f"<={b}ms": n for b, n in zip(BUCKETS_MS, histogram)},
+            f">{BUCKETS_MS[-1]}ms": histogram[-1],
+        },
+    }
+
+
+profiler = Profiler.from_env()
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
 import json
+import os
+import re
 import shutil
+from json.decoder import scanstring
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
+from collections.abc import Iterable
+from typing import TextIO
 
+from src.models.component import ComponentDef
 from src.models.widget_node import WidgetNode
 from src.state.project_state import ProjectState
+from src.utils.binary_format import read_binary, write_binary
 from src.utils.constants import SCHEMA_VERSION
 
 
@@ -14,12 +22,28 @@ from src.utils.constants import SCHEMA_VERSION
 # ---------------------------------------------------------------------------
 
 def node_to_dict(node: WidgetNode) -> dict:
-    """Convert a WidgetNode tree to a plain dict (JSON-safe)."""
+    """Convert a WidgetNode tree to a plain dict (JSON-safe).
+
+    Uses an explicit stack, so tree depth is not limited by the recursion
+    limit.
+    """
+    out = _node_fields(node)
+    stack = [(node, out)]
+    while stack:
+        current, data = stack.pop()
+        for child in current.children:
+            child_data = _node_fields(child)
+            data["children"].append(child_data)
+            stack.append((child, child_data))
+    return out
+
+
+def _node_fields(node: WidgetNode) -> dict:
     return {
         "id": node.id,
         "type": node.type,
         "props": dict(node.props),
-        "children": [node_to_dict(child) for child in node.children],
+        "children": [],
         "parent_id": node.parent_id,
         "order": node.order,
         "slot": node.slot,
@@ -27,8 +51,22 @@ def node_to_dict(node: WidgetNode) -> dict:
 
 
 def node_from_dict(data: dict) -> WidgetNode:
-    """Reconstruct a WidgetNode tree from a plain dict."""
-    node = WidgetNode(
+    """Reconstruct a WidgetNode tree from a plain dict (iteratively)."""
+    root = _node_shell(data)
+    stack = [(root, data)]
+    while stack:
+        node, current = stack.pop()
+        for child_data in current.get("children", []):
+            child = _node_shell(child_data)
+            if child.parent_id == node.id:
+                child.parent_id = node.id  # share the string, not an equal copy
+            node.children.append(child)
+            stack.append((child, child_data))
+    return root
+
+
+def _node_shell(data: dict) -> WidgetNode:
+    return WidgetNode(
         id=data["id"],
         type=data["type"],
         props=data.get("props", {}),
@@ -36,23 +74,48 @@ def node_from_dict(data: dict) -> WidgetNode:
         order=data.get("order", 0),
         slot=data.get("slot"),
     )
-    node.children = [node_from_dict(child) for child in data.get("children", [])]
-    return node
+
+
+def components_to_dict(components: dict[str, ComponentDef]) -> dict:
+    return {
+        name: {
+            "params": {param: list(target) for param, target in definition.params.items()},
+            "tree": node_to_dict(definition.root),
+        }
+        for name, definition in components.items()
+    }
+
+
+def components_from_dict(data: dict) -> dict[str, ComponentDef]:
+    return {
+        name: ComponentDef(
+            name, node_from_dict(entry["tree"]),
+            {param: tuple(target) for param, target in entry.get("params", {}).items()},
+        )
+        for name, entry in data.items()
+    }
 
 
 # ---------------------------------------------------------------------------
 # Project serialization
 # ---------------------------------------------------------------------------
 
+_PROJECT_FIELDS = ("name", "schema_version", "theme", "device_frame", "selected_node_id")
+
+
 def project_to_dict(project: ProjectState) -> dict:
-    return {
+    data = {
         "name": project.name,
         "schema_version": project.schema_version,
         "theme": project.theme,
         "device_frame": project.device_frame,
         "selected_node_id": project.selected_node_id,
-        "tree": node_to_dict(project.tree),
     }
+    # Component definitions are stored once; instances in the tree refer to them.
+    if project.components:
+        data["components"] = components_to_dict(project.components)
+    data["tree"] = node_to_dict(project.tree)
+    return data
 
 
 def project_from_dict(data: dict) -> ProjectState:
@@ -63,6 +126,7 @@ def project_from_dict(data: dict) -> ProjectState:
         theme=migrated.get("theme", "light"),
         device_frame=migrated.get("device_frame", "desktop"),
         selected_node_id=migrated.get("selected_node_id"),
+        components=components_from_dict(migrated.get("components") or {}),
         tree=node_from_dict(migrated["tree"]),
     )
 
@@ -71,16 +135,457 @@ def project_from_dict(data: dict) -> ProjectState:
 # File I/O
 # ---------------------------------------------------------------------------
 
-def save_project(project: ProjectState, path: str | Path) -> None:
+BINARY_SUFFIX = ".fvb"
+
+
+def is_binary_path(path: str | Path) -> bool:
+    """True if *path* names a binary ``.fvb`` project rather than JSON."""
+    return Path(path).suffix == BINARY_SUFFIX
+
+
+def save_project(project: ProjectState, path: str | Path, *, indent: int | None = 2) -> None:
+    """Write *project* to *path* atomically, keeping the previous file as ``.bak``.
+
+    The format follows the extension: ``.fvb`` is the binary container from
+    :mod:`src.utils.binary_format`, anything else JSON.  The snapshot goes
+    to a temp file that replaces *path* only once it is complete, so a
+    crash never leaves a torn project file.  ``indent=None`` writes compact
+    JSON (no whitespace) for production saves.
+    """
     path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    if is_binary_path(path):
+        with tmp.open("wb") as fp:
+            meta = {name: getattr(project, name) for name in _PROJECT_FIELDS}
+            meta["components"] = components_to_dict(project.components)
+            write_binary(meta, project.tree, fp)
+            fp.flush()
+            os.fsync(fp.fileno())
+    else:
+        with tmp.open("w", encoding="utf-8") as fp:
+            write_project(project, fp, indent=indent)
+            fp.flush()
+            os.fsync(fp.fileno())
     if path.exists():
-        shutil.copy2(path, path.with_suffix(path.suffix + ".bak"))
-    path.write_text(json.dumps(project_to_dict(project), indent=2), encoding="utf-8")
+        _link_backup(path, path.with_suffix(path.suffix + ".bak"))
+    os.replace(tmp, path)
+
+
+def _link_backup(path: Path, backup: Path) -> None:
+    """Point *backup* at the current contents of *path* without copying them."""
+    tmp = backup.with_name(backup.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(path, tmp)
+    except OSError:  # no hard links on this filesystem
+        shutil.copy2(path, tmp)
+    os.replace(tmp, backup)
 
 
 def load_project(path: str | Path) -> ProjectState:
-    data = json.loads(Path(path).read_text(encoding="utf-8"))
-    return project_from_dict(data)
+    """Load the snapshot at *path* and replay its edit journal, if any."""
+    if is_binary_path(path):
+        meta, tree = read_binary(Path(path).read_bytes())
+        project = _project_from_fields(meta, tree)
+    else:
+        with Path(path).open("r", encoding="utf-8") as fp:
+            project = read_project(fp)
+    replay_journal(project, journal_path_for(path))
+    return project
+
+
+# ---------------------------------------------------------------------------
+# Edit journal
+#
+# Each line of ``<project>.journal`` is one committed edit: the project
+# fields plus the post-edit state of every node the edit touched (and whole
+# subtrees for nodes that are new under their parent).  Records are
+# states, not deltas, so replaying the journal over a snapshot that already
+# includes some of its edits still ends in the same state.
+# ---------------------------------------------------------------------------
+
+def journal_path_for(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".journal")
+
+
+def journal_op(
+    project: ProjectState,
+    touched: Iterable[WidgetNode],
+    attached: Iterable[WidgetNode] = (),
+    *,
+    components_changed: bool = False,
+) -> dict:
+    """Encode one edit, now applied to *project*.
+
+    *touched* are the nodes the edit changed and *attached* the roots of
+    subtrees it added, which are written out whole.
+    """
+    records: dict[str, dict] = {}
+    for node in touched:
+        if node.id in project.index:  # detached since: nothing to replay
+            records[node.id] = _journal_node(node)
+    stack = list(attached)
+    while stack:
+        node = stack.pop()
+        records[node.id] = _journal_node(node)
+        stack.extend(node.children)
+    op = {
+        "name": project.name,
+        "theme": project.theme,
+        "device_frame": project.device_frame,
+        "selected_node_id": project.selected_node_id,
+        "root": project.tree.id,
+        "nodes": list(records.values()),
+    }
+    if components_changed:
+        op["components"] = components_to_dict(project.components)
+    return op
+
+
+def _journal_node(node: WidgetNode) -> dict:
+    return {
+        "id": node.id,
+        "type": node.type,
+        "props": dict(node.props),
+        "children": [c.id for c in node.children],
+        "parent_id": node.parent_id,
+        "order": node.order,
+        "slot": node.slot,
+    }
+
+
+def replay_journal(project: ProjectState, path: str | Path) -> int:
+    """Apply the journal at *path* to *project*; returns the number of edits.
+
+    Replay stops at a torn last line (crash mid-append) or at an entry that
+    names a child it never defines.
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0
+    nodes: dict[str, WidgetNode] = {}
+    stack = [project.tree]
+    while stack:
+        node = stack.pop()
+        nodes[node.id] = node
+        stack.extend(node.children)
+
+    applied = 0
+    with path.open("r", encoding="utf-8") as fp:
+        for line in fp:
+            try:
+                op = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            defined = {record["id"] for record in op["nodes"]}
+            if any(c not in nodes and c not in defined
+                   for record in op["nodes"] for c in record["children"]):
+                break
+            for record in op["nodes"]:
+                node = nodes.get(record["id"])
+                if node is None:
+                    node = nodes[record["id"]] = _node_shell(record)
+                node.type = record["type"]
+                node.props = record["props"]
+                node.parent_id = record["parent_id"]
+                node.order = record["order"]
+                node.slot = record["slot"]
+            for record in op["nodes"]:
+                children = [nodes[c] for c in record["children"]]
+                for i, child in enumerate(children):
+                    child.order = i
+                nodes[record["id"]].children = children
+            project.name = op["name"]
+            project.theme = op["theme"]
+            project.device_frame = op["device_frame"]
+            project.selected_node_id = op["selected_node_id"]
+            if "components" in op:
+                project.components = components_from_dict(op["components"])
+            project.tree = nodes[op["root"]]
+            applied += 1
+    return applied
+
+
+# ---------------------------------------------------------------------------
+# Streaming JSON
+#
+# write_project() / read_project() walk the tree with explicit stacks and
+# move data through the file handle in chunks, so neither the recursion
+# limit nor an intermediate dict tree or whole-file string bounds the size
+# of a project.  The indented output is byte-identical to
+# ``json.dumps(project_to_dict(project), indent=indent)``.
+# ---------------------------------------------------------------------------
+
+_CHUNK_SIZE = 1 << 16
+
+
+def write_project(project: ProjectState, fp: TextIO, *, indent: int | None = 2) -> None:
+    """Stream *project* as JSON to the text file handle *fp*."""
+    if indent is None:
+        key_sep = ":"
+        encoder = json.JSONEncoder(separators=(",", ":"))
+    else:
+        key_sep = ": "
+        encoder = json.JSONEncoder(indent=indent)
+    templates: dict[int, tuple[str, ...]] = {}
+
+    def layout(level: int) -> tuple[str, ...]:
+        """Separator strings for a node object at nesting *level*."""
+        if level not in templates:
+            pad = "" if indent is None else "\n" + " " * (indent * level)
+            inner = "" if indent is None else pad + " " * indent
+            child = "" if indent is None else inner + " " * indent
+            templates[level] = (
+                pad, inner, f"{{{inner}\"id\"{key_sep}", f",{inner}\"type\"{key_sep}",
+                f",{inner}\"props\"{key_sep}", f",{inner}\"children\"{key_sep}",
+                f",{inner}\"parent_id\"{key_sep}", f",{inner}\"order\"{key_sep}",
+                f",{inner}\"slot\"{key_sep}", f"{pad}}}", f"[{child}", f",{child}",
+            )
+        return templates[level]
+
+    def dump(value, pad: str) -> str:
+        if value is None:
+            return "null"
+        if type(value) is str:
+            return encode_basestring_ascii(value)
+        if type(value) is int:
+            return int.__repr__(value)
+        if type(value) is dict and not value:
+            return "{}"
+        text = encoder.encode(value)
+        return text.replace("\n", pad) if indent is not None else text
+
+    buffer: list[str] = []
+    size = 0
+
+    def emit(text: str) -> None:
+        nonlocal size
+        buffer.append(text)
+        size += len(text)
+        if size >= _CHUNK_SIZE:
+            fp.write("".join(buffer))
+            buffer.clear()
+            size = 0
+
+    top = layout(0)
+    emit("{")
+    for name in ("name", "schema_version", "theme", "device_frame", "selected_node_id"):
+        emit(f"{top[1]}\"{name}\"{key_sep}{dump(getattr(project, name), top[1])},")
+    if project.components:
+        components = components_to_dict(project.components)
+        emit(f"{top[1]}\"components\"{key_sep}{dump(components, top[1])},")
+    emit(f"{top[1]}\"tree\"{key_sep}")
+
+    # Items are nodes (with their nesting level) or literal text.
+    stack: list[tuple[WidgetNode, int] | str] = [(project.tree, 1)]
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            emit(item)
+            continue
+        node, level = item
+        (pad, inner, open_id, sep_type, sep_props, sep_children,
+         sep_parent, sep_order, sep_slot, close, open_list, sep_list) = layout(level)
+        emit(
+            f"{open_id}{dump(node.id, inner)}{sep_type}{dump(node.type, inner)}"
+            f"{sep_props}{dump(node.props, inner)}{sep_children}"
+        )
+        tail = (
+            f"{sep_parent}{dump(node.parent_id, inner)}{sep_order}{dump(node.order, inner)}"
+            f"{sep_slot}{dump(node.slot, inner)}{close}"
+        )
+        if not node.children:
+            emit("[]" + tail)
+            continue
+        emit(open_list)
+        stack.append(f"{inner}]{tail}")
+        for i, child in enumerate(reversed(node.children)):
+            if i:
+                stack.append(sep_list)
+            stack.append((child, level + 2))
+    emit(f"{top[0]}}}")
+    fp.write("".join(buffer))
+
+
+def read_project(fp: TextIO) -> ProjectState:
+    """Read a project written by :func:`write_project` (or any JSON layout).
+
+    Nodes are built as soon as their JSON object closes, so no intermediate
+    dict tree is kept.  Migrations therefore see the project fields without
+    ``tree``.
+    """
+    data = _JsonReader(fp).read()
+    if not isinstance(data, dict) or not isinstance(data.get("tree"), WidgetNode):
+        raise ValueError("Not a project file: missing 'tree' object")
+    tree = data.pop("tree")
+    return _project_from_fields(data, tree)
+
+
+def _project_from_fields(data: dict, tree: WidgetNode) -> ProjectState:
+    """Build a project from its (unmigrated) fields without the tree."""
+    migrated = migrate_project_dict(data)
+    return ProjectState(
+        name=migrated["name"],
+        schema_version=migrated["schema_version"],
+        theme=migrated.get("theme", "light"),
+        device_frame=migrated.get("device_frame", "desktop"),
+        selected_node_id=migrated.get("selected_node_id"),
+        components=components_from_dict(migrated.get("components") or {}),
+        tree=tree,
+    )
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+# Frame kinds: what an object/array is in the project layout.
+_PLAIN, _PROJECT, _NODE, _CHILDREN = range(4)
+
+
+class _JsonReader:
+    """Iterative JSON parser over a text file handle, read in chunks.
+
+    Only the project's structural containers (the top-level object, node
+    objects and ``children`` arrays) are tracked on an explicit stack;
+    objects in node position are turned into :class:`WidgetNode` as they
+    close.  Every other value (props, scalars) is handed to the C decoder
+    with ``raw_decode``.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = _CHUNK_SIZE) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def read(self):
+        # Frames are [container, pending key, kind].
+        stack: list[list] = []
+        while True:
+            char = self._peek()
+            kind = self._kind_of(char, stack[-1] if stack else None)
+            if kind == _PLAIN:
+                value = self._value()
+            else:
+                self._pos += 1
+                closer = "]" if char == "[" else "}"
+                container = [] if char == "[" else {}
+                if self._peek() != closer:
+                    stack.append([container, None if char == "[" else self._key(), kind])
+                    continue
+                self._pos += 1
+                value = self._close(container, kind)
+
+            # Attach the finished value, closing every container it completes.
+            while True:
+                if not stack:
+                    if self._peek():
+                        self._error("Extra data")
+                    return value
+                frame = stack[-1]
+                container = frame[0]
+                if isinstance(container, dict):
+                    container[frame[1]] = value
+                    closer = "}"
+                else:
+                    container.append(value)
+                    closer = "]"
+                char = self._peek()
+                self._pos += 1
+                if char == ",":
+                    if closer == "}":
+                        frame[1] = self._key()
+                    break
+                if char != closer:
+                    self._pos -= 1
+                    self._error(f"Expecting ',' or '{closer}'")
+                stack.pop()
+                value = self._close(container, frame[2])
+
+    @staticmethod
+    def _kind_of(char: str, parent: list | None) -> int:
+        """Frame kind for a value starting with *char* under *parent*."""
+        if char == "{":
+            if parent is None:
+                return _PROJECT
+            if parent[2] == _CHILDREN or (parent[2] == _PROJECT and parent[1] == "tree"):
+                return _NODE
+        elif char == "[" and parent is not None and parent[2] == _NODE and parent[1] == "children":
+            return _CHILDREN
+        return _PLAIN
+
+    @staticmethod
+    def _close(container, kind: int):
+        if kind != _NODE:
+            return container
+        node = _node_shell(container)
+        node.children = container.get("children", [])
+        for child in node.children:
+            if child.parent_id == node.id:
+                child.parent_id = node.id  # share the string, not an equal copy
+        return node
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ("" at EOF)."""
+        buf, pos = self._buf, self._pos
+        if pos < len(buf) and buf[pos] not in " \t\n\r":
+            return buf[pos]
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _key(self) -> str:
+        if self._peek() != '"':
+            self._error("Expecting property name enclosed in double quotes")
+        while True:
+            try:
+                key, end = scanstring(self._buf, self._pos + 1)
+                break
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+        if self._buf.startswith(":", end):
+            self._pos = end + 1
+            return key
+        self._pos = end
+        if self._peek() != ":":
+            self._error("Expecting ':' delimiter")
+        self._pos += 1
+        return key
+
+    def _value(self):
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number or literal may continue in the next chunk.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _error(self, message: str):
+        raise json.JSONDecodeError(message, self._buf, self._pos)
 
 
 # ---------------------------------------------------------------------------
@@ -1 +1,12 @@
-# placeholder golden file
+import flet as ft
+
+def main(page: ft.Page):
+    page.title = "My App"
+    page.theme_mode = ft.ThemeMode.LIGHT
+
+    page.add(
+        ft.Column()
+    )
+
+
+ft.app(target=main)
\ No newline at end of file
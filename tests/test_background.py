@@ -0,0 +1,84 @@
+import random
+
+from benchmarks.synthetic import make_registry_tree
+from src.engine.background import BackgroundCompiler
+from src.engine.code_generator import generate_code
+from src.engine.snapshot import Snapshotter
+from src.engine.tree_ops import delete_node, insert_child, move_node, set_prop, walk
+from src.engine.validator import validate_all
+from src.models.widget_node import WidgetNode
+from src.state.app_state import AppState
+from src.state.events import TREE_KINDS
+from src.state.project_state import ProjectState
+from src.ui.code_preview import CodePreviewPanel
+
+
+def _shape(root):
+    return [(n.id, n.type, dict(n.props), n.parent_id, n.order, n.slot,
+             [c.id for c in n.children]) for n in walk(root)]
+
+
+def test_snapshots_share_structure_and_track_edits() -> None:
+    state = AppState(ProjectState(name="s", tree=make_registry_tree(300, 5, 4)))
+    dirty = state.dirty_set(TREE_KINDS)
+    snapshotter = Snapshotter()
+    project = state.project
+    first = snapshotter.snapshot(project.tree, dirty.drain(), project.index)
+
+    rng = random.Random(1)
+    inner = [n.id for n in walk(project.tree) if n.type in ("Column", "Row", "ListView")]
+    for i in range(40):
+        leaves = [n.id for n in walk(project.tree) if not n.children and n.id != "n0"]
+        leaf, target = rng.choice(leaves), rng.choice(inner)
+        op = i % 4
+        state.transact(lambda p: (
+            set_prop(p.tree, leaf, "tooltip", f"t{i}", tree_index=p.index) if op == 0 else
+            insert_child(p.index.get(target), WidgetNode(id=f"new{i}", type="Text"), 0,
+                         "controls", tree_index=p.index) if op == 1 else
+            move_node(p.tree, leaf, target, 0, "controls", tree_index=p.index) if op == 2 else
+            delete_node(p.tree, leaf, tree_index=p.index)))
+        if op == 3 and leaf in inner:
+            inner.remove(leaf)
+        snap = snapshotter.snapshot(project.tree, dirty.drain(), project.index)
+        assert _shape(snap.root) == _shape(project.tree)
+        assert len(snap) == len(project.index)
+
+    set_prop(project.tree, inner[-1], "spacing", 99.0)  # outside a transaction
+    assert snap.get(inner[-1]).props["spacing"] != 99.0  # the snapshot is frozen
+    assert first.get("n0") is not snap.get("n0")
+
+
+def test_background_compiler_supersedes_and_matches_sync_output() -> None:
+    state = AppState(ProjectState(name="s", tree=make_registry_tree(500, 6, 4)))
+    dirty = state.dirty_set(TREE_KINDS)
+    project = state.project
+    snapshotter = Snapshotter()
+    ready, previews = [], []
+    compiler = BackgroundCompiler(on_ready=ready.append,
+                                  on_preview=lambda g, head: previews.append(head),
+                                  preview_lines=10)
+    try:
+        compiler.submit(snapshotter.snapshot(project.tree), None)
+        compiler.wait(timeout=10)
+        assert previews == ["\n".join(generate_code(project.tree).split("\n")[:10])]
+        for i in range(20):
+            state.transact(lambda p: set_prop(p.tree, "n3", "spacing", float(i),
+                                              tree_index=p.index))
+            ids = dirty.drain()
+            compiler.submit(snapshotter.snapshot(project.tree, ids, project.index), ids)
+        result = compiler.wait(timeout=10)
+        assert result is not None and result.generation == compiler.generation == 21
+        assert result.code == generate_code(project.tree)
+        assert result.diagnostics == validate_all(project.tree)
+        assert [r.generation for r in ready] == sorted({r.generation for r in ready})
+
+        # A result that lands before the UI marks its generation pending
+        # keeps the panel from dimming.
+        panel = CodePreviewPanel(on_copy=lambda code: None, on_export=lambda: None)
+        panel.show(result)
+        panel.show_pending(compiler.generation)
+        assert not panel.is_pending
+        panel.show_pending(compiler.generation + 1)
+        assert panel.is_pending
+    finally:
+        compiler.shutdown()
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from src.batch_codegen import main, run_batch
+from src.engine.code_generator import generate_code
+from src.models.widget_node import WidgetNode
+from src.state.project_state import ProjectState
+from src.utils.serializer import save_project
+
+
+def _project(text: str) -> ProjectState:
+    root = WidgetNode(id="root", type="Column", children=[
+        WidgetNode(id="t", type="Text", props={"value": text}, slot="controls"),
+    ])
+    return ProjectState(name=text, tree=root)
+
+
+def test_batch_generates_and_skips_unchanged_inputs(tmp_path: Path) -> None:
+    src, out = tmp_path / "projects", tmp_path / "out"
+    (src / "nested").mkdir(parents=True)
+    save_project(_project("A"), src / "a.fvb.json")
+    save_project(_project("B"), src / "nested" / "b.fvb")
+
+    results, skipped = run_batch(src, out, workers=2)
+    assert skipped == 0 and [r.error for r in results] == [None, None]
+    assert (out / "nested" / "b.py").read_text() == generate_code(_project("B").tree)
+
+    save_project(_project("A2"), src / "a.fvb.json")
+    results, skipped = run_batch(src, out, workers=1)
+    assert skipped == 1 and [Path(r.source).name for r in results] == ["a.fvb.json"]
+    assert "A2" in (out / "a.py").read_text()
+
+
+def test_invalid_projects_fail_the_run(tmp_path: Path, capsys) -> None:
+    bad = _project("X")
+    bad.tree.children[0].type = "Nope"
+    save_project(bad, tmp_path / "bad.fvb.json")
+    assert main([str(tmp_path), "-j", "1"]) == 1
+    assert "bad.fvb.json" in capsys.readouterr().err
+    assert not (tmp_path / "bad.py").exists()
+
+    # A truncated binary file is reported like any other broken project.
+    save_project(_project("T"), tmp_path / "cut.fvb")
+    data = (tmp_path / "cut.fvb").read_bytes()
+    (tmp_path / "cut.fvb").write_bytes(data[:len(data) // 2])
+    results, _ = run_batch(tmp_path, tmp_path, workers=1, force=True)
+    errors = {Path(r.source).name: r.error for r in results}
+    assert errors["cut.fvb"].startswith("ValueError: Corrupt FVB")
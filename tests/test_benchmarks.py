@@ -0,0 +1,25 @@
+from benchmarks.suite import compare, run_suite
+from benchmarks.synthetic import make_registry_tree
+from src.engine.tree_index import TreeIndex
+from src.engine.tree_ops import walk
+from src.engine.validator import validate_tree
+
+
+def test_registry_tree_is_valid_and_respects_shape() -> None:
+    root = make_registry_tree(2000, depth=5, fanout=4, seed=3)
+    validate_tree(root)
+    index = TreeIndex(root)
+    nodes = list(walk(root))
+    assert len(nodes) == min(2000, sum(4 ** d for d in range(5)))
+    assert max(index.depth_of(n.id) for n in nodes) <= 4
+    assert all(len(n.children) <= 4 for n in nodes)
+    assert [n.type for n in walk(make_registry_tree(2000, 5, 4, seed=3))] == [n.type for n in nodes]
+
+
+def test_suite_results_compare_against_baseline() -> None:
+    current = run_suite(200, 4, 4, repeat=1, cases=["validate_tree", "HitTestEngine.hit"])
+    assert set(current["results"]) == {"validate_tree", "HitTestEngine.hit"}
+    slower = {"results": {name: {"median_s": r["median_s"] / 2}
+                          for name, r in current["results"].items()}}
+    assert all(bad for _, _, bad in compare(current, slower, tolerance=0.3))
+    assert not any(bad for _, _, bad in compare(current, current, tolerance=0.3))
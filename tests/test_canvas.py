@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+from benchmarks.synthetic import make_tree
+from src.engine.tree_index import TreeIndex
+from src.ui import canvas as canvas_module
+from src.ui.canvas import CanvasPanel
+
+
+def _canvas() -> CanvasPanel:
+    return CanvasPanel(*(lambda *a: None for _ in range(5)))
+
+
+def _root_window(canvas: CanvasPanel):
+    root_block = canvas.control.content.controls[-1].content
+    return root_block.content.controls[1]
+
+
+def test_nested_blocks_materialize_only_what_the_windows_show(monkeypatch) -> None:
+    root = make_tree(20_000)
+    index = TreeIndex(root)
+    canvas = _canvas()
+    canvas.sync(root, None, None, index)
+    assert 0 < canvas.materialized < 400
+
+    # Blocks nest: the root's window holds its children's block containers,
+    # which hold their own (windowed) children.
+    window = _root_window(canvas)
+    first = window.controls[1]
+    assert first.content.controls[0].controls[2].value == "Column"
+    assert len(first.content.controls[1].controls) > 2
+
+    # Scrolling the root window swaps which children are built.
+    window.on_scroll(SimpleNamespace(pixels=2_500, viewport_dimension=800))
+    assert window.controls[1] is not first
+    assert 0 < canvas.materialized < 400
+
+    # A selection change patches just the two blocks involved.
+    canvas.sync(root, "n5", set(), index)
+    patched: list = []
+    monkeypatch.setattr(canvas_module, "patch", lambda *c: patched.extend(c))
+    canvas.sync(root, "n6", set(), index)
+    assert len(patched) == 2
+
+
+def test_collapse_hides_subtree_and_edits_reach_built_blocks() -> None:
+    from src.engine.tree_ops import set_prop
+
+    root = make_tree(13, fanout=3)
+    index = TreeIndex(root)
+    canvas = _canvas()
+    canvas.sync(root, None, None, index)
+    built = canvas.materialized
+    assert built == 13  # everything fits in the root window
+
+    canvas.toggle("n1")
+    assert canvas.materialized < built
+    canvas.toggle("n1")
+    assert canvas.materialized == built
+
+    set_prop(root, "n12", "value", "Changed", tree_index=index)
+    canvas.sync(root, None, {"n12"}, index)
+    labels = []
+    stack = [canvas.control]
+    while stack:
+        control = stack.pop()
+        if getattr(control, "value", None) == 'Text: "Changed"':
+            labels.append(control)
+        stack.extend(getattr(control, "controls", None) or [])
+        if getattr(control, "content", None) is not None:
+            stack.append(control.content)
+    assert len(labels) == 1
@@ -13,3 +13,73 @@ def test_generate_code_with_event_handler() -> None:
     assert "def on_go(e: ft.ControlEvent):" in code
     assert "ft.Column" in code
     assert "ft.MainAxisAlignment.CENTER" in code
+
+
+def test_memoized_generator_rerenders_only_edited_path() -> None:
+    from src.engine.code_generator import CodeGenerator
+    from src.engine.tree_index import TreeIndex
+    from src.engine.tree_ops import set_prop
+
+    root = WidgetNode(id="root", type="Column", children=[
+        WidgetNode(id="box", type="Container", slot="controls", children=[
+            WidgetNode(id="t1", type="Text", props={"value": "A"}, slot="content"),
+        ]),
+        WidgetNode(id="btn", type="ElevatedButton", props={"on_click": "on_go"}, slot="controls"),
+    ])
+    index = TreeIndex(root)
+    gen = CodeGenerator()
+    assert gen.generate(root) == generate_code(root)
+    untouched = gen._fragments["btn"]
+
+    set_prop(root, "t1", "value", "B", tree_index=index)
+    set_prop(root, "btn", "on_click", "on_stop", tree_index=index)
+    assert gen.generate(root, {"t1"}, index) != generate_code(root)  # btn edit not reported yet
+    code = gen.generate(root, {"btn"}, index)
+    assert code == generate_code(root)
+    assert "def on_stop(e: ft.ControlEvent):" in code and "on_go" not in code
+    assert gen._fragments["btn"] is not untouched
+
+
+def test_streamed_code_matches_golden_files_and_memoized_generator() -> None:
+    import io
+    from pathlib import Path
+
+    from src.engine.code_generator import CodeGenerator, iter_code, write_code
+    from src.utils.serializer import load_project
+
+    repo = Path(__file__).resolve().parents[1]
+    for name in ("login", "dashboard"):
+        tree = load_project(repo / "templates" / f"{name}.fvb.json").tree
+        expected = (repo / "tests" / "golden" / f"{name}_expected.py").read_text(encoding="utf-8")
+        assert generate_code(tree) == expected
+
+    root = WidgetNode(id="root", type="Column", props={"alignment": "center"}, children=[
+        WidgetNode(id="card", type="Card", slot="content", children=[  # undeclared slot
+            WidgetNode(id="t0", type="Text", props={"on_tap": "ignored"}, slot="content"),
+        ]),
+        WidgetNode(id="box", type="Container", props={"padding": 8}, slot="controls", children=[
+            WidgetNode(id="row", type="Row", slot="content", children=[
+                WidgetNode(id="t1", type="Text", props={"value": "A"}, slot="controls"),
+                WidgetNode(id="b1", type="ElevatedButton", props={"on_click": "on_go"},
+                           slot="controls"),
+            ]),
+            WidgetNode(id="extra", type="Text", slot="content"),  # over slot_max
+        ]),
+        WidgetNode(id="empty", type="Column", slot="controls"),
+    ])
+    code = CodeGenerator().generate(root)
+    assert "".join(iter_code(root, chunk_size=1)) == code
+    fp = io.StringIO()
+    assert write_code(root, fp) == len(code) and fp.getvalue() == code
+
+
+def test_streamed_code_handles_deep_trees() -> None:
+    from src.engine.code_generator import iter_code
+
+    root = node = WidgetNode(id="n0", type="Container")
+    for i in range(1, 5000):
+        child = WidgetNode(id=f"n{i}", type="Container", slot="content")
+        node.children.append(child)
+        node = child
+    code = "".join(iter_code(root))
+    assert code.count("ft.Container(") == 5000
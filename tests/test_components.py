@@ -0,0 +1,68 @@
+from src.engine.code_generator import CodeGenerator, generate_code
+from src.engine.tree_index import TreeIndex
+from src.engine.tree_renderer import TreeRenderer
+from src.engine.validator import validate_all
+from src.models.component import make_component, make_instance
+from src.models.widget_node import WidgetNode
+from src.state.project_state import ProjectState
+from src.utils.serializer import load_project, project_to_dict, save_project
+
+
+def _card() -> WidgetNode:
+    return WidgetNode(id="card", type="Container", props={"padding": 8.0}, children=[
+        WidgetNode(id="col", type="Column", slot="content", children=[
+            WidgetNode(id="title", type="Text", props={"value": "Title", "size": 18.0},
+                       slot="controls"),
+            WidgetNode(id="go", type="ElevatedButton", props={"text": "Go", "on_click": "on_go"},
+                       slot="controls"),
+        ]),
+    ])
+
+
+def _project() -> ProjectState:
+    card = make_component("StatCard", _card())
+    root = WidgetNode(id="root", type="Column")
+    for i, label in enumerate(("Revenue", "Users", None)):
+        overrides = {"value": label} if label else {}
+        instance = make_instance(f"c{i}", card, **overrides)
+        instance.parent_id, instance.slot, instance.order = "root", "controls", i
+        root.children.append(instance)
+    return ProjectState(name="Demo", tree=root, components={"StatCard": card})
+
+
+def test_instances_generate_one_function_called_per_instance() -> None:
+    project = _project()
+    assert list(project.components["StatCard"].params) == ["value", "text"]
+    code = generate_code(project.tree, project.components)
+    assert code.count("def build_stat_card(value='Title', text='Go'):") == 1
+    assert code.count("def on_go(") == 1
+    assert "build_stat_card(value='Revenue')" in code
+    assert "build_stat_card()" in code
+    compile(code, "<generated>", "exec")
+
+    gen = CodeGenerator()
+    index = TreeIndex(project.tree)
+    assert gen.generate(project.tree, None, index, project.components) == code
+
+    # Each instance renders its own controls from the shared definition.
+    column = TreeRenderer().render(project.tree, project.components)
+    titles = [c.content.controls[0].value for c in column.controls]
+    assert titles == ["Revenue", "Users", "Title"]
+
+
+def test_components_roundtrip_and_validate(tmp_path) -> None:
+    project = _project()
+    expected = project_to_dict(project)
+    for name in ("p.fvb.json", "p.fvb"):
+        path = tmp_path / name
+        save_project(project, path)
+        loaded = load_project(path)
+        assert project_to_dict(loaded) == expected
+        assert generate_code(loaded.tree, loaded.components) == generate_code(
+            project.tree, project.components)
+
+    project.tree.children[0].props["color"] = "red"
+    project.tree.children[1].props["component"] = "Missing"
+    messages = [d.message for d in validate_all(project.tree, project.components)]
+    assert any("color" in m for m in messages)
+    assert any("Missing" in m for m in messages)
@@ -0,0 +1,67 @@
+from src.engine.snapshot import Snapshotter
+from src.engine.tree_ops import insert_child, set_props
+from src.models.widget_node import WidgetNode
+from src.state.app_state import AppState
+from src.state.events import TREE_KINDS
+from src.state.project_state import ProjectState
+from src.utils.debounce import Debouncer
+
+
+class _FakeTimer:
+    """Stands in for threading.Timer; tests fire it by hand."""
+
+    made: list["_FakeTimer"] = []
+
+    def __init__(self, delay, fn, args=()) -> None:
+        self.fn, self.args, self.cancelled, self.daemon = fn, args, False, False
+        _FakeTimer.made.append(self)
+
+    def start(self) -> None:
+        pass
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def fire(self) -> None:
+        self.fn(*self.args)
+
+
+def test_rapid_edits_refresh_and_compile_once() -> None:
+    root = WidgetNode(id="root", type="Column")
+    insert_child(root, WidgetNode(id="t", type="Text"), slot="controls")
+    state = AppState(ProjectState(name="Demo", tree=root))
+    code_dirty = state.dirty_set(TREE_KINDS)
+    code_dirty.drain()
+    snapshotter = Snapshotter()
+    submitted: list = []
+    refreshes: list[int] = []
+
+    def refresh() -> None:
+        # What the app's refresh does for the compiler.
+        refreshes.append(1)
+        if code_dirty:
+            dirty = code_dirty.drain()
+            submitted.append(snapshotter.snapshot(state.project.tree, dirty, state.project.index))
+
+    _FakeTimer.made.clear()
+    idle = Debouncer(refresh, timer=_FakeTimer)
+    for i in range(1, 21):
+        state.transact(lambda p: set_props(p.tree, ["t"], {"value": "x" * i}, tree_index=p.index),
+                       coalesce_key=("t", "value"))
+        idle.trigger()
+    assert refreshes == [] and idle.pending
+
+    # Timers the burst cancelled never run, even if they fire late.
+    for timer in _FakeTimer.made[:-1]:
+        assert timer.cancelled
+        timer.fire()
+    _FakeTimer.made[-1].fire()
+    assert len(refreshes) == 1 and len(submitted) == 1 and not idle.pending
+    assert submitted[0].root.children[0].props["value"] == "x" * 20
+
+    state.undo()
+    assert state.project.tree.children[0].props.get("value") is None
+
+    idle.trigger()
+    idle.flush()
+    assert len(refreshes) == 2
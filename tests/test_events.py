@@ -0,0 +1,84 @@
+from src.engine.tree_ops import insert_child, move_node, reorder_sibling, set_prop
+from src.models.widget_node import WidgetNode
+from src.state.app_state import AppState
+from src.state.events import TREE_KINDS, ChangeEvent, ChangeKind
+from src.state.project_state import ProjectState
+
+
+def _make_state() -> AppState:
+    root = WidgetNode(id="root", type="Column")
+    for nid in ("a", "b", "c"):
+        insert_child(root, WidgetNode(id=nid, type="Text"), slot="controls")
+    insert_child(root, WidgetNode(id="box", type="Column"), slot="controls")
+    return AppState(ProjectState(name="Demo", tree=root))
+
+
+def test_transact_publishes_typed_events() -> None:
+    state = _make_state()
+    received: list[ChangeEvent] = []
+    state.subscribe_events(received.extend)
+
+    events = state.transact(lambda p: set_prop(p.tree, "a", "value", "Hi", tree_index=p.index))
+    assert events == [ChangeEvent(ChangeKind.PROP_CHANGED, ("a",), ("value",))]
+
+    events = state.transact(lambda p: insert_child(
+        p.index.get("box"), WidgetNode(id="d", type="Text"), slot="controls", tree_index=p.index))
+    assert events == [ChangeEvent(ChangeKind.NODE_ADDED, ("d", "box"))]
+
+    events = state.transact(lambda p: move_node(p.tree, "a", "box", slot="controls", tree_index=p.index))
+    assert ChangeEvent(ChangeKind.NODE_MOVED, ("a", "box", "root")) in events
+
+    events = state.transact(lambda p: reorder_sibling(p.tree, "c", -1, tree_index=p.index))
+    assert {e.node_ids[0] for e in events} == {"b", "c"}
+    assert all(e.kind is ChangeKind.NODE_MOVED for e in events)
+
+    assert len(received) == 5
+
+
+def test_undo_reports_inverse_and_select_is_not_undoable() -> None:
+    state = _make_state()
+    state.transact(lambda p: insert_child(
+        p.tree, WidgetNode(id="d", type="Text"), slot="controls", tree_index=p.index))
+    assert state.undo() == [ChangeEvent(ChangeKind.NODE_REMOVED, ("d", "root"))]
+
+    assert state.select("a") == [ChangeEvent(ChangeKind.SELECTION_CHANGED, ("a", None))]
+    assert state.select("a") == []
+    assert not state.can_undo
+
+
+def test_dirty_set_filters_and_drains() -> None:
+    state = _make_state()
+    dirty = state.dirty_set(TREE_KINDS)
+    assert dirty.drain() is None  # first drain: everything
+    state.select("a")
+    assert not dirty
+    state.transact(lambda p: set_prop(p.tree, "b", "value", "x", tree_index=p.index))
+    assert dirty.drain() == {"b"}
+    assert dirty.drain() == set()
+
+
+def test_same_parent_slot_move_reaches_incremental_consumers() -> None:
+    from src.engine.code_generator import CodeGenerator, generate_code
+    from src.engine.validator import Validator, validate_all
+
+    root = WidgetNode(id="root", type="Column")
+    insert_child(root, WidgetNode(id="box", type="Container"), slot="controls")
+    insert_child(root.children[0], WidgetNode(id="t", type="Text"), slot="controls")
+    state = AppState(ProjectState(name="Demo", tree=root))
+    code_dirty, check_dirty = state.dirty_set(TREE_KINDS), state.dirty_set(TREE_KINDS)
+    gen, validator = CodeGenerator(), Validator()
+
+    def check() -> None:
+        p = state.project
+        assert gen.generate(p.tree, code_dirty.drain(), p.index) == generate_code(p.tree)
+        assert validator.validate(p.tree, check_dirty.drain(), p.index) == validate_all(p.tree)
+
+    check()
+    events = state.transact(lambda p: move_node(
+        p.tree, "t", "box", index=0, slot="content", tree_index=p.index))
+    assert events == [ChangeEvent(ChangeKind.NODE_MOVED, ("t", "box", "box"))]
+    check()
+    state.undo()
+    check()
+    state.redo()
+    check()
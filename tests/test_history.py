@@ -0,0 +1,113 @@
+from src.engine.tree_index import TreeIndex
+from src.engine.tree_ops import (
+    delete_node, insert_child, move_node, reorder_sibling, set_prop, walk, wrap_node,
+)
+from src.models.widget_node import WidgetNode
+from src.state.app_state import AppState
+from src.state.project_state import ProjectState
+from src.utils.serializer import project_to_dict
+
+
+def _make_state() -> AppState:
+    root = WidgetNode(id="root", type="Column")
+    for nid in ("a", "b"):
+        insert_child(root, WidgetNode(id=nid, type="Text"), slot="controls")
+    insert_child(root, WidgetNode(id="box", type="Column"), slot="controls")
+    return AppState(ProjectState(name="Demo", tree=root))
+
+
+def _assert_index_fresh(project: ProjectState) -> None:
+    fresh = TreeIndex(project.tree)
+    assert len(project.index) == len(fresh)
+    for node in walk(project.tree):
+        assert project.index.parent_of(node.id) is fresh.parent_of(node.id)
+        assert project.index.position_of(node.id) == node.order
+
+
+def test_undo_redo_restores_each_edit() -> None:
+    state = _make_state()
+    edits = [
+        lambda p: set_prop(p.tree, "a", "value", "Hi", tree_index=p.index),
+        lambda p: insert_child(p.index.get("box"), WidgetNode(id="c", type="Text"),
+                               slot="controls", tree_index=p.index),
+        lambda p: move_node(p.tree, "a", "box", index=0, slot="controls", tree_index=p.index),
+        lambda p: reorder_sibling(p.tree, "box", -1, tree_index=p.index),
+        lambda p: wrap_node(p.tree, "b", WidgetNode(id="w", type="Container"), tree_index=p.index),
+        lambda p: delete_node(p.tree, "box", tree_index=p.index),
+    ]
+    snapshots = []
+    for edit in edits:
+        snapshots.append(project_to_dict(state.project))
+        state.transact(edit)
+    final = project_to_dict(state.project)
+
+    for expected in reversed(snapshots):
+        state.undo()
+        assert project_to_dict(state.project) == expected
+        _assert_index_fresh(state.project)
+    assert not state.can_undo
+
+    for _ in edits:
+        state.redo()
+    assert project_to_dict(state.project) == final
+    _assert_index_fresh(state.project)
+
+
+def test_noop_transaction_is_not_recorded() -> None:
+    state = _make_state()
+    state.transact(lambda p: reorder_sibling(p.tree, "a", -1, tree_index=p.index))
+    assert not state.can_undo
+    state.transact(lambda p: setattr(p, "selected_node_id", "b"))
+    state.undo()
+    assert state.project.selected_node_id is None
+
+
+def test_consecutive_edits_to_one_prop_coalesce_into_one_undo_step() -> None:
+    state = _make_state()
+    now = [0.0]
+    state.history._clock = lambda: now[0]
+    for text in ("H", "He", "Hel"):
+        state.transact(lambda p: set_prop(p.tree, "a", "value", text, tree_index=p.index),
+                       coalesce_key=("a", "value"))
+        now[0] += 0.2
+    now[0] += 5  # past the window: a new step
+    state.transact(lambda p: set_prop(p.tree, "a", "value", "Hello", tree_index=p.index),
+                   coalesce_key=("a", "value"))
+    state.transact(lambda p: set_prop(p.tree, "b", "value", "x", tree_index=p.index),
+                   coalesce_key=("b", "value"))
+
+    state.undo()
+    assert "value" not in state.project.index.get("b").props
+    state.undo()
+    assert state.project.index.get("a").props["value"] == "Hel"
+    state.undo()
+    assert "value" not in state.project.index.get("a").props
+    assert not state.can_undo
+
+
+def test_batch_is_one_undo_step_and_one_publish() -> None:
+    from src.engine.tree_ops import delete_nodes, insert_children
+
+    state = _make_state()
+    before = project_to_dict(state.project)
+    notified, published = [], []
+    state.subscribe(notified.append)
+    state.subscribe_events(published.append)
+    with state.batch() as proj:
+        insert_children(proj.index.get("box"), [WidgetNode(id=f"n{i}", type="Text")
+                                                for i in range(50)],
+                        slot="controls", tree_index=proj.index)
+        for i in range(50):
+            state.transact(lambda p: set_prop(p.tree, f"n{i}", "value", str(i),
+                                              tree_index=p.index))
+        state.select("n0")
+        with state.batch():
+            state.transact(lambda p: delete_nodes(p.tree, ["a", "b"], tree_index=p.index))
+        assert not notified and not published and state.batching
+    assert len(notified) == len(published) == 1
+    assert state.project.selected_node_id == "n0"
+    _assert_index_fresh(state.project)
+    state.undo()
+    assert not state.can_undo
+    after_undo = project_to_dict(state.project)
+    assert after_undo["tree"] == before["tree"]
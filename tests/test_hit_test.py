@@ -0,0 +1,52 @@
+import random
+
+from src.engine.hit_test import DropZone, HitBox, HitTestEngine
+
+
+def _linear_hit(boxes, x, y):
+    for box in reversed(boxes):
+        if box.x <= x <= box.x + box.w and box.y <= y <= box.y + box.h:
+            return box
+    return None
+
+
+def test_innermost_box_wins() -> None:
+    engine = HitTestEngine(cell_size=10)
+    engine.build([
+        HitBox("root", None, 0, 0, 1000, 1000, accepts_children=True),
+        HitBox("col", "controls", 10, 10, 200, 200, accepts_children=True),
+        HitBox("text", "controls", 20, 20, 50, 20),
+    ])
+    assert engine.hit(30, 30).box.node_id == "text"
+    assert engine.hit(100, 110).box.node_id == "col"
+    assert engine.hit(100, 110).zone is DropZone.INSIDE
+    assert engine.hit(900, 900).box.node_id == "root"
+    assert engine.hit(-1, 5) is None
+
+
+def test_update_keeps_stacking_order() -> None:
+    engine = HitTestEngine(cell_size=10)
+    engine.build([HitBox("a", None, 0, 0, 100, 100), HitBox("b", None, 0, 0, 10, 10)])
+    engine.update(HitBox("a", None, 0, 0, 5, 5))
+    assert engine.hit(2, 2).box.node_id == "b"
+    engine.update(HitBox("b", None, 50, 50, 10, 10))
+    assert engine.hit(2, 2).box.node_id == "a"
+    assert engine.hit(55, 55).box.node_id == "b"
+    assert engine.remove("b")
+    assert engine.hit(55, 55) is None
+
+
+def test_grid_matches_linear_scan() -> None:
+    rnd = random.Random(7)
+    boxes = [
+        HitBox(f"n{i}", None, rnd.uniform(0, 900), rnd.uniform(0, 900),
+               rnd.choice([5, 40, 300, 2000]), rnd.choice([5, 40, 300, 2000]))
+        for i in range(300)
+    ]
+    engine = HitTestEngine()
+    engine.build(boxes)
+    for _ in range(500):
+        x, y = rnd.uniform(-50, 1500), rnd.uniform(-50, 1500)
+        result = engine.hit(x, y)
+        expected = _linear_hit(boxes, x, y)
+        assert (result.box if result else None) is expected
@@ -0,0 +1,115 @@
+import gc
+import weakref
+
+from src.engine.tree_ops import (
+    delete_node,
+    delete_nodes,
+    duplicate_nodes,
+    insert_child,
+    move_node,
+    set_prop,
+    wrap_node,
+)
+from src.models.widget_node import WidgetNode
+from src.state.app_state import AppState
+from src.state.project_state import ProjectState
+from src.utils.journal import Journal
+from src.utils.serializer import journal_path_for, load_project, project_to_dict, save_project
+
+
+def _make_state() -> AppState:
+    root = WidgetNode(id="root", type="Column")
+    for nid in ("a", "b"):
+        insert_child(root, WidgetNode(id=nid, type="Text"), slot="controls")
+    insert_child(root, WidgetNode(id="box", type="Column"), slot="controls")
+    return AppState(ProjectState(name="Demo", tree=root))
+
+
+def _subtree() -> WidgetNode:
+    card = WidgetNode(id="card", type="Column")
+    insert_child(card, WidgetNode(id="title", type="Text", props={"value": "T"}), slot="controls")
+    return card
+
+
+def test_journal_replays_edits_undo_and_redo(tmp_path) -> None:
+    path = tmp_path / "demo.fvb.json"
+    state = _make_state()
+    journal = Journal(path, compact_every=1000, durable=False)
+    journal.compact(state.project)  # the first save
+    journal.attach(state)
+
+    state.transact(lambda p: set_prop(p.tree, "a", "value", "Hi", tree_index=p.index))
+    state.transact(lambda p: insert_child(p.index.get("box"), _subtree(), slot="controls",
+                                          tree_index=p.index))
+    state.transact(lambda p: move_node(p.tree, "a", "card", 0, "controls", tree_index=p.index))
+    state.transact(lambda p: wrap_node(p.tree, "b", WidgetNode(id="w", type="Container"),
+                                       tree_index=p.index))
+    state.transact(lambda p: delete_node(p.tree, "box", tree_index=p.index))
+    state.undo()
+    state.undo()
+    state.redo()
+    state.project.name = "Renamed"
+    state.transact(lambda p: setattr(p, "selected_node_id", "title"))
+
+    assert journal.pending == 9
+    journal.flush()
+    assert project_to_dict(load_project(path)) == project_to_dict(state.project)
+
+
+def test_compaction_and_torn_tail(tmp_path) -> None:
+    path = tmp_path / "demo.fvb.json"
+    state = _make_state()
+    journal = Journal(path, compact_every=3, durable=False)
+    journal.compact(state.project)  # the first save
+    journal.attach(state)
+    for i in range(4):
+        state.transact(lambda p: set_prop(p.tree, "a", "value", str(i), tree_index=p.index))
+    assert journal.pending == 1
+    journal.close()
+
+    # Nodes a batch adds and removes again leave nothing to replay.
+    journal = Journal(path, durable=False)
+    journal.attach(state)
+
+    def churn(p: ProjectState) -> None:
+        insert_child(p.index.get("box"), _subtree(), slot="controls", tree_index=p.index)
+        copy, = duplicate_nodes(p.tree, ["box"], tree_index=p.index)
+        delete_nodes(p.tree, [copy.id], tree_index=p.index)
+        set_prop(p.tree, "a", "value", "last", tree_index=p.index)
+
+    with state.batch():
+        state.transact(churn)
+    journal.close()
+    assert project_to_dict(load_project(path)) == project_to_dict(state.project)
+
+    with journal_path_for(path).open("a", encoding="utf-8") as fp:
+        fp.write('{"name": "torn')
+    loaded = load_project(path)
+    assert project_to_dict(loaded) == project_to_dict(state.project)
+
+
+def test_opening_leaves_files_alone_and_close_detaches(tmp_path) -> None:
+    path = tmp_path / "demo.fvb.json"
+    save_project(_make_state().project, path)
+    save_project(_make_state().project, path)  # leaves a .bak
+    files = {p.name: p.read_bytes() for p in tmp_path.iterdir()}
+
+    state = AppState(load_project(path))
+    journal = Journal(path, durable=False)
+    journal.attach(state)
+    assert {p.name: p.read_bytes() for p in tmp_path.iterdir()} == {
+        **files, journal.journal_path.name: b""}
+
+    # Edits are buffered until flushed, then written in one go.
+    for i in range(3):
+        state.transact(lambda p: set_prop(p.tree, "a", "value", str(i), tree_index=p.index))
+    assert journal.journal_path.read_text() == ""
+    journal.flush()
+    assert len(journal.journal_path.read_text().splitlines()) == 3
+
+    # A closed journal is released by the state it was attached to.
+    journal.close()
+    ref = weakref.ref(journal)
+    del journal
+    gc.collect()
+    assert ref() is None
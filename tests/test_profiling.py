@@ -0,0 +1,36 @@
+import json
+
+from src.utils.profiling import Profiler
+
+
+def test_disabled_profiler_records_nothing() -> None:
+    profiler = Profiler(enabled=False)
+    fn = lambda: 1  # noqa: E731
+    assert profiler.traced("select")(fn) is fn
+    with profiler.span("refresh"):
+        profiler.count("rows.created", 3)
+    assert profiler.summary() == {"counters": {}, "spans": {}, "actions": {}}
+
+
+def test_spans_counters_and_action_histogram_export(tmp_path) -> None:
+    profiler = Profiler(enabled=True)
+
+    @profiler.traced("select")
+    def select():
+        with profiler.span("canvas.sync", rows=2):
+            profiler.count("rows.created", 2)
+
+    for _ in range(3):
+        select()
+    summary = profiler.summary()
+    assert summary["counters"] == {"rows.created": 6}
+    assert summary["spans"]["canvas.sync"]["count"] == 3
+    assert summary["actions"]["select"]["count"] == 3
+    assert sum(summary["actions"]["select"]["histogram"].values()) == 3
+
+    profiler.export(tmp_path / "run.trace.json")
+    events = json.loads((tmp_path / "run.trace.json").read_text())["traceEvents"]
+    assert {e["ph"] for e in events} == {"X", "C"}
+    assert any(e["name"] == "canvas.sync" and e["args"] == {"rows": 2} for e in events)
+    profiler.export(tmp_path / "run.json")
+    assert len(json.loads((tmp_path / "run.json").read_text())["events"]) == 6
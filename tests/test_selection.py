@@ -0,0 +1,64 @@
+from src.engine.tree_ops import delete_node, insert_child, set_props
+from src.models.widget_node import WidgetNode
+from src.state.app_state import AppState
+from src.state.events import ChangeEvent, ChangeKind
+from src.state.project_state import ProjectState
+from src.state.selection import adjacent_node
+
+
+def _make_state() -> AppState:
+    # root: a(a1, a2), b, c(c1)
+    root = WidgetNode(id="root", type="Column")
+    for nid in ("a", "b", "c"):
+        insert_child(root, WidgetNode(id=nid, type="Column"), slot="controls")
+    for parent, nid in (("a", "a1"), ("a", "a2"), ("c", "c1")):
+        node = next(n for n in root.children if n.id == parent)
+        insert_child(node, WidgetNode(id=nid, type="Text"), slot="controls")
+    return AppState(ProjectState(name="Demo", tree=root))
+
+
+def test_range_toggle_and_follow_edits() -> None:
+    state = _make_state()
+    index = state.project.index
+    state.select("a1")
+    state.select_range("c")
+    assert state.selection.ids() == ["a1", "a2", "b", "c"]
+    # Ranges pivot on the anchor, in either direction.
+    state.select_range("a")
+    assert state.selection.ids() == ["a1", "a"]
+    assert state.project.selected_node_id == "a"
+
+    state.toggle_selected("c1")
+    state.toggle_selected("a1")
+    assert state.selection.ids() == ["a", "c1"]
+    assert [adjacent_node(index, "a2", s).id for s in (-1, 1)] == ["a1", "b"]
+    assert adjacent_node(index, "b", -1).id == "a2"
+
+    # Deleted ids drop out, before history listeners (the journal) look;
+    # an edit moving the primary collapses onto it.
+    seen: list[str | None] = []
+    state.subscribe_history(lambda entry, project: seen.append(project.selected_node_id))
+    state.transact(lambda p: delete_node(p.tree, "c", tree_index=p.index))
+    assert state.selection.ids() == ["a"] and seen == ["a"]
+    state.transact(lambda p: setattr(p, "selected_node_id", "b"))
+    assert state.selection.ids() == ["b"]
+    state.undo()
+    assert state.selection.ids() == ["a"]
+
+
+def test_bulk_prop_apply_is_one_step_and_reports_only_changed_nodes() -> None:
+    state = _make_state()
+    state.transact(lambda p: set_props(p.tree, ["a1"], {"color": "red"}, tree_index=p.index))
+    state.select_many(["a1", "a2", "c1"])
+    received: list[ChangeEvent] = []
+    state.subscribe_events(received.extend)
+
+    state.transact(lambda p: set_props(
+        p.tree, state.selection.ids(), {"color": "red"}, tree_index=p.index))
+    assert received == [
+        ChangeEvent(ChangeKind.PROP_CHANGED, ("a2",), ("color",)),
+        ChangeEvent(ChangeKind.PROP_CHANGED, ("c1",), ("color",)),
+    ]
+    state.undo()
+    index = state.project.index
+    assert [index.get(i).props.get("color") for i in ("a1", "a2", "c1")] == ["red", None, None]
@@ -1,6 +1,8 @@
 from src.models.widget_node import WidgetNode
 from src.state.project_state import ProjectState
-from src.utils.serializer import project_from_dict, project_to_dict
+from src.utils.serializer import (
+    load_project, project_from_dict, project_to_dict, save_project,
+)
 
 
 def test_project_roundtrip() -> None:
@@ -9,3 +11,68 @@ def test_project_roundtrip() -> None:
     restored = project_from_dict(project_to_dict(project))
     assert restored.name == "Demo"
     assert restored.tree.children[0].id == "t1"
+
+
+def test_streamed_save_matches_json_dumps_and_loads_back(tmp_path) -> None:
+    import json
+
+    root = WidgetNode(id="root", type="Column", children=[
+        WidgetNode(id="t1", type="Text", props={"value": "a\n\"b\"", "size": 1.5}, slot="controls"),
+    ])
+    project = ProjectState(name="Demo", tree=root, selected_node_id="t1")
+    for indent in (2, None):
+        path = tmp_path / f"p{indent}.fvb.json"
+        save_project(project, path, indent=indent)
+        expected = project_to_dict(project)
+        if indent:
+            assert path.read_text(encoding="utf-8") == json.dumps(expected, indent=indent)
+        assert project_to_dict(load_project(path)) == expected
+
+
+def test_deep_tree_has_no_recursion_limit(tmp_path) -> None:
+    root = node = WidgetNode(id="n0", type="Container")
+    for i in range(1, 5000):
+        child = WidgetNode(id=f"n{i}", type="Container", parent_id=node.id, slot="content")
+        node.children.append(child)
+        node = child
+    path = tmp_path / "deep.fvb.json"
+    save_project(ProjectState(name="Deep", tree=root), path, indent=None)
+    node, depth = load_project(path).tree, 0
+    while node.children:
+        node, depth = node.children[0], depth + 1
+    assert (node.id, node.parent_id, depth) == ("n4999", "n4998", 4999)
+
+
+def test_binary_roundtrip_is_exact(tmp_path) -> None:
+    from src.engine.tree_ops import find_node
+
+    root = WidgetNode(id="root", type="Column", props={"alignment": "center"}, children=[
+        WidgetNode(id="box", type="Container", parent_id="root", slot="controls", props={
+            "padding": 8, "data": {"nested": [1, 2.5, None, True, "é", 2**70]},
+        }, children=[WidgetNode(id="t1", type="Text", parent_id="box", slot="content")]),
+        WidgetNode(id="t2", type="Text", parent_id="root", order=1, slot="controls"),
+    ])
+    project = ProjectState(name="Demo", tree=root, theme="dark", selected_node_id="t1")
+    path = tmp_path / "demo.fvb"
+    save_project(project, path)
+
+    loaded = load_project(path)
+    assert find_node(loaded.tree, "t1").parent_id == "box"
+    assert project_to_dict(loaded) == project_to_dict(project)
+    assert list(loaded.tree.children[0].props) == ["padding", "data"]
+
+
+def test_loaded_nodes_share_type_slot_key_and_parent_strings(tmp_path) -> None:
+    root = WidgetNode(id="root", type="Column", children=[
+        WidgetNode(id=f"t{i}", type="Text", props={"value": str(i), "size": 12},
+                   parent_id="root", slot="controls")
+        for i in range(3)
+    ])
+    path = tmp_path / "p.fvb.json"
+    save_project(ProjectState(name="Demo", tree=root), path)
+    loaded = load_project(path).tree
+    a, b, _ = loaded.children
+    assert not hasattr(a, "__dict__")
+    assert a.type is b.type and a.slot is b.slot
+    assert all(x is y for x, y in zip(a.props, b.props))
+    assert a.parent_id is loaded.id
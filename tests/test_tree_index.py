@@ -0,0 +1,48 @@
+from src.engine.tree_index import TreeIndex
+from src.engine.tree_ops import (
+    delete_node, find_node, find_parent, insert_child, is_ancestor,
+    move_node, reorder_sibling, walk, wrap_node,
+)
+from src.models.widget_node import WidgetNode
+
+
+def _assert_consistent(root: WidgetNode, index: TreeIndex) -> None:
+    fresh = TreeIndex(root)
+    assert len(index) == len(fresh)
+    for node in walk(root):
+        assert index.get(node.id) is node
+        assert index.parent_of(node.id) is fresh.parent_of(node.id)
+        assert index.position_of(node.id) == fresh.position_of(node.id) == node.order
+
+
+def test_index_tracks_tree_ops() -> None:
+    root = WidgetNode(id="root", type="Column")
+    index = TreeIndex(root)
+    for nid in ("a", "b", "c"):
+        insert_child(root, WidgetNode(id=nid, type="Text"), slot="controls", tree_index=index)
+    box = WidgetNode(id="box", type="Column")
+    insert_child(root, box, index=0, slot="controls", tree_index=index)
+    _assert_consistent(root, index)
+
+    assert reorder_sibling(root, "c", -2, tree_index=index)
+    assert move_node(root, "a", "box", slot="controls", tree_index=index)
+    assert wrap_node(root, "b", WidgetNode(id="w", type="Container"), tree_index=index)
+    _assert_consistent(root, index)
+
+    assert delete_node(root, "box", tree_index=index)
+    assert "a" not in index
+    _assert_consistent(root, index)
+
+
+def test_indexed_lookups_match_walk() -> None:
+    root = WidgetNode(id="root", type="Column")
+    outer = WidgetNode(id="outer", type="Column")
+    leaf = WidgetNode(id="leaf", type="Text")
+    insert_child(root, outer, slot="controls")
+    insert_child(outer, leaf, slot="controls")
+    index = TreeIndex(root)
+    assert find_node(root, "leaf", tree_index=index) is find_node(root, "leaf")
+    assert find_parent(root, "leaf", tree_index=index) is outer
+    assert is_ancestor(root, "root", "leaf", tree_index=index)
+    assert not is_ancestor(root, "leaf", "root", tree_index=index)
+    assert not move_node(root, "outer", "leaf", tree_index=index)
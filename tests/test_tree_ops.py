@@ -34,3 +34,70 @@ def test_wrap_node() -> None:
     assert root.children[0].id == "c1"
     assert wrapper.children[0].id == "t1"
     assert wrapper.children[0].slot == "content"
+
+
+def test_bulk_ops_match_single_node_ops_and_keep_index_fresh() -> None:
+    from src.engine.tree_index import TreeIndex
+    from src.engine.tree_ops import delete_nodes, insert_children, move_nodes, walk
+
+    def build():
+        root = WidgetNode(id="root", type="Column")
+        for nid in ("a", "b", "c", "d", "box"):
+            insert_child(root, WidgetNode(id=nid, type="Column"), slot="controls")
+        insert_child(root.children[0], WidgetNode(id="a1", type="Text"), slot="controls")
+        return root
+
+    bulk, single = build(), build()
+    index = TreeIndex(bulk)
+    insert_children(bulk, [WidgetNode(id="x", type="Text"), WidgetNode(id="y", type="Text")],
+                    index=1, slot="controls", tree_index=index)
+    for i, nid in enumerate(("x", "y")):
+        insert_child(single, WidgetNode(id=nid, type="Text"), index=1 + i, slot="controls")
+    # a1 moves with a; box cannot move into itself.
+    assert move_nodes(bulk, ["c", "a", "a1", "box"], "box", index=0, slot="controls",
+                      tree_index=index) == 2
+    for i, nid in enumerate(("c", "a")):
+        move_node(single, nid, "box", index=i, slot="controls")
+    assert delete_nodes(bulk, ["x", "box", "c", "nope", "root"], tree_index=index) == 2
+    for nid in ("x", "box"):
+        delete_node(single, nid)
+
+    shape = lambda r: [(n.id, n.parent_id, n.order, n.slot) for n in walk(r)]  # noqa: E731
+    assert shape(bulk) == shape(single) == [
+        ("root", None, 0, None), ("y", "root", 0, "controls"),
+        ("b", "root", 1, "controls"), ("d", "root", 2, "controls"),
+    ]
+    fresh = TreeIndex(bulk)
+    assert len(index) == len(fresh)
+    for node in walk(bulk):
+        assert index.parent_of(node.id) is fresh.parent_of(node.id)
+        assert index.position_of(node.id) == fresh.position_of(node.id)
+
+
+def test_duplicate_and_copy_give_fresh_unique_ids() -> None:
+    from src.engine.tree_index import TreeIndex
+    from src.engine.tree_ops import copy_nodes, duplicate_nodes, walk
+    from src.utils.id_generator import IdAllocator
+
+    root = WidgetNode(id="root", type="Column")
+    for nid in ("a", "b"):
+        insert_child(root, WidgetNode(id=nid, type="Column"), slot="controls")
+    insert_child(root.children[0], WidgetNode(id="a1", type="Text", props={"value": "x"}),
+                 slot="controls")
+    index = TreeIndex(root)
+
+    # a1 comes along with a; the root is never copied.
+    clip = copy_nodes(root, ["a1", "a", "root"], tree_index=index)
+    assert [(n.id, [c.id for c in n.children]) for n in clip] == [("a", ["a1"])]
+    assert clip[0].children[0] is not root.children[0].children[0]
+
+    copies = duplicate_nodes(root, ["a", "a1", "b"], tree_index=index)
+    assert [n.id for n in root.children] == ["a", copies[0].id, "b", copies[1].id]
+    dup = copies[0]
+    assert dup.children[0].parent_id == dup.id and dup.children[0].props == {"value": "x"}
+    ids = [n.id for n in walk(root)]
+    assert len(ids) == len(set(ids)) == len(index) == 7
+    assert index.parent_of(dup.children[0].id) is dup
+
+    allocator = IdAllocator({"text-00000000", "text-00000001"}, start=0)
+    assert allocator.new_id("text") == "text-00000002"
@@ -0,0 +1,36 @@
+from src.engine.tree_renderer import TreeRenderer
+from src.models.widget_node import WidgetNode
+
+
+def _tree() -> WidgetNode:
+    return WidgetNode(id="root", type="Column", props={"alignment": "center"}, children=[
+        WidgetNode(id="t1", type="Text", props={"value": "A", "weight": "bold"}, slot="controls"),
+        WidgetNode(id="b1", type="ElevatedButton", props={"text": "Go", "on_click": "on_go"},
+                   slot="controls"),
+    ])
+
+
+def test_render_reuses_controls_and_patches_changed_props() -> None:
+    renderer = TreeRenderer()
+    root = _tree()
+    column = renderer.render(root)
+    text, button = column.controls
+
+    root.children[0].props["value"] = "B"
+    root.children[1].props["text"] = "Stop"
+    assert renderer.render(root) is column
+    assert column.controls[0] is text and text.value == "B"
+    assert column.controls[1] is button and button.content.value == "Stop"
+
+
+def test_render_diffs_children_and_recreates_on_type_change() -> None:
+    renderer = TreeRenderer()
+    root = _tree()
+    column = renderer.render(root)
+    button = column.controls[1]
+
+    root.children.pop(0)
+    root.children.append(WidgetNode(id="t1", type="TextField", slot="controls"))
+    renderer.render(root)
+    assert column.controls[0] is button
+    assert type(column.controls[1]).__name__ == "TextField"
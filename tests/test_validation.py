@@ -14,3 +14,45 @@ def test_validation_rejects_leaf_children() -> None:
     node = WidgetNode(id="x", type="Text", children=[WidgetNode(id="c", type="Text")])
     with pytest.raises(ValidationError, match="does not accept children"):
         validate_tree(node)
+
+
+def test_validate_all_reports_every_problem_with_node_ids() -> None:
+    from src.engine.validator import validate_all
+
+    root = WidgetNode(id="root", type="Column", props={"alignment": "sideways"}, children=[
+        WidgetNode(id="t1", type="Text", props={"bogus": 1}, slot="controls"),
+        WidgetNode(id="t2", type="Text", slot="nowhere"),
+    ])
+    found = [(d.node_id, d.message.split(" ")[0]) for d in validate_all(root)]
+    assert found == [("root", "Invalid"), ("t2", "Child"), ("t1", "Unknown")]
+
+
+def test_incremental_validator_matches_full_run() -> None:
+    from src.engine.tree_ops import delete_node, insert_child, move_node, set_prop
+    from src.engine.validator import Validator, validate_all
+    from src.state.app_state import AppState
+    from src.state.events import TREE_KINDS
+    from src.state.project_state import ProjectState
+
+    root = WidgetNode(id="root", type="Column")
+    state = AppState(ProjectState(name="Demo", tree=root))
+    dirty = state.dirty_set(TREE_KINDS)
+    validator = Validator()
+    edits = [
+        lambda p: insert_child(p.tree, WidgetNode(id="box", type="Container"),
+                               slot="controls", tree_index=p.index),
+        lambda p: insert_child(p.index.get("box"), WidgetNode(id="a", type="Text"),
+                               slot="content", tree_index=p.index),
+        lambda p: insert_child(p.index.get("box"), WidgetNode(id="b", type="Text"),
+                               slot="content", tree_index=p.index),  # too many children
+        lambda p: set_prop(p.tree, "a", "weight", "heavy", tree_index=p.index),
+        lambda p: move_node(p.tree, "b", "root", slot="controls", tree_index=p.index),
+        lambda p: delete_node(p.tree, "box", tree_index=p.index),
+    ]
+    for edit in edits + [None, None]:
+        if edit is None:
+            state.undo()
+        else:
+            state.transact(edit)
+        project = state.project
+        assert validator.validate(project.tree, dirty.drain(), project.index) == validate_all(project.tree)
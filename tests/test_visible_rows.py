@@ -0,0 +1,83 @@
+from benchmarks.synthetic import make_tree
+from src.engine.tree_index import TreeIndex
+from src.engine.tree_ops import delete_node, insert_child
+from src.models.widget_node import WidgetNode
+from src.ui.tree_view import TreeViewPanel
+from src.ui.visible_rows import VisibleRows
+
+
+def _fresh(root: WidgetNode, collapsed=()) -> list[tuple[int, str]]:
+    rows = VisibleRows()
+    rows.rebuild(root)
+    for node_id in collapsed:
+        rows.collapse(node_id)
+    return list(rows)
+
+
+def test_incremental_sync_matches_rebuild() -> None:
+    root = make_tree(200, fanout=4)
+    index = TreeIndex(root)
+    rows = VisibleRows()
+    rows.sync(root, None, index)
+
+    empty = WidgetNode(id="empty", type="Column")
+    insert_child(index.get("n3"), empty, 0, "controls", tree_index=index)
+    rows.sync(root, {"n3", "empty"}, index)
+    assert list(rows) == _fresh(root)
+
+    # An empty expanded node picks up children added later.
+    insert_child(empty, WidgetNode(id="leaf", type="Text"), slot="controls", tree_index=index)
+    rows.sync(root, {"empty", "leaf"}, index)
+    assert list(rows) == _fresh(root)
+
+    delete_node(root, "n1", tree_index=index)
+    rows.sync(root, {"n0"}, index)
+    assert list(rows) == _fresh(root)
+
+
+def test_collapse_expand_and_large_child_lists_start_collapsed() -> None:
+    root = make_tree(50, fanout=3)
+    rows = VisibleRows(collapse_above=3)
+    rows.rebuild(root)
+    full = list(rows)
+
+    rows.collapse("n1")
+    assert list(rows) == _fresh(root, ["n1"])
+    assert "n4" not in {node_id for _, node_id in rows}
+    rows.expand(TreeIndex(root).get("n1"))
+    assert list(rows) == full
+    assert all(rows.index_of(node_id) == i for i, (_, node_id) in enumerate(rows))
+
+    # reset() forgets collapse state along with the rows.
+    rows.collapse("n1")
+    rows.reset()
+    rows.rebuild(root)
+    assert list(rows) == full
+
+    wide = WidgetNode(id="w", type="Column", children=[
+        WidgetNode(id=f"c{i}", type="Text") for i in range(5)
+    ])
+    rows.rebuild(wide)
+    assert list(rows) == [(0, "w")]
+
+    # Dropping below the threshold expands the node on the next sync.
+    index = TreeIndex(wide)
+    rows.sync(wide, None, index)
+    delete_node(wide, "c0", tree_index=index)
+    delete_node(wide, "c1", tree_index=index)
+    rows.sync(wide, {"w", "c0", "c1"}, index)
+    assert list(rows) == _fresh(wide) == [(0, "w")] + [(1, f"c{i}") for i in (2, 3, 4)]
+
+
+def test_tree_view_toggle_splices_rows_without_building_them_all() -> None:
+    root = make_tree(20_000)
+    tree_view = TreeViewPanel(on_select=lambda node_id: None)
+    tree_view.sync(root, "n1", None, TreeIndex(root))
+    rows = tree_view._list.rows
+    assert tree_view.materialized < 100
+
+    before = len(rows)
+    tree_view.toggle("n1")
+    assert "n9" not in {node_id for _, node_id in rows}
+    tree_view.toggle("n1")
+    assert len(rows) == before and tree_view.materialized < 100
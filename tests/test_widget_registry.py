@@ -0,0 +1,17 @@
+from src.models.widget_registry import WIDGET_REGISTRY, WIDGET_SPECS, default_slot
+
+
+def test_specs_mirror_registry() -> None:
+    assert WIDGET_SPECS.keys() == WIDGET_REGISTRY.keys()
+    for name, raw in WIDGET_REGISTRY.items():
+        spec = WIDGET_SPECS[name]
+        assert spec.defaults == {k: v["default"] for k, v in raw["props"].items()}
+        assert spec.event_props == {k for k, v in raw["props"].items() if v["type"] == "event"}
+        assert [s for s, _ in spec.slots] == [s["slot"] for s in raw["children"]]
+        assert spec.default_slot == default_slot(name)
+
+
+def test_spec_enum_codes() -> None:
+    spec = WIDGET_SPECS["Text"]
+    assert spec.enum_codes["weight"]["bold"] == "ft.FontWeight.BOLD"
+    assert "on_click" in WIDGET_SPECS["ElevatedButton"].event_props